@@ -4,7 +4,7 @@ Agent Runner - Handles communication with LangGraph agent
 
 import sys
 import os
-from typing import Dict, Any, Optional, List
+from typing import AsyncIterator, Dict, Any, Optional, List
 import asyncio
 import logging
 
@@ -16,6 +16,9 @@ from langgraph_sdk.schema import Command
 
 logger = logging.getLogger(__name__)
 
+# Characters of a tool result sent with its tool_end event
+TOOL_RESULT_PREVIEW = 200
+
 
 class AgentRunner:
     """Handles running the LangGraph agent and managing conversations"""
@@ -53,30 +56,53 @@ class AgentRunner:
             self._init_local_graph()
     
     def _init_local_graph(self):
-        """Initialize local graph for direct execution"""
+        """Initialize local graph for direct execution
+        
+        AGENT_MODE=plan selects the plan-and-execute graph, which plans
+        several tool calls per model call; the default is the ReAct graph.
+        """
         try:
-            from react_agent.graph import builder
             from react_agent.context import Context
             from langgraph.checkpoint.memory import MemorySaver
             
+            if os.getenv("AGENT_MODE", "react").lower() == "plan":
+                from react_agent.planner import builder, PLANNER_TOOLS as tools
+                name = "Plan-and-Execute Agent"
+            else:
+                from react_agent.graph import builder
+                from react_agent.tools import AGENT_TOOLS as tools
+                name = "ReAct Agent"
+            self._tools = tools
+            
             # Create checkpointer for state management
             self._checkpointer = MemorySaver()
             
             # Compile graph with checkpointer to enable interrupts
             self._graph = builder.compile(
                 checkpointer=self._checkpointer,
-                name="ReAct Agent"
+                name=name
             )
             self._use_remote = False
             
             # Store default context
             self._default_context = Context()
             
-            logger.info("Using local graph execution with checkpointer")
+            logger.info(f"Using local graph execution ({name}) with checkpointer")
+            self._warm_up_model()
         except ImportError as e:
             logger.error(f"Failed to import local graph: {e}")
             raise RuntimeError("Cannot initialize agent - no local or remote graph available")
     
+    def _warm_up_model(self):
+        """Build the tool-bound chat model now rather than on the first message"""
+        try:
+            from react_agent.utils import warm_up_model
+
+            seconds = warm_up_model(self._default_context.model, self._tools)
+            logger.info(f"Warmed up {self._default_context.model} in {seconds * 1000:.0f} ms")
+        except Exception as e:
+            logger.warning(f"Model warm-up failed, it will be built on first use: {e}")
+    
     async def process_message(
         self, 
         session_id: str,
@@ -153,7 +179,7 @@ class AgentRunner:
     
     async def _process_local(self, thread_id: str, message: str, document_context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Process message using local graph"""
-        from langchain_core.messages import HumanMessage, AIMessage
+        from langchain_core.messages import AIMessage
         
         # Create config with thread_id for checkpointing
         config = {
@@ -162,18 +188,7 @@ class AgentRunner:
             }
         }
         
-        # Prepare input with document context if available
-        input_data = {
-            "messages": [HumanMessage(content=message)]
-        }
-        
-        # Add document context to the state if available
-        if document_context and document_context.get("loaded"):
-            input_data.update({
-                "document_loaded": True,
-                "document_path": document_context["document_path"],
-                "document_name": document_context["document_name"]
-            })
+        input_data = self._local_input(message, document_context)
         
         # Run the graph
         try:
@@ -224,6 +239,138 @@ class AgentRunner:
             raise
         
         
+    def _local_input(self, message: str, document_context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Build the graph input for a user message"""
+        from langchain_core.messages import HumanMessage
+        
+        # Prepare input with document context if available
+        input_data = {
+            "messages": [HumanMessage(content=message)]
+        }
+        
+        # Add document context to the state if available
+        if document_context and document_context.get("loaded"):
+            input_data.update({
+                "document_loaded": True,
+                "document_path": document_context["document_path"],
+                "document_name": document_context["document_name"]
+            })
+        return input_data
+    
+    async def stream_message(
+        self,
+        session_id: str,
+        thread_id: str,
+        message: str,
+        document_context: Dict[str, Any] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a user message through the agent, yielding events as they happen
+        
+        Events are dicts with a "type":
+        - "token": {"text"}, a piece of the model's answer
+        - "tool_start": {"id", "tool", "args"}, a tool call the model made
+        - "tool_end": {"id", "tool", "status", "preview"}, its result
+        - "approval_request": {"message", "approval_data"}, the run is paused
+        - "message": {"message"}, the final answer
+        - "error": {"message"}
+        
+        A remote LangGraph server is not streamed; its final answer is one
+        "message" event.
+        """
+        if self._use_remote:
+            yield self._result_event(await self.process_message(session_id, thread_id, message, document_context))
+            return
+        async for event in self._stream_local(self._local_input(message, document_context), thread_id):
+            yield event
+    
+    async def stream_approval(
+        self,
+        session_id: str,
+        thread_id: str,
+        approved: bool
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Resume the agent after an approval decision, yielding events as stream_message() does"""
+        if self._use_remote:
+            yield self._result_event(await self.resume_with_approval(session_id, thread_id, approved))
+            return
+        from langgraph.types import Command
+        
+        async for event in self._stream_local(Command(resume="yes" if approved else "no"), thread_id):
+            yield event
+    
+    @staticmethod
+    def _result_event(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn a process_message() or resume_with_approval() result into an event"""
+        if result.get("requires_approval"):
+            return {"type": "approval_request", "message": result["message"], "approval_data": result["approval_data"]}
+        if result.get("error"):
+            return {"type": "error", "message": result["message"]}
+        return {"type": "message", "message": result["message"]}
+    
+    async def _stream_local(self, graph_input: Any, thread_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Run the local graph with astream, translating its output into events
+        
+        "messages" mode gives the model's tokens as they are generated;
+        "updates" mode gives each node's output, from which tool calls, tool
+        results and interrupts are read. A direct command answered by
+        route_command has no tokens, only its tool events and message; a
+        plan's waves of tool calls come from execute_plan.
+        """
+        from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+        from react_agent.utils import get_message_text
+        
+        config = {
+            "configurable": {
+                "thread_id": thread_id
+            }
+        }
+        answer = None
+        try:
+            async for mode, chunk in self._graph.astream(
+                graph_input,
+                config=config,
+                context=self._default_context,
+                stream_mode=["messages", "updates"],
+            ):
+                if mode == "messages":
+                    token, metadata = chunk
+                    if metadata.get("langgraph_node") == "call_model" and isinstance(token, AIMessageChunk):
+                        text = get_message_text(token)
+                        if text:
+                            yield {"type": "token", "text": text}
+                    continue
+                
+                for node, update in chunk.items():
+                    if node == "__interrupt__":
+                        approval_data = update[0].value
+                        yield {
+                            "type": "approval_request",
+                            "message": approval_data.get("description", "Approval required"),
+                            "approval_data": approval_data,
+                        }
+                        return
+                    for msg in (update or {}).get("messages", []):
+                        if node in ("call_model", "route_command", "execute_plan") and isinstance(msg, AIMessage):
+                            for call in msg.tool_calls:
+                                yield {"type": "tool_start", "id": call["id"], "tool": call["name"], "args": call["args"]}
+                            if not msg.tool_calls:
+                                answer = msg.content
+                        elif node in ("tools", "route_command", "execute_plan") and isinstance(msg, ToolMessage):
+                            yield {
+                                "type": "tool_end",
+                                "id": msg.tool_call_id,
+                                "tool": msg.name,
+                                "status": msg.status,
+                                "preview": get_message_text(msg)[:TOOL_RESULT_PREVIEW],
+                            }
+        except Exception as e:
+            logger.error(f"Error in local graph streaming: {e}", exc_info=True)
+            yield {"type": "error", "message": f"Sorry, I encountered an error: {str(e)}"}
+            return
+        
+        yield {"type": "message", "message": answer if answer is not None else "Processed successfully"}
+    
     async def resume_with_approval(
         self,
         session_id: str,
@@ -3,12 +3,13 @@ FastAPI Backend for LangGraph DOCX Agent Bot
 Enables the agent to be used across multiple chat platforms
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import AsyncIterator, Optional, Dict, Any, List, Tuple
 import uvicorn
+import json
 import logging
 from datetime import datetime
 import uuid
@@ -17,6 +18,12 @@ from pathlib import Path
 
 from session_manager import SessionManager, Session
 from agent_runner import AgentRunner
+from react_agent.commands import get_command_metrics
+from react_agent.docx_executor import get_docx_executor
+from react_agent.docx_export import EXTENSIONS, FORMATS, MEDIA_TYPES, export_manager, export_paragraphs, in_blocks
+from react_agent.docx_indexer import DocxIndexer
+from react_agent.docx_manager import get_docx_manager
+from react_agent.prompt_cache import get_prompt_cache_metrics
 
 # Configure logging
 logging.basicConfig(
@@ -131,8 +138,12 @@ async def root():
         "status": "online",
         "endpoints": {
             "chat": "/api/chat",
+            "chat_stream": "/api/chat/stream",
+            "chat_websocket": "/ws/chat",
             "approve": "/api/approve",
             "sessions": "/api/sessions",
+            "metrics": "/api/metrics",
+            "export": "/api/export",
             "webhooks": {
             }
         },
@@ -150,6 +161,45 @@ async def health_check():
     }
 
 
+@app.get("/api/metrics")
+async def metrics():
+    """DOCX executor queue depth and task latency, prompt cache hits and direct command hit rate"""
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "docx_executor": get_docx_executor().get_metrics(),
+        "prompt_cache": get_prompt_cache_metrics(),
+        "commands": get_command_metrics(),
+    }
+
+
+@app.get("/api/export")
+async def export_document(format: str = "text", document: Optional[str] = None):
+    """Stream a document as plain text, Markdown or JSONL with chunked transfer.
+
+    Without ``document`` the agent's current document is exported, including
+    edits not saved yet; otherwise the named document is indexed for the export.
+    """
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(FORMATS)}")
+    if document:
+        path = resolve_document_path(document)
+        if not path:
+            raise HTTPException(status_code=404, detail=f"Document '{document}' not found")
+        indexer = DocxIndexer(str(path))
+        await get_docx_executor().run(indexer.index)
+        records = export_paragraphs(indexer.paragraphs, format)
+    else:
+        manager = get_docx_manager()
+        await manager._ensure_index_loaded()
+        path = manager.docx_path
+        records = export_manager(manager, format)
+    return StreamingResponse(
+        in_blocks(records),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{path.stem}.{EXTENSIONS[format]}"'},
+    )
+
+
 # ============================================================================
 # Core Chat API
 # ============================================================================
@@ -271,26 +321,7 @@ async def chat(message: ChatMessage):
             )
         
         # Run the agent
-        document_context = {}
-        if session.metadata and session.metadata.get("document_path"):
-            document_context = {
-                "document_path": session.metadata["document_path"],
-                "document_name": session.metadata.get("document_name", "unknown"),
-                "loaded": True
-            }
-            
-            # Create a more explicit message for the agent
-            doc_info = (
-                f"\n\nDOCUMENT CONTEXT:\n"
-                f"- Document loaded: {session.metadata['document_name']}\n"
-                f"- File path: {session.metadata['document_path']}\n"
-                f"- Status: Ready for processing\n"
-                f"- User request: {enhanced_message}\n"
-                f"\nPlease process this request using the loaded document."
-            )
-            enhanced_message = doc_info
-        else:
-            document_context = {}
+        enhanced_message, document_context = _with_document_context(session, enhanced_message)
         
         result = await agent_runner.process_message(
             session_id=session.session_id,
@@ -357,6 +388,138 @@ async def chat(message: ChatMessage):
         )
 
 
+# ============================================================================
+# Streaming Chat API
+# ============================================================================
+
+async def _chat_events(message: ChatMessage) -> AsyncIterator[Dict[str, Any]]:
+    """Handle a chat message as /api/chat does, yielding the agent's events as they happen
+
+    The first event is {"type": "session"}, the last {"type": "done", "status"};
+    in between come the agent's token, tool_start, tool_end, approval_request,
+    message and error events (see AgentRunner.stream_message).
+    """
+    status = "completed"
+    try:
+        async for event in _agent_events(message):
+            if event["type"] == "approval_request":
+                status = "waiting_approval"
+            elif event["type"] == "error":
+                status = "error"
+            yield event
+    except Exception as e:
+        logger.error(f"Error streaming chat message: {str(e)}", exc_info=True)
+        status = "error"
+        yield {"type": "error", "message": "Sorry, I encountered an error processing your request. Please try again."}
+    yield {"type": "done", "status": status}
+
+
+async def _agent_events(message: ChatMessage) -> AsyncIterator[Dict[str, Any]]:
+    """Route a chat message to a document load, an approval decision or the agent, yielding events"""
+    normalized_user_id = message.normalized_user_id()
+    session = session_manager.get_or_create_session(
+        user_id=normalized_user_id,
+        platform=message.platform,
+    )
+    yield {"type": "session", "session_id": session.session_id, "user_id": normalized_user_id}
+
+    user_profile = message.user_profile()
+    enhanced_message = message.message
+    if user_profile.get("name"):
+        enhanced_message = f"[User: {user_profile['name']}] {message.message}"
+    if user_profile:
+        session_manager.update_session_metadata(
+            session.session_id,
+            {"user_profile": user_profile},
+        )
+
+    normalized_text = message.message.strip().lower()
+    if message.message.startswith("/load "):
+        filename = message.message.replace("/load ", "").strip()
+        document_result = _attempt_load_document(filename, user_profile, session)
+        yield {
+            "type": "error" if document_result["status"] == "error" else "message",
+            "message": document_result["message"],
+        }
+        return
+    if session.pending_approval and _is_decision_command(normalized_text):
+        # A new approval request raised while resuming sets it again
+        session_manager.clear_pending_approval(session.session_id)
+        events = agent_runner.stream_approval(
+            session_id=session.session_id,
+            thread_id=session.thread_id,
+            approved=_is_approval(normalized_text),
+        )
+    elif session.pending_approval:
+        yield {
+            "type": "error",
+            "message": "You have a pending approval request. Please respond with /approve or /reject first.",
+        }
+        return
+    else:
+        enhanced_message, document_context = _with_document_context(session, enhanced_message)
+        events = agent_runner.stream_message(
+            session_id=session.session_id,
+            thread_id=session.thread_id,
+            message=enhanced_message,
+            document_context=document_context,
+        )
+
+    async for event in events:
+        if event["type"] == "approval_request":
+            session_manager.set_pending_approval(
+                session_id=session.session_id,
+                approval_data=event["approval_data"],
+            )
+            event = {**event, "message": format_approval_message(event["approval_data"])}
+        yield event
+
+
+def _sse(event: Dict[str, Any]) -> str:
+    """Format an event as a Server-Sent Events message"""
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+
+
+@app.post("/api/chat/stream")
+async def chat_stream(message: ChatMessage):
+    """
+    Chat endpoint that streams the agent's progress as Server-Sent Events
+
+    Takes the same body as /api/chat. Each event's name is its type: tokens
+    of the answer, tool calls starting and ending, and approval requests
+    are sent as they happen instead of after the whole agent loop.
+    """
+    logger.info(f"Streaming message from {message.user_id} on {message.platform}")
+    return StreamingResponse(
+        (_sse(event) async for event in _chat_events(message)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.websocket("/ws/chat")
+async def chat_websocket(websocket: WebSocket):
+    """
+    Chat over a WebSocket: send /api/chat bodies as JSON, receive the events of /api/chat/stream
+
+    The connection stays open across messages, so approvals can be answered
+    on it with /approve or /reject.
+    """
+    await websocket.accept()
+    try:
+        while True:
+            try:
+                message = ChatMessage(**await websocket.receive_json())
+            except (ValidationError, ValueError) as e:
+                await websocket.send_json({"type": "error", "message": f"Invalid message: {e}"})
+                await websocket.send_json({"type": "done", "status": "error"})
+                continue
+            async for event in _chat_events(message):
+                await websocket.send_text(json.dumps(event, ensure_ascii=False, default=str))
+    except WebSocketDisconnect:
+        logger.info("Chat WebSocket closed")
+
+
 @app.post("/api/approve")
 async def approve(approval: ApprovalRequest):
     """
@@ -545,6 +708,28 @@ def _attempt_load_document(filename: str, user_profile: Dict[str, Any], session:
     }
 
 
+def _with_document_context(session: Session, message: str) -> Tuple[str, Dict[str, Any]]:
+    """Add the session's loaded document to the agent message; return it and the document context."""
+    if not (session.metadata and session.metadata.get("document_path")):
+        return message, {}
+    document_context = {
+        "document_path": session.metadata["document_path"],
+        "document_name": session.metadata.get("document_name", "unknown"),
+        "loaded": True
+    }
+    
+    # Create a more explicit message for the agent
+    doc_info = (
+        f"\n\nDOCUMENT CONTEXT:\n"
+        f"- Document loaded: {session.metadata['document_name']}\n"
+        f"- File path: {session.metadata['document_path']}\n"
+        f"- Status: Ready for processing\n"
+        f"- User request: {message}\n"
+        f"\nPlease process this request using the loaded document."
+    )
+    return doc_info, document_context
+
+
 def _is_decision_command(message: str) -> bool:
     """Check if the incoming message is an approval decision."""
     if not message:
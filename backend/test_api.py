@@ -202,6 +202,40 @@ def test_all_sessions():
     print("❌ Failed to get all sessions")
     return False
 
+def test_streaming_time_to_first_byte():
+    """Compare time to first byte of /api/chat/stream with /api/chat"""
+    print("\n⏱️  Testing Streaming Time to First Byte...")
+    body = {"user_id": f"{USER_ID}_stream", "message": "Show me the document outline", "platform": "api"}
+    
+    started = time.perf_counter()
+    response = requests.post(f"{BASE_URL}/api/chat", json=body)
+    blocking = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    first_byte = first_token = None
+    events = []
+    with requests.post(f"{BASE_URL}/api/chat/stream", json=body, stream=True) as stream:
+        for line in stream.iter_lines(decode_unicode=True):
+            if first_byte is None:
+                first_byte = time.perf_counter() - started
+            if line.startswith("event: "):
+                events.append(line[len("event: "):])
+                if events[-1] == "token" and first_token is None:
+                    first_token = time.perf_counter() - started
+    total = time.perf_counter() - started
+    
+    print(f"/api/chat:        first byte after {blocking * 1000:.0f} ms (whole response)")
+    print(f"/api/chat/stream: first byte after {(first_byte or total) * 1000:.0f} ms, "
+          f"first token after {(first_token or total) * 1000:.0f} ms, done after {total * 1000:.0f} ms")
+    print(f"Events: {', '.join(dict.fromkeys(events))}")
+    
+    if response.status_code == 200 and events and events[-1] == "done":
+        print("✅ Stream completed")
+        return True
+    
+    print("❌ Stream did not complete")
+    return False
+
 def main():
     """Run all tests"""
     print("""
@@ -221,6 +255,7 @@ def main():
         ("Operation Rejection", test_reject_operation),
         ("Session Management", test_session_management),
         ("List All Sessions", test_all_sessions),
+        ("Streaming Time to First Byte", test_streaming_time_to_first_byte),
     ]
     
     results = []
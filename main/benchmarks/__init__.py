@@ -0,0 +1,5 @@
+"""Benchmarks for the DOCX indexing and editing pipeline.
+
+These benchmarks run against synthetic documents generated on the fly, so they
+need neither a running LangGraph server nor an LLM API key.
+"""
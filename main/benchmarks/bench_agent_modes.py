@@ -0,0 +1,205 @@
+"""Benchmark the ReAct graph against the plan-and-execute graph.
+
+Runs a few multi-step read tasks on a synthetic document through both graphs
+and records, per task and graph, the number of model calls, tool calls and
+the wall time. Edits are left out, as they stop at the approval step.
+
+With ``--model`` the graphs call that model (an API key is needed). Without
+it a scripted model stands in, answering after ``--latency`` seconds. For the
+ReAct graph it makes the task's tool calls either one per model call
+("react") or, like a model making parallel tool calls, all calls that do not
+wait on each other in one message ("react-batch"). For the plan graph it
+submits the task's steps as one Plan, then answers. Tools run for real
+either way.
+
+Usage::
+
+    python -m benchmarks.bench_agent_modes --paragraphs 2000 --latency 1.0
+    python -m benchmarks.bench_agent_modes --model openai/gpt-4o-mini --output modes.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import json
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.messages import AIMessage, ToolMessage
+
+from benchmarks.synthetic_docx import SyntheticDocxSpec, generate_docx
+from react_agent import docx_manager, planner
+from react_agent.context import Context
+
+# react_agent exports the compiled graph as `graph`, shadowing the module
+react_graph = importlib.import_module("react_agent.graph")
+
+
+@dataclass
+class Task:
+    """A request and the plan steps that answer it."""
+
+    name: str
+    prompt: str
+    steps: List[Dict[str, Any]]
+
+
+TASKS = [
+    Task(
+        "mentions",
+        "Find all mentions of the penalty clause and show the passage around each.",
+        [
+            {"id": "s1", "tool": "search_document", "args": {"query": "penalty clause"}},
+            {"id": "s2", "tool": "get_context", "for_each": "$s1.matches",
+             "args": {"anchor": "$item.a", "before": 1, "after": 1}},
+        ],
+    ),
+    Task(
+        "overview",
+        "Show the outline and where ISO 27001 and disaster recovery are mentioned.",
+        [
+            {"id": "s1", "tool": "get_document_outline", "args": {}},
+            {"id": "s2", "tool": "search_document", "args": {"query": "ISO 27001"}},
+            {"id": "s3", "tool": "search_document", "args": {"query": "disaster recovery"}},
+        ],
+    ),
+    Task(
+        "uptime",
+        "Read every paragraph that promises an uptime of 99.9%.",
+        [
+            {"id": "s1", "tool": "search_document", "args": {"query": "uptime of 99.9%"}},
+            {"id": "s2", "tool": "get_paragraphs", "args": {"anchors": "$s1.matches.*.a"}},
+        ],
+    ),
+]
+
+
+class ScriptedModel:
+    """Stand-in chat model that makes a task's tool calls after a fixed latency."""
+
+    def __init__(self, task: Task, mode: str, latency: float):
+        """Script ``task`` for the graph run in ``mode``, answering after ``latency`` seconds."""
+        self.task = task
+        self.mode = mode
+        self.latency = latency
+        self.plan = planner.new_plan(task.steps)
+        self.queue: List[Dict[str, Any]] = []
+        self.calls = 0
+
+    async def ainvoke(self, messages: List[Any], **kwargs: Any) -> AIMessage:
+        """Return the next tool calls of the script, or the answer once they are done."""
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.mode == "plan":
+            planned = any(
+                c["name"] == planner.Plan.__name__
+                for m in messages
+                if isinstance(m, AIMessage)
+                for c in m.tool_calls
+            )
+            if planned:
+                return AIMessage(content="Here is what I found.")
+            call = {"name": planner.Plan.__name__, "args": {"steps": self.task.steps}, "id": "plan_1"}
+            return AIMessage(content="", tool_calls=[call])
+        # ReAct: the same steps, a wave at a time or one tool call per model call
+        planner.record_results(self.plan, messages)
+        if not self.queue:
+            self.queue = planner.next_wave(self.plan)
+        if not self.queue:
+            return AIMessage(content="Here is what I found.")
+        count = len(self.queue) if self.mode == "react-batch" else 1
+        calls, self.queue = self.queue[:count], self.queue[count:]
+        return AIMessage(content="", tool_calls=calls)
+
+
+class CallCounter(AsyncCallbackHandler):
+    """Count the chat model calls of a graph run."""
+
+    def __init__(self) -> None:
+        """Start counting from zero."""
+        self.calls = 0
+
+    async def on_chat_model_start(self, *args: Any, **kwargs: Any) -> None:
+        """Count one model call."""
+        self.calls += 1
+
+
+async def _run(mode: str, task: Task, model: Optional[str], latency: float) -> Dict[str, Any]:
+    module = planner if mode == "plan" else react_graph
+    counter = CallCounter()
+    scripted = None
+    original = module.get_bound_model
+    if model is None:
+        scripted = ScriptedModel(task, mode, latency)
+        module.get_bound_model = lambda *args: scripted
+    try:
+        context = Context(fast_commands=False, **({"model": model} if model else {}))
+        start = time.perf_counter()
+        result = await module.builder.compile().ainvoke(
+            {"messages": [("user", task.prompt)]},
+            config={"callbacks": [counter], "recursion_limit": 200},
+            context=context,
+        )
+        wall = time.perf_counter() - start
+    finally:
+        module.get_bound_model = original
+    return {
+        "task": task.name,
+        "mode": mode,
+        # The scripted model is not a chat model, so no callbacks fire for it
+        "llm_calls": scripted.calls if scripted is not None else counter.calls,
+        "tool_calls": sum(
+            1 for m in result["messages"]
+            if isinstance(m, ToolMessage) and m.name != planner.Plan.__name__
+        ),
+        "wall_s": round(wall, 3),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, default=2000)
+    parser.add_argument("--model", help="provider/model to call; scripted if not given")
+    parser.add_argument("--latency", type=float, default=1.0, help="seconds per scripted model call")
+    parser.add_argument("--tasks", nargs="+", choices=[t.name for t in TASKS])
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    work_dir = Path(tempfile.mkdtemp(prefix="docx-agent-modes-"))
+    try:
+        source = generate_docx(work_dir / "proposal.docx", SyntheticDocxSpec(paragraphs=args.paragraphs))
+        results = []
+        # A real model decides itself whether to batch its tool calls
+        modes = ("react", "plan") if args.model else ("react", "react-batch", "plan")
+        print(f"{'task':<10} {'mode':<11} {'llm calls':>9} {'tool calls':>10} {'wall':>8}")
+        for task in TASKS:
+            if args.tasks and task.name not in args.tasks:
+                continue
+            for mode in modes:
+                path = shutil.copy(source, work_dir / f"{task.name}-{mode}.docx")
+                docx_manager.reset_docx_manager()
+                asyncio.run(docx_manager.get_docx_manager(str(path))._ensure_index_loaded())
+                record = asyncio.run(_run(mode, task, args.model, args.latency))
+                results.append(record)
+                print(
+                    f"{task.name:<10} {mode:<11} {record['llm_calls']:>9} "
+                    f"{record['tool_calls']:>10} {record['wall_s']:>7.2f}s"
+                )
+        docx_manager.reset_docx_manager()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Benchmark heading detection over synthetic paragraph text.
+
+Compares the keyword scan DocxIndexer used before HeadingClassifier (one
+substring search per keyword) with HeadingClassifier's keyword automaton, for
+growing keyword lists. Only heading detection is timed; no DOCX is parsed.
+
+Usage::
+
+    python -m benchmarks.bench_headings --paragraphs 100000 --keywords 4 64 256 1024
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.synthetic_docx import _SECTION_TITLES, _TERMS, _WORDS
+from react_agent.heading_rules import HeadingClassifier, HeadingRules
+
+
+def synthetic_paragraphs(count: int, seed: int = 0) -> List[str]:
+    """Return ``count`` paragraph texts with a sprinkling of headings."""
+    rng = random.Random(seed)
+    paragraphs = []
+    for i in range(count):
+        if i % 30 == 0:
+            paragraphs.append(f"{i // 30 + 1}. {rng.choice(_SECTION_TITLES)}")
+        elif i % 97 == 0:
+            paragraphs.append(rng.choice(_SECTION_TITLES).upper())
+        else:
+            words = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 40)))
+            if rng.random() < 0.05:
+                words += f" including the {rng.choice(_TERMS)}"
+            paragraphs.append(words.capitalize() + ".")
+    return paragraphs
+
+
+def keyword_list(size: int, seed: int = 0) -> Dict[str, int]:
+    """Return the default English keywords padded with made-up ones to ``size``."""
+    rng = random.Random(seed)
+    keywords = dict(HeadingRules().keywords["en"])
+    letters = "abcdefghijklmnopqrstuvwxyzäöüéè"
+    while len(keywords) < size:
+        word = "".join(rng.choice(letters) for _ in range(rng.randint(5, 12)))
+        keywords[f"{word} {rng.choice(_WORDS)}"] = 2
+    return keywords
+
+
+def legacy_detector(keywords: Dict[str, int]) -> Callable[[str], Optional[int]]:
+    """Return the pre-classifier heuristic, with its keyword list swapped in."""
+    heading_keywords = list(keywords)
+
+    def detect(text: str) -> Optional[int]:
+        if not text or not text.strip():
+            return None
+        text = text.strip()
+        if re.match(r'^\d+(\.\d+)*\.?\s+', text):
+            dots = text.split()[0].count('.')
+            return min(dots + 1, 6)
+        if text.isupper() and len(text.split()) <= 10:
+            return 1
+        if any(keyword in text.lower() for keyword in heading_keywords):
+            return 2
+        return None
+
+    return detect
+
+
+def _time(detect: Callable[[str], Optional[int]], paragraphs: List[str]) -> float:
+    start = time.perf_counter()
+    for text in paragraphs:
+        detect(text)
+    return time.perf_counter() - start
+
+
+def main(argv: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, default=100_000)
+    parser.add_argument("--keywords", type=int, nargs="+", default=[4, 16, 64, 256, 1024])
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    paragraphs = synthetic_paragraphs(args.paragraphs)
+    results = []
+    print(f"{'keywords':>8} {'legacy':>9} {'automaton':>10} {'build':>8}")
+    for size in args.keywords:
+        keywords = keyword_list(size)
+        start = time.perf_counter()
+        classifier = HeadingClassifier(
+            HeadingRules(keywords={"en": keywords}, languages=["en"])
+        )
+        build = time.perf_counter() - start
+        legacy = legacy_detector(keywords)
+        assert [legacy(t) for t in paragraphs] == [classifier.level(t) for t in paragraphs]
+        record = {
+            "paragraphs": args.paragraphs,
+            "keywords": size,
+            "legacy_s": _time(legacy, paragraphs),
+            "automaton_s": _time(classifier.level, paragraphs),
+            "build_s": build,
+        }
+        results.append(record)
+        print(
+            f"{size:>8} {record['legacy_s']:>8.3f}s {record['automaton_s']:>9.3f}s "
+            f"{record['build_s']:>7.3f}s"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""Benchmark DocxIndexer and DocxManager on synthetic documents.
+
+For each document size the benchmark runs in a fresh process and records, per
+operation, wall time, peak RSS and Python allocations (via ``tracemalloc``).
+Results are written as JSON together with the git commit they were taken at,
+so two runs can be compared with ``--compare``.
+
+Usage::
+
+    python -m benchmarks.bench_indexer --sizes 1000 10000 --output before.json
+    python -m benchmarks.bench_indexer --sizes 1000 10000 --compare before.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.synthetic_docx import DEFAULT_SIZES, SyntheticDocxSpec, generate_docx
+from react_agent.docx_indexer import PROFILES
+
+# Operations cheap enough to repeat; the reported wall time is the median.
+REPEATED_OPERATIONS = {"find_by_text", "find_by_anchor", "get_outline"}
+
+
+@dataclass
+class BenchContext:
+    """State shared by the operations of one document size."""
+
+    docx_path: Path
+    work_dir: Path
+    profile: str = "body"
+    workers: int = 1
+    indexer: Any = None
+    manager: Any = None
+    paragraphs: List[Dict[str, Any]] = field(default_factory=list)
+    edits: int = 0
+
+
+def _op_index(ctx: BenchContext) -> Any:
+    from react_agent.docx_indexer import DocxIndexer
+
+    ctx.indexer = DocxIndexer(str(ctx.docx_path), profile=ctx.profile)
+    ctx.paragraphs = ctx.indexer.index(workers=ctx.workers)
+    return len(ctx.paragraphs)
+
+
+def _op_find_by_text(ctx: BenchContext) -> Any:
+    return len(ctx.indexer.find_by_text("service level agreement"))
+
+
+def _op_find_by_anchor(ctx: BenchContext) -> Any:
+    # The last paragraph is the worst case for a positional lookup.
+    return ctx.indexer.find_by_anchor(ctx.paragraphs[-1]["anchor"]) is not None
+
+
+def _op_get_outline(ctx: BenchContext) -> Any:
+    return len(ctx.indexer.get_outline())
+
+
+def _op_save_index(ctx: BenchContext) -> Any:
+    output = ctx.work_dir / "index.json"
+    ctx.indexer.save_index(str(output))
+    return output.stat().st_size
+
+
+def _prepare_update(ctx: BenchContext) -> None:
+    from react_agent.docx_manager import DocxManager
+
+    target = ctx.work_dir / ctx.docx_path.name
+    shutil.copyfile(ctx.docx_path, target)
+    ctx.manager = DocxManager(str(target), profile=ctx.profile, index_workers=ctx.workers)
+    ctx.manager._refresh_index()
+
+
+def _op_update_paragraph(ctx: BenchContext) -> Any:
+    data = ctx.manager.index_data
+    # Edit a plain paragraph in the middle of the document.
+    middle = len(data) // 2
+    candidates = data[middle:] + data[:middle]
+    paragraph = next(
+        p for p in candidates if p["style"] == "Normal" and not p["text"].startswith("-")
+    )
+    ctx.edits += 1
+    return ctx.manager.update_paragraph(
+        paragraph["anchor"], f"Benchmark edit {ctx.edits}: {paragraph['text']}"
+    )
+
+
+OPERATIONS: Dict[str, Callable[[BenchContext], Any]] = {
+    "index": _op_index,
+    "find_by_text": _op_find_by_text,
+    "find_by_anchor": _op_find_by_anchor,
+    "get_outline": _op_get_outline,
+    "save_index": _op_save_index,
+    "update_paragraph": _op_update_paragraph,
+}
+
+# Setup hooks run (unmeasured) before the operation they are keyed by.
+SETUP: Dict[str, Callable[[BenchContext], None]] = {
+    "update_paragraph": _prepare_update,
+}
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the kernel's high-water mark for this process (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mib() -> float:
+    """Return the peak resident set size of this process in MiB."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB elsewhere.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _measure(
+    name: str, ctx: BenchContext, repeat: int, allocations: bool
+) -> Dict[str, Any]:
+    operation = OPERATIONS[name]
+    if name in SETUP:
+        SETUP[name](ctx)
+
+    timings = []
+    gc.collect()
+    rss_is_per_op = _reset_peak_rss()
+    result = None
+    for _ in range(repeat if name in REPEATED_OPERATIONS else 1):
+        start = time.perf_counter()
+        result = operation(ctx)
+        timings.append(time.perf_counter() - start)
+    record: Dict[str, Any] = {
+        "operation": name,
+        "wall_s": statistics.median(timings),
+        "wall_min_s": min(timings),
+        "runs": len(timings),
+        "peak_rss_mib": round(_peak_rss_mib(), 2),
+        "peak_rss_is_per_operation": rss_is_per_op,
+        "result": result,
+    }
+
+    if allocations:
+        # A separate pass, because tracing slows the operation down.
+        if name in SETUP:
+            SETUP[name](ctx)
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        operation(ctx)
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        stats = after.compare_to(before, "filename")
+        record["alloc_peak_mib"] = round(peak / (1024 * 1024), 3)
+        record["alloc_retained_mib"] = round(sum(s.size_diff for s in stats) / (1024 * 1024), 3)
+        record["alloc_retained_blocks"] = sum(s.count_diff for s in stats)
+    return record
+
+
+def bench_document(
+    docx_path: str,
+    operations: List[str],
+    repeat: int,
+    allocations: bool,
+    profile: str,
+    workers: int = 1,
+) -> List[Dict[str, Any]]:
+    """Run the selected operations on one document and return their records."""
+    with tempfile.TemporaryDirectory(prefix="docx-bench-") as work_dir:
+        ctx = BenchContext(
+            docx_path=Path(docx_path), work_dir=Path(work_dir), profile=profile, workers=workers
+        )
+        # Every other operation needs the index, so it always runs first.
+        if "index" not in operations:
+            _op_index(ctx)
+        return [_measure(name, ctx, repeat, allocations) for name in operations]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _document_for(size: int, docs_dir: Path, spec_args: Dict[str, Any]) -> Path:
+    spec = SyntheticDocxSpec(paragraphs=size, **spec_args)
+    suffix = "-".join(f"{k}{v}" for k, v in sorted(spec_args.items()))
+    path = docs_dir / f"synthetic_{size}{'-' + suffix if suffix else ''}.docx"
+    if not path.exists():
+        generate_docx(path, spec)
+    return path
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> str:
+    """Return a table comparing two result files."""
+    old = {(r["paragraphs"], r["operation"]): r for r in baseline["results"]}
+    lines = [
+        f"baseline {baseline['meta'].get('commit')} -> current {current['meta'].get('commit')}",
+        f"{'paragraphs':>10} {'operation':<18} {'wall':>10} {'ratio':>7} {'peak rss':>10} {'delta':>9}",
+    ]
+    for r in current["results"]:
+        before = old.get((r["paragraphs"], r["operation"]))
+        if before is None:
+            continue
+        ratio = r["wall_s"] / before["wall_s"] if before["wall_s"] else float("nan")
+        delta = r["peak_rss_mib"] - before["peak_rss_mib"]
+        lines.append(
+            f"{r['paragraphs']:>10} {r['operation']:<18} {r['wall_s']:>9.4f}s "
+            f"{ratio:>6.2f}x {r['peak_rss_mib']:>8.1f}Mi {delta:>+8.1f}Mi"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--operations", nargs="+", choices=list(OPERATIONS), default=list(OPERATIONS))
+    parser.add_argument("--repeat", type=int, default=5, help="runs of cheap operations")
+    parser.add_argument("--no-allocations", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--image-kib", type=int, default=SyntheticDocxSpec.image_kib)
+    parser.add_argument("--profile", choices=PROFILES, default="body", help="indexing profile")
+    parser.add_argument("--workers", type=int, default=1, help="processes used by index()")
+    parser.add_argument(
+        "--docs-dir",
+        type=Path,
+        default=Path(tempfile.gettempdir()) / "docx-agent-bench",
+        help="where generated documents are cached",
+    )
+    parser.add_argument("--output", type=Path, default=Path("bench_indexer.json"))
+    parser.add_argument("--compare", type=Path, help="previous result file to compare against")
+    args = parser.parse_args(argv)
+
+    spec_args = {}
+    if args.image_kib != SyntheticDocxSpec.image_kib:
+        spec_args["image_kib"] = args.image_kib
+
+    results: List[Dict[str, Any]] = []
+    for size in args.sizes:
+        path = _document_for(size, args.docs_dir, spec_args)
+        print(f"Benchmarking {path.name} ({path.stat().st_size / 1024:.0f} KiB)...")
+        # A fresh process per size keeps peak RSS from leaking between sizes.
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            records = pool.submit(
+                bench_document,
+                str(path),
+                args.operations,
+                args.repeat,
+                not args.no_allocations,
+                args.profile,
+                args.workers,
+            ).result()
+        for record in records:
+            record.update(paragraphs=size, docx_bytes=path.stat().st_size)
+            print(
+                f"  {record['operation']:<18} {record['wall_s']:>9.4f}s "
+                f"peak rss {record['peak_rss_mib']:>8.1f} MiB"
+            )
+        results.extend(records)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(tz=UTC).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "image_kib": args.image_kib,
+            "profile": args.profile,
+            "workers": args.workers,
+        },
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        print(compare(report, json.loads(args.compare.read_text())))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,492 @@
+"""Generate synthetic DOCX files that look like real RFP responses.
+
+The generator writes the OOXML parts straight into the zip archive as a stream,
+so a 500k-paragraph document can be produced without holding it in memory the
+way python-docx would. Documents contain numbered headings (styled and
+numbered in the text, like most proposals), bullet lists, tables with nested
+tables, embedded images, multi-run paragraphs, a header, a footer, footnotes
+and comments.
+"""
+
+from __future__ import annotations
+
+import random
+import struct
+import zipfile
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Tuple
+from xml.sax.saxutils import escape
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+W14_NS = "http://schemas.microsoft.com/office/word/2010/wordml"
+WP_NS = "http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing"
+A_NS = "http://schemas.openxmlformats.org/drawingml/2006/main"
+PIC_NS = "http://schemas.openxmlformats.org/drawingml/2006/picture"
+REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+DOC_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+XML_DECL = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+PART_NS = (
+    f'xmlns:w="{W_NS}" xmlns:r="{R_NS}" xmlns:w14="{W14_NS}" '
+    f'xmlns:wp="{WP_NS}" xmlns:a="{A_NS}" xmlns:pic="{PIC_NS}"'
+)
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 500_000)
+
+_WORDS = (
+    "the", "solution", "platform", "service", "delivery", "team", "client",
+    "requirements", "response", "compliance", "security", "availability",
+    "migration", "support", "integration", "architecture", "data", "cloud",
+    "governance", "reporting", "monitoring", "escalation", "onboarding",
+    "will", "provide", "ensure", "deliver", "maintain", "within", "across",
+    "all", "our", "proposed", "dedicated", "managed", "quarterly", "annual",
+    "and", "with", "for", "of", "to", "a", "in", "by", "on",
+)
+_TERMS = (
+    "service level agreement", "Acme Corporation", "disaster recovery",
+    "ISO 27001", "penalty clause", "uptime of 99.9%",
+)
+_SECTION_TITLES = (
+    "Introduction", "Executive Summary", "Scope of Work", "Technical Approach",
+    "Solution Architecture", "Implementation Plan", "Service Levels",
+    "Security and Compliance", "Pricing", "Team Structure", "Risk Management",
+    "Governance", "Transition Plan", "Assumptions", "Conclusion",
+)
+
+
+@dataclass
+class SyntheticDocxSpec:
+    """Shape of a synthetic document.
+
+    ``paragraphs`` counts every ``w:p`` written to the body, including the
+    paragraphs inside table cells and image paragraphs.
+    """
+
+    paragraphs: int
+    seed: int = 0
+    section_size: int = 30
+    bullet_every: int = 9
+    table_every: int = 40
+    nested_table_every: int = 3
+    image_every: int = 250
+    image_count: int = 12
+    image_kib: int = 256
+    footnote_every: int = 400
+    comment_every: int = 600
+
+
+class _BodyWriter:
+    """Emit body XML for a spec, tracking counters shared between blocks."""
+
+    def __init__(self, spec: SyntheticDocxSpec, image_rids: List[str]):
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        self.image_rids = image_rids
+        self.written = 0
+        self.numbering = [0, 0, 0]
+        self.sections = 0
+        self.tables = 0
+        self.images = 0
+        self.footnotes: List[str] = []
+        self.comments: List[str] = []
+
+    def _para_id(self) -> str:
+        # Word keeps paraIds below 0x80000000.
+        return f"{(self.written + 1) & 0x7FFFFFFF:08X}"
+
+    def _sentence(self, words: int) -> str:
+        pick = self.rng.choice
+        text = " ".join(pick(_WORDS) for _ in range(words))
+        if self.rng.random() < 0.05:
+            text += f" including the {pick(_TERMS)}"
+        return text[0].upper() + text[1:] + "."
+
+    def _paragraph(self, runs: str, ppr: str = "") -> str:
+        xml = (
+            f'<w:p w14:paraId="{self._para_id()}" w14:textId="77777777">'
+            f"{ppr}{runs}</w:p>"
+        )
+        self.written += 1
+        return xml
+
+    @staticmethod
+    def _run(text: str, rpr: str = "") -> str:
+        return f'<w:r>{rpr}<w:t xml:space="preserve">{escape(text)}</w:t></w:r>'
+
+    def heading(self) -> str:
+        """Return a numbered, styled heading paragraph."""
+        self.sections += 1
+        if self.sections % 12 == 1:
+            level = 1
+        elif self.sections % 3 == 1:
+            level = 2
+        else:
+            level = 3
+        self.numbering[level - 1] += 1
+        for deeper in range(level, 3):
+            self.numbering[deeper] = 0
+        number = ".".join(str(n or 1) for n in self.numbering[:level])
+        if level == 1:
+            number += "."
+        title = _SECTION_TITLES[self.sections % len(_SECTION_TITLES)]
+        # Some second-level headings use a custom style that inherits from Heading2.
+        style = f"Heading{level}"
+        if level == 2 and self.sections % 2 == 0:
+            style = "ProposalHeading"
+        ppr = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>'
+        return self._paragraph(self._run(f"{number} {title}"), ppr)
+
+    def body_paragraph(self) -> str:
+        """Return a normal paragraph, sometimes with bold runs, notes or comments."""
+        spec = self.spec
+        runs = self._run(self._sentence(self.rng.randint(8, 30)))
+        if self.rng.random() < 0.3:
+            runs += self._run(" " + self._sentence(3), "<w:rPr><w:b/></w:rPr>")
+            runs += self._run(" " + self._sentence(6))
+        number = self.written + 1
+        if spec.footnote_every and number % spec.footnote_every == 0:
+            note_id = len(self.footnotes) + 1
+            self.footnotes.append(f"Source: internal benchmark data, note {note_id}.")
+            runs += (
+                '<w:r><w:rPr><w:rStyle w:val="FootnoteReference"/></w:rPr>'
+                f'<w:footnoteReference w:id="{note_id}"/></w:r>'
+            )
+        if spec.comment_every and number % spec.comment_every == 0:
+            comment_id = len(self.comments)
+            self.comments.append(f"Please confirm this commitment ({comment_id}).")
+            runs = (
+                f'<w:commentRangeStart w:id="{comment_id}"/>{runs}'
+                f'<w:commentRangeEnd w:id="{comment_id}"/>'
+                f'<w:r><w:commentReference w:id="{comment_id}"/></w:r>'
+            )
+        return self._paragraph(runs)
+
+    def bullets(self) -> str:
+        """Return a short bullet list with an occasional nested item."""
+        items = []
+        for i in range(self.rng.randint(3, 6)):
+            level = 1 if i and self.rng.random() < 0.25 else 0
+            ppr = (
+                '<w:pPr><w:pStyle w:val="ListBullet"/>'
+                f'<w:numPr><w:ilvl w:val="{level}"/><w:numId w:val="1"/></w:numPr></w:pPr>'
+            )
+            items.append(self._paragraph(self._run(self._sentence(6)), ppr))
+        return "".join(items)
+
+    def _table(self, rows: int, cols: int, nested: bool) -> str:
+        grid = "".join('<w:gridCol w:w="2000"/>' for _ in range(cols))
+        xml = [
+            '<w:tbl><w:tblPr><w:tblStyle w:val="TableGrid"/>'
+            f'<w:tblW w:w="0" w:type="auto"/></w:tblPr><w:tblGrid>{grid}</w:tblGrid>'
+        ]
+        for r in range(rows):
+            xml.append("<w:tr>")
+            for c in range(cols):
+                xml.append('<w:tc><w:tcPr><w:tcW w:w="2000" w:type="dxa"/></w:tcPr>')
+                if r == 0:
+                    header = self._run(f"Column {c + 1}", "<w:rPr><w:b/></w:rPr>")
+                    xml.append(self._paragraph(header))
+                else:
+                    xml.append(self._paragraph(self._run(self._sentence(4))))
+                if nested and r == rows - 1 and c == cols - 1:
+                    # A cell must end with a paragraph, even after a nested table.
+                    xml.append(self._table(2, 2, nested=False))
+                    xml.append(self._paragraph(""))
+                xml.append("</w:tc>")
+            xml.append("</w:tr>")
+        xml.append("</w:tbl>")
+        return "".join(xml)
+
+    def table(self) -> str:
+        """Return a table; every few tables contain a nested table."""
+        self.tables += 1
+        nested = self.tables % self.spec.nested_table_every == 0
+        return self._table(self.rng.randint(3, 5), 3, nested)
+
+    def image(self) -> str:
+        """Return an inline image paragraph followed by its caption."""
+        self.images += 1
+        rid = self.image_rids[self.images % len(self.image_rids)]
+        drawing = (
+            '<w:r><w:drawing><wp:inline><wp:extent cx="5486400" cy="3200400"/>'
+            f'<wp:docPr id="{self.images}" name="Diagram {self.images}"/>'
+            f'<a:graphic><a:graphicData uri="{PIC_NS}"><pic:pic>'
+            f'<pic:nvPicPr><pic:cNvPr id="{self.images}" name="diagram.png"/>'
+            "<pic:cNvPicPr/></pic:nvPicPr>"
+            f'<pic:blipFill><a:blip r:embed="{rid}"/><a:stretch><a:fillRect/></a:stretch>'
+            "</pic:blipFill><pic:spPr><a:xfrm><a:off x=\"0\" y=\"0\"/>"
+            '<a:ext cx="5486400" cy="3200400"/></a:xfrm>'
+            '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></pic:spPr>'
+            "</pic:pic></a:graphicData></a:graphic></wp:inline></w:drawing></w:r>"
+        )
+        caption = self._run(f"Figure {self.images}: Solution architecture overview")
+        return self._paragraph(drawing) + self._paragraph(
+            caption, '<w:pPr><w:pStyle w:val="Caption"/></w:pPr>'
+        )
+
+    def blocks(self) -> Iterator[str]:
+        """Yield body blocks until the requested paragraph count is reached."""
+        spec = self.spec
+        target = spec.paragraphs
+        since_heading = spec.section_size
+        next_table = spec.table_every
+        next_image = spec.image_every
+        while self.written < target:
+            if since_heading >= spec.section_size:
+                since_heading = 0
+                yield self.heading()
+            elif self.image_rids and self.written >= next_image:
+                next_image += spec.image_every
+                yield self.image()
+            elif self.written >= next_table:
+                next_table += spec.table_every
+                yield self.table()
+            elif self.rng.randrange(spec.bullet_every) == 0:
+                yield self.bullets()
+            else:
+                yield self.body_paragraph()
+            since_heading += 1
+
+
+def _png(width: int, height: int, rng: random.Random) -> bytes:
+    """Return a grayscale PNG filled with noise, so it does not compress."""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    raw = b"".join(b"\x00" + rng.randbytes(width) for _ in range(height))
+    header = struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(raw, 1))
+        + chunk(b"IEND", b"")
+    )
+
+
+def _relationships(rels: List[Tuple[str, str, str]]) -> str:
+    body = "".join(
+        f'<Relationship Id="{rid}" Type="{kind}" Target="{target}"/>'
+        for rid, kind, target in rels
+    )
+    return f'{XML_DECL}<Relationships xmlns="{REL_NS}">{body}</Relationships>'
+
+
+def _styles() -> str:
+    def style(style_id: str, name: str, extra: str = "", kind: str = "paragraph") -> str:
+        return (
+            f'<w:style w:type="{kind}" w:styleId="{style_id}">'
+            f'<w:name w:val="{name}"/>{extra}</w:style>'
+        )
+
+    headings = "".join(
+        style(
+            f"Heading{level}",
+            f"heading {level}",
+            '<w:basedOn w:val="Normal"/><w:next w:val="Normal"/>'
+            f'<w:pPr><w:keepNext/><w:outlineLvl w:val="{level - 1}"/></w:pPr>'
+            "<w:rPr><w:b/></w:rPr>",
+        )
+        for level in (1, 2, 3)
+    )
+    return (
+        f"{XML_DECL}<w:styles {PART_NS}>"
+        + style("Normal", "Normal")
+        + headings
+        + style("ProposalHeading", "Proposal Heading", '<w:basedOn w:val="Heading2"/>')
+        + style("ListBullet", "List Bullet", '<w:basedOn w:val="Normal"/>')
+        + style("Caption", "caption", '<w:basedOn w:val="Normal"/>')
+        + style("TableGrid", "Table Grid", "", kind="table")
+        + style("FootnoteReference", "footnote reference", "", kind="character")
+        + "</w:styles>"
+    )
+
+
+def _numbering() -> str:
+    levels = "".join(
+        f'<w:lvl w:ilvl="{i}"><w:start w:val="1"/><w:numFmt w:val="bullet"/>'
+        f'<w:lvlText w:val="{ch}"/><w:pPr><w:ind w:left="{720 * (i + 1)}" '
+        'w:hanging="360"/></w:pPr></w:lvl>'
+        for i, ch in enumerate(("•", "o"))
+    )
+    return (
+        f"{XML_DECL}<w:numbering {PART_NS}>"
+        f'<w:abstractNum w:abstractNumId="0">{levels}</w:abstractNum>'
+        '<w:num w:numId="1"><w:abstractNumId w:val="0"/></w:num>'
+        "</w:numbering>"
+    )
+
+
+def _header_footer(tag: str, text: str) -> str:
+    return (
+        f"{XML_DECL}<w:{tag} {PART_NS}><w:p><w:r><w:t xml:space=\"preserve\">"
+        f"{escape(text)}</w:t></w:r></w:p></w:{tag}>"
+    )
+
+
+def _notes(footnotes: List[str]) -> str:
+    separators = (
+        '<w:footnote w:type="separator" w:id="-1"><w:p><w:r><w:separator/></w:r></w:p></w:footnote>'
+        '<w:footnote w:type="continuationSeparator" w:id="0"><w:p><w:r>'
+        "<w:continuationSeparator/></w:r></w:p></w:footnote>"
+    )
+    notes = "".join(
+        f'<w:footnote w:id="{i}"><w:p><w:r><w:t xml:space="preserve">{escape(text)}'
+        "</w:t></w:r></w:p></w:footnote>"
+        for i, text in enumerate(footnotes, start=1)
+    )
+    return f"{XML_DECL}<w:footnotes {PART_NS}>{separators}{notes}</w:footnotes>"
+
+
+def _comments(comments: List[str]) -> str:
+    body = "".join(
+        f'<w:comment w:id="{i}" w:author="Reviewer" w:initials="RV"><w:p><w:r>'
+        f'<w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p></w:comment>'
+        for i, text in enumerate(comments)
+    )
+    return f"{XML_DECL}<w:comments {PART_NS}>{body}</w:comments>"
+
+
+def generate_docx(path: str | Path, spec: SyntheticDocxSpec) -> Path:
+    """Write a synthetic document described by ``spec`` to ``path``.
+
+    Args:
+        path: Destination file. Parent directories are created if needed.
+        spec: Shape of the document to generate.
+
+    Returns:
+        The path of the written file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(spec.seed)
+
+    image_count = spec.image_count if spec.image_every else 0
+    image_rids = [f"rIdImg{i}" for i in range(1, image_count + 1)]
+    side = max(16, int((spec.image_kib * 1024) ** 0.5))
+    writer = _BodyWriter(spec, image_rids)
+
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for i in range(1, image_count + 1):
+            # Media is stored, as Word does for already-compressed formats.
+            zf.writestr(
+                zipfile.ZipInfo(f"word/media/image{i}.png"),
+                _png(side, side, rng),
+                compress_type=zipfile.ZIP_STORED,
+            )
+
+        with zf.open("word/document.xml", "w", force_zip64=True) as part:
+            part.write(f"{XML_DECL}<w:document {PART_NS}><w:body>".encode())
+            pending: List[str] = []
+            for block in writer.blocks():
+                pending.append(block)
+                if len(pending) >= 512:
+                    part.write("".join(pending).encode())
+                    pending.clear()
+            pending.append(
+                '<w:sectPr><w:headerReference w:type="default" r:id="rIdHeader1"/>'
+                '<w:footerReference w:type="default" r:id="rIdFooter1"/>'
+                '<w:pgSz w:w="12240" w:h="15840"/></w:sectPr></w:body></w:document>'
+            )
+            part.write("".join(pending).encode())
+
+        doc_rels = [
+            ("rIdStyles", f"{DOC_REL}/styles", "styles.xml"),
+            ("rIdNumbering", f"{DOC_REL}/numbering", "numbering.xml"),
+            ("rIdHeader1", f"{DOC_REL}/header", "header1.xml"),
+            ("rIdFooter1", f"{DOC_REL}/footer", "footer1.xml"),
+            ("rIdFootnotes", f"{DOC_REL}/footnotes", "footnotes.xml"),
+            ("rIdComments", f"{DOC_REL}/comments", "comments.xml"),
+        ] + [
+            (rid, f"{DOC_REL}/image", f"media/image{i}.png")
+            for i, rid in enumerate(image_rids, start=1)
+        ]
+        zf.writestr("word/_rels/document.xml.rels", _relationships(doc_rels))
+        zf.writestr("word/styles.xml", _styles())
+        zf.writestr("word/numbering.xml", _numbering())
+        zf.writestr(
+            "word/header1.xml", _header_footer("hdr", "RFP-2024-0042 | Confidential")
+        )
+        zf.writestr(
+            "word/footer1.xml", _header_footer("ftr", "Company Confidential - Do not distribute")
+        )
+        zf.writestr("word/footnotes.xml", _notes(writer.footnotes))
+        zf.writestr("word/comments.xml", _comments(writer.comments))
+        zf.writestr(
+            "docProps/core.xml",
+            f"{XML_DECL}<cp:coreProperties "
+            'xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+            'xmlns:dc="http://purl.org/dc/elements/1.1/">'
+            f"<dc:title>Synthetic proposal ({spec.paragraphs} paragraphs)</dc:title>"
+            "</cp:coreProperties>",
+        )
+        zf.writestr(
+            "_rels/.rels",
+            _relationships(
+                [
+                    ("rId1", f"{DOC_REL}/officeDocument", "word/document.xml"),
+                    (
+                        "rId2",
+                        "http://schemas.openxmlformats.org/package/2006/relationships/"
+                        "metadata/core-properties",
+                        "docProps/core.xml",
+                    ),
+                ]
+            ),
+        )
+        zf.writestr("[Content_Types].xml", _content_types())
+    return path
+
+
+def _content_types() -> str:
+    wml = "application/vnd.openxmlformats-officedocument.wordprocessingml"
+    overrides = {
+        "/word/document.xml": f"{wml}.document.main+xml",
+        "/word/styles.xml": f"{wml}.styles+xml",
+        "/word/numbering.xml": f"{wml}.numbering+xml",
+        "/word/header1.xml": f"{wml}.header+xml",
+        "/word/footer1.xml": f"{wml}.footer+xml",
+        "/word/footnotes.xml": f"{wml}.footnotes+xml",
+        "/word/comments.xml": f"{wml}.comments+xml",
+        "/docProps/core.xml": "application/vnd.openxmlformats-package.core-properties+xml",
+    }
+    body = (
+        '<Default Extension="rels" '
+        'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Default Extension="png" ContentType="image/png"/>'
+        + "".join(
+            f'<Override PartName="{name}" ContentType="{kind}"/>'
+            for name, kind in overrides.items()
+        )
+    )
+    return (
+        f"{XML_DECL}<Types xmlns="
+        '"http://schemas.openxmlformats.org/package/2006/content-types">'
+        f"{body}</Types>"
+    )
+
+
+def main() -> None:
+    """Generate synthetic documents from the command line."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output_dir", type=Path)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--image-kib", type=int, default=SyntheticDocxSpec.image_kib)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        spec = SyntheticDocxSpec(paragraphs=size, seed=args.seed, image_kib=args.image_kib)
+        path = generate_docx(args.output_dir / f"synthetic_{size}.docx", spec)
+        print(f"{path} ({path.stat().st_size / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
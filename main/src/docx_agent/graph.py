@@ -7,7 +7,9 @@ editing and manipulation operations, making it importable anywhere.
 from langgraph.graph import StateGraph
 
 from react_agent.state import State, InputState
+from react_agent.commands import route_after_command, route_command
 from react_agent.context import Context
+from react_agent.history import compact_history
 from .nodes import (
     docx_logic, 
     docx_tools, 
@@ -30,12 +32,17 @@ def build_docx_graph() -> StateGraph:
     builder = StateGraph(State, input_schema=InputState, context_schema=Context)
 
     # Add DOCX-specific nodes
+    builder.add_node("route_command", route_command)
+    builder.add_node("compact_history", compact_history)
     builder.add_node("docx_logic", docx_logic)
     builder.add_node("approval_node", approval_node)
     builder.add_node("docx_tools", docx_tools())
 
-    # Set the entrypoint as docx_logic
-    builder.add_edge("__start__", "docx_logic")
+    # Set the entrypoint as route_command, which answers direct document
+    # commands itself; compact_history always runs before docx_logic
+    builder.add_edge("__start__", "route_command")
+    builder.add_conditional_edges("route_command", route_after_command)
+    builder.add_edge("compact_history", "docx_logic")
 
     # Add conditional edges for routing
     builder.add_conditional_edges(
@@ -48,8 +55,8 @@ def build_docx_graph() -> StateGraph:
         route_docx_approval,
     )
 
-    # Create a cycle: after using tools, return to docx_logic
-    builder.add_edge("docx_tools", "docx_logic")
+    # Create a cycle: after using tools, return to docx_logic through compact_history
+    builder.add_edge("docx_tools", "compact_history")
 
     # Compile and return the graph
     return builder.compile(name="DOCX Agent")
@@ -1,6 +1,5 @@
 """DOCX-specific nodes for the agent workflow."""
 
-from datetime import UTC, datetime
 from typing import Any, Dict, List, Literal
 
 from langchain_core.messages import AIMessage, ToolMessage
@@ -9,9 +8,17 @@ from langgraph.runtime import Runtime
 from langgraph.types import interrupt
 
 from react_agent.context import Context
+from react_agent.docx_manager import describe_open_document
+from react_agent.history import summary_prompt
+from react_agent.prompt_cache import (
+    assemble_prompt,
+    cache_kwargs,
+    coarse_time,
+    record_usage,
+)
 from react_agent.state import State
-from react_agent.tools import TOOLS
-from react_agent.utils import load_chat_model
+from react_agent.tools import AGENT_TOOLS
+from react_agent.utils import get_bound_model, tool_names
 
 
 async def docx_logic(
@@ -31,21 +38,32 @@ async def docx_logic(
     """
     try:
         # Initialize the model with DOCX tools
-        model = load_chat_model(runtime.context.model).bind_tools(TOOLS)
+        model = get_bound_model(runtime.context.model, AGENT_TOOLS)
 
         # Format the system prompt with DOCX-specific context
+        # The time is coarsened so the prompt prefix stays cacheable between calls.
         system_message = runtime.context.system_prompt.format(
-            system_time=datetime.now(tz=UTC).isoformat()
+            system_time=coarse_time(runtime.context.time_granularity)
         )
-
-        # Get the model's response focused on DOCX operations
-        response = await model.ainvoke(
-            [{"role": "system", "content": system_message}, *state.messages]
+        if state.summary:
+            system_message += "\n\n" + summary_prompt(
+                state.summary, runtime.context.history_max_tokens
+            )
+        provider = runtime.context.model.split("/", maxsplit=1)[0]
+        messages = assemble_prompt(
+            system_message, state.messages, provider, volatile=describe_open_document()
+        )
+        hints = cache_kwargs(
+            provider, runtime.context.model, tool_names(AGENT_TOOLS), system_message
         )
 
+        # Get the model's response
+        response = await model.ainvoke(messages, **hints)
+
         # Ensure we got an AIMessage
         if not isinstance(response, AIMessage):
             raise ValueError(f"Model returned {type(response).__name__}, expected AIMessage")
+        record_usage(response)
 
         # Handle the case when it's the last step and the model still wants to use a tool
         if state.is_last_step and response.tool_calls:
@@ -74,11 +92,19 @@ def docx_tools() -> ToolNode:
     Returns:
         ToolNode: Configured tool node for DOCX document manipulation
     """
-    return ToolNode(TOOLS)
+    return ToolNode(AGENT_TOOLS)
 
 
 # List of tools that require human approval (write operations)
-WRITE_TOOLS = {"apply_edit"}  # Add more write tools here as needed
+WRITE_TOOLS = {
+    "apply_edit",
+    "insert_paragraph",
+    "delete_paragraph",
+    "replace_all",
+    "undo_edit",
+    "redo_edit",
+    "restore_version",
+}  # Add more write tools here as needed
 
 
 def requires_approval(tool_name: str) -> bool:
@@ -0,0 +1,352 @@
+r"""Direct document commands, answered without the model.
+
+Messages such as "show outline", "search for pricing" or "get paragraph
+b.0.0.0.5" name one read-only tool and its arguments. route_command() runs
+first in the graph: when the user's message matches a command it calls the
+tool and answers from a template, saving the model call that would choose
+the tool and the one that would phrase its result. Anything else, and a
+command whose tool finds nothing, falls through to the agent.
+
+A command is a regular expression matched against the whole message,
+case-insensitively, after "please" and trailing punctuation are dropped;
+its named groups become tool arguments. ``DOCX_COMMANDS`` can name a JSON
+file of further commands, tried before the built-in ones::
+
+    {
+      "commands": [
+        {"name": "pricing", "pattern": "show (the )?pricing", "tool": "search_document",
+         "args": {"query": "price"}, "template": "Pricing clauses:\n{text}"}
+      ],
+      "disable": ["search"]
+    }
+
+``template`` is formatted with the tool result's top-level keys and
+``text``, the default rendering. Only read-only tools can be commands, so
+edits always go through the agent and its approval step. Hits, misses and
+the latency of hits are kept for get_command_metrics().
+"""
+
+import inspect
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Literal, Optional, Pattern, Tuple
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.runtime import Runtime
+
+from react_agent import tools
+from react_agent.context import Context
+from react_agent.docx_executor import LATENCY_SAMPLES, latency_summary
+from react_agent.state import State
+from react_agent.utils import get_message_text
+
+
+def _line(paragraph: Dict[str, Any]) -> str:
+    return f"[{paragraph['a']}] {paragraph['t']}"
+
+
+def _more(result: Dict[str, Any], what: str) -> str:
+    left = result.get("more", {}).get("remaining")
+    return f"\n… and {left} more {what}." if left else ""
+
+
+def _render_outline(result: Dict[str, Any]) -> str:
+    lines = [f"{'  ' * (h.get('h', 1) - 1)}- {h['t']} [{h['a']}]" for h in result["headings"]]
+    return f"The document has {result['count']} headings:\n" + "\n".join(lines) + _more(result, "headings")
+
+
+def _render_search(result: Dict[str, Any]) -> str:
+    lines = [f"- {_line(m)}" for m in result["matches"]]
+    return (
+        f"{result['count']} matches for \"{result['query']}\":\n" + "\n".join(lines)
+        + _more(result, "matches")
+    )
+
+
+def _render_paragraph(result: Optional[Dict[str, Any]]) -> str:
+    if result is None:
+        return "There is no paragraph at that anchor."
+    return f"{result['a']} ({result['bc']}):\n{result['t']}" if result.get("bc") else _line(result)
+
+
+def _render_context(result: Dict[str, Any]) -> str:
+    lines = [_line(p) for p in result["before"]]
+    lines.append(f"> {_line(result['paragraph'])}")
+    lines.extend(_line(p) for p in result["after"])
+    return "\n".join(lines)
+
+
+def _render_chunk(result: Dict[str, Any]) -> str:
+    lines = [p["t"] for p in result["paragraphs"]]
+    return f"Chunk {result['chunk']} of {result['count']}:\n" + "\n".join(lines) + _more(result, "paragraphs")
+
+
+def _render_chunks(result: Dict[str, Any]) -> str:
+    lines = [f"- chunk {c['i']}: {c['bc'] or c['a']} ({c['tokens']} tokens)" for c in result["chunks"]]
+    return f"The document is read in {result['count']} chunks:\n" + "\n".join(lines) + _more(result, "chunks")
+
+
+def _render_versions(result: Dict[str, Any]) -> str:
+    lines = [
+        f"- version {v['version']}: {v.get('timestamp', '')} {v.get('label') or ''}".rstrip()
+        for v in result["versions"]
+    ]
+    return f"{result['count']} saved versions:\n" + "\n".join(lines) + _more(result, "versions")
+
+
+# Read-only tools a command can run, with the default rendering of their results
+RENDERERS: Dict[str, Callable[[Any], str]] = {
+    "get_document_outline": _render_outline,
+    "search_document": _render_search,
+    "get_paragraph": _render_paragraph,
+    "get_context": _render_context,
+    "get_chunk": _render_chunk,
+    "iter_chunks": _render_chunks,
+    "list_versions": _render_versions,
+}
+TOOLS_BY_NAME: Dict[str, Callable[..., Any]] = {tool.__name__: tool for tool in tools.TOOLS}
+
+
+@dataclass
+class DocumentCommand:
+    """One direct command: a pattern, the tool it runs and how to answer."""
+
+    name: str
+    pattern: str
+    tool: str
+    # Arguments passed to the tool besides the pattern's named groups
+    args: Dict[str, Any] = field(default_factory=dict)
+    # str.format template over the result's keys and "text"; None sends "text"
+    template: Optional[str] = None
+    regex: Pattern[str] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        """Check that the command runs a read-only tool and compile its pattern."""
+        if self.tool not in RENDERERS:
+            raise ValueError(
+                f"Command {self.name!r} runs {self.tool!r}; commands can only run "
+                f"{', '.join(RENDERERS)}"
+            )
+        self.regex = re.compile(self.pattern, re.IGNORECASE)
+
+    def match(self, text: str) -> Optional[Dict[str, Any]]:
+        """Return the tool arguments if ``text`` is this command, else None."""
+        found = self.regex.fullmatch(text)
+        if found is None:
+            return None
+        args = dict(self.args)
+        parameters = inspect.signature(TOOLS_BY_NAME[self.tool]).parameters
+        for key, value in found.groupdict().items():
+            if value is None:
+                continue
+            if len(value) > 1 and value[0] == value[-1] and value[0] in "\"'":
+                value = value[1:-1]
+            if key == "anchor":
+                # Short anchors are lowercase, paragraph ids uppercase hex
+                value = value.lower() if "." in value else value.upper()
+            if key in parameters and parameters[key].annotation is int:
+                value = int(value)
+            args[key] = value
+        return args
+
+    def render(self, result: Any) -> str:
+        """Phrase the tool's result as the answer."""
+        if isinstance(result, dict) and result.get("success") is False:
+            return result.get("message", "The command failed.")
+        text = RENDERERS[self.tool](result)
+        if self.template is None:
+            return text
+        return self.template.format_map({**(result if isinstance(result, dict) else {}), "text": text})
+
+
+_ANCHOR = r"(?P<anchor>(?:b|h|f|fn|c)(?:\.\d+)+|[0-9a-f]{8})"
+# Words that make a "find ..." message a task for the agent rather than a search
+_TASK_WORDS = r"(?!.*\b(?:and|then|replace|change|edit|delete|insert|update|rewrite|shorten|summari[sz]e)\b)"
+
+DEFAULT_COMMANDS: List[DocumentCommand] = [
+    DocumentCommand(
+        "outline",
+        r"(?:(?:show|get|list|display)\s+)?(?:me\s+)?(?:the\s+)?(?:document\s+)?"
+        r"(?:outline|structure|headings|toc|table of contents)",
+        "get_document_outline",
+    ),
+    DocumentCommand(
+        "search",
+        # More than one word needs "for" or quotes: "find out who signed" is a task
+        _TASK_WORDS + r"(?:(?:search|find|look)\s+for\s+|(?:search|find)\s+(?=[\"']|[^\s\"']+$))"
+        r"(?P<query>\"[^\"]+\"|'[^']+'|[^\s\"']+(?:\s+[^\s\"']+){0,3})",
+        "search_document",
+    ),
+    DocumentCommand(
+        "paragraph", r"(?:get|show|read)\s+(?:me\s+)?(?:paragraph|para)\s+" + _ANCHOR, "get_paragraph"
+    ),
+    DocumentCommand(
+        "context", r"(?:(?:show|get)\s+)?(?:the\s+)?context\s+(?:of|around|for)\s+" + _ANCHOR, "get_context"
+    ),
+    DocumentCommand("chunk", r"(?:get|show|read)\s+chunk\s+(?P<index>\d+)", "get_chunk"),
+    DocumentCommand("chunks", r"(?:list|show)\s+(?:the\s+)?chunks", "iter_chunks"),
+    DocumentCommand("versions", r"(?:list|show)\s+(?:the\s+)?versions", "list_versions"),
+]
+
+
+class CommandRouter:
+    """Match messages against commands, in order, and track how often they hit."""
+
+    def __init__(self, commands: List[DocumentCommand]):
+        """Create a router trying ``commands`` in order."""
+        self.commands = commands
+        self._lock = threading.Lock()
+        self._hits: Counter = Counter()
+        self._misses = 0
+        self._latency: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def match(self, text: str) -> Optional[Tuple[DocumentCommand, Dict[str, Any]]]:
+        """Return the first command ``text`` matches, with its tool arguments."""
+        text = normalize(text)
+        for command in self.commands:
+            args = command.match(text)
+            if args is not None:
+                return command, args
+        return None
+
+    def record(self, command: Optional[DocumentCommand], seconds: float = 0.0) -> None:
+        """Count a message: answered by ``command`` in ``seconds``, or a miss if None."""
+        with self._lock:
+            if command is None:
+                self._misses += 1
+            else:
+                self._hits[command.name] += 1
+                self._latency.append(seconds)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return hits per command, misses, the hit rate and the latency of hits in milliseconds."""
+        with self._lock:
+            hits = sum(self._hits.values())
+            total = hits + self._misses
+            return {
+                "messages": total,
+                "hits": hits,
+                "misses": self._misses,
+                "hit_rate": round(hits / total, 4) if total else 0.0,
+                "by_command": dict(self._hits),
+                "latency_ms": latency_summary(self._latency),
+            }
+
+
+def normalize(text: str) -> str:
+    """Reduce a chat message to the command it may be.
+
+    The backend prefixes messages with "[User: name]" and wraps them in a
+    document context block with a "- User request:" line; both are removed.
+    """
+    request = re.search(r"^- User request: (.*)$", text, re.MULTILINE)
+    if request:
+        text = request.group(1)
+    text = re.sub(r"^\[User: [^\]]*\]\s*", "", text.strip())
+    text = re.sub(r"\s+", " ", text).strip().rstrip(".?!").strip()
+    text = re.sub(r"^please\s+|\s+please$", "", text, flags=re.IGNORECASE)
+    return text
+
+
+def load_commands(path: str) -> List[DocumentCommand]:
+    """Load commands from a JSON file: its own commands first, then the enabled built-in ones."""
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    unknown = set(data) - {"commands", "disable"}
+    if unknown:
+        raise ValueError(f"Unknown command settings: {sorted(unknown)}")
+    disabled = set(data.get("disable", []))
+    custom = [DocumentCommand(**entry) for entry in data.get("commands", [])]
+    return custom + [c for c in DEFAULT_COMMANDS if c.name not in disabled]
+
+
+_router: Optional[CommandRouter] = None
+
+
+def get_command_router() -> CommandRouter:
+    """Get or create the global router, with the commands from DOCX_COMMANDS if set."""
+    global _router
+
+    if _router is None:
+        path = os.environ.get("DOCX_COMMANDS")
+        _router = CommandRouter(load_commands(path) if path else list(DEFAULT_COMMANDS))
+    return _router
+
+
+def reset_command_router() -> None:
+    """Forget the global router, its commands and its metrics."""
+    global _router
+    _router = None
+
+
+def get_command_metrics() -> Dict[str, Any]:
+    """Return the global router's hit rate and latency."""
+    return get_command_router().get_metrics()
+
+
+async def route_command(state: State, runtime: Runtime[Context]) -> Dict[str, Any]:
+    """Answer a direct document command without calling the model.
+
+    When the new user message matches a command, its tool is run and the
+    call, its result and a templated answer are added to the conversation,
+    as if the agent had made them. Otherwise, or if the tool finds nothing,
+    nothing changes and the message goes on to the agent.
+
+    Args:
+        state (State): The current state of the conversation.
+        runtime (Runtime[Context]): Runtime context containing configuration.
+
+    Returns:
+        dict: The tool call, its result and the answer, or nothing.
+    """
+    if not runtime.context.fast_commands or not state.messages:
+        return {}
+    last_message = state.messages[-1]
+    if not isinstance(last_message, HumanMessage):
+        return {}
+    started = time.perf_counter()
+    router = get_command_router()
+    found = router.match(get_message_text(last_message))
+    if found is None:
+        router.record(None)
+        return {}
+    command, args = found
+    try:
+        result = await TOOLS_BY_NAME[command.tool](**args)
+        # Nothing found: the agent may find it under other words
+        empty = isinstance(result, dict) and result.get("count") == 0
+        answer = None if empty else command.render(result)
+    except Exception:
+        # Let the agent deal with it, e.g. explain that no document is loaded.
+        answer = None
+    if answer is None:
+        router.record(None)
+        return {}
+    router.record(command, time.perf_counter() - started)
+
+    call_id = f"cmd_{uuid.uuid4().hex[:12]}"
+    return {
+        "messages": [
+            AIMessage(content="", tool_calls=[{"name": command.tool, "args": args, "id": call_id}]),
+            ToolMessage(
+                content=json.dumps(result, ensure_ascii=False),
+                tool_call_id=call_id,
+                name=command.tool,
+            ),
+            AIMessage(content=answer),
+        ]
+    }
+
+
+def route_after_command(state: State) -> Literal["__end__", "compact_history"]:
+    """End the run if route_command answered, otherwise go on to the agent."""
+    last_message = state.messages[-1] if state.messages else None
+    if isinstance(last_message, AIMessage) and not last_message.tool_calls:
+        return "__end__"
+    return "compact_history"
@@ -0,0 +1,201 @@
+"""Compact, token-budgeted encoding of tool results.
+
+Tool results stay in the conversation and are re-sent to the model on every
+later turn, so paragraphs are encoded tersely::
+
+    {"a": "b.0.0.0.5", "id": "1A2B3C4D", "t": "Pricing is fixed.", "h": 2, "bc": 0}
+
+``a`` is the short anchor (namespace letter, then the positions, joined by
+dots), ``t`` the text and ``h`` the heading level, left out for body text.
+``bc`` points into the result's ``breadcrumbs`` list, so a breadcrumb shared
+by many paragraphs is sent once; a single paragraph carries its breadcrumb
+inline. The style is left out because it follows from the level.
+
+Lists are cut to a token budget counted with the local tokenizer (see
+tokens). A cut result has a ``more`` entry saying how many items were left
+out and which call fetches them.
+"""
+
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from react_agent.tokens import count_tokens, truncate_to_tokens
+
+NAMESPACE_PREFIXES = {"body": "b", "header": "h", "footer": "f", "footnote": "fn", "comment": "c"}
+_PREFIX_NAMESPACES = {prefix: namespace for namespace, prefix in NAMESPACE_PREFIXES.items()}
+
+# Token budget of a tool result when the model does not pass max_tokens
+DEFAULT_MAX_TOKENS = int(os.environ.get("DOCX_TOOL_MAX_TOKENS", "2000"))
+# Tokens kept back for the keys around the encoded items
+_ENVELOPE_TOKENS = 40
+
+
+def short_anchor(anchor: List[Any]) -> str:
+    """Return the short form of an anchor, e.g. "b.0.0.0.5"."""
+    prefix = NAMESPACE_PREFIXES.get(anchor[0], str(anchor[0])) if anchor else ""
+    return ".".join([prefix, *(str(position) for position in anchor[1:])])
+
+
+def parse_anchor(ref: str) -> Optional[List[Any]]:
+    """Return the anchor list of a short anchor, or None if ``ref`` is not one."""
+    prefix, _, positions = ref.partition(".")
+    if prefix not in _PREFIX_NAMESPACES or not positions:
+        return None
+    try:
+        return [_PREFIX_NAMESPACES[prefix], *(int(p) for p in positions.split("."))]
+    except ValueError:
+        return None
+
+
+def budget(max_tokens: Optional[int]) -> int:
+    """Return the token budget for a result, applying the default."""
+    return max(1, max_tokens if max_tokens is not None else DEFAULT_MAX_TOKENS)
+
+
+def _tokens(value: Any) -> int:
+    return count_tokens(json.dumps(value, ensure_ascii=False, separators=(",", ":")))
+
+
+class ResultEncoder:
+    """Encode the paragraphs of one tool result, sharing their breadcrumbs."""
+
+    def __init__(self) -> None:
+        """Start with an empty breadcrumb table."""
+        self.breadcrumbs: List[str] = []
+        self._positions: Dict[str, int] = {}
+
+    def paragraph(self, p: Dict[str, Any], shared: bool = True) -> Dict[str, Any]:
+        """Encode one paragraph; ``shared`` False puts the breadcrumb inline."""
+        entry: Dict[str, Any] = {"a": short_anchor(p["anchor"])}
+        if p.get("id"):
+            entry["id"] = p["id"]
+        entry["t"] = p["text"]
+        if p.get("level"):
+            entry["h"] = p["level"]
+        crumb = p.get("breadcrumb")
+        if crumb:
+            if not shared:
+                entry["bc"] = crumb
+            else:
+                if crumb not in self._positions:
+                    self._positions[crumb] = len(self.breadcrumbs)
+                    self.breadcrumbs.append(crumb)
+                entry["bc"] = self._positions[crumb]
+        return entry
+
+
+def encode_paragraph(p: Dict[str, Any], max_tokens: Optional[int] = None) -> Dict[str, Any]:
+    """Encode a single paragraph, cutting its text to the budget if needed."""
+    entry = ResultEncoder().paragraph(p, shared=False)
+    limit = budget(max_tokens)
+    if max_tokens is not None or _tokens(entry) > limit:
+        overhead = _tokens({**entry, "t": ""})
+        cut = truncate_to_tokens(entry["t"], max(1, limit - overhead))
+        if cut != entry["t"]:
+            entry["t"] = cut
+            entry["cut"] = True
+    return entry
+
+
+def fit_items(items: List[Any], max_tokens: Optional[int] = None) -> List[Any]:
+    """Return the leading ``items`` that fit the budget (at least one, if any)."""
+    limit = max(1, budget(max_tokens) - _ENVELOPE_TOKENS)
+    kept: List[Any] = []
+    used = 0
+    for item in items:
+        used += _tokens(item)
+        if kept and used > limit:
+            break
+        kept.append(item)
+    return kept
+
+
+def more(shown: int, total: int, next_call: str) -> Dict[str, Any]:
+    """Describe the items left out of a cut result and how to fetch them."""
+    return {"remaining": total - shown, "next": next_call}
+
+
+def fit_paragraphs(
+    paragraphs: List[Dict[str, Any]], max_tokens: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Encode the leading paragraphs that fit the budget.
+
+    Returns the encoded paragraphs and their breadcrumb table. At least one
+    paragraph is returned if any were given; if it alone is over budget,
+    its text is cut and it is marked ``"cut": true``. The estimate leaves
+    room for a small envelope; shrink() makes the whole result fit.
+    """
+    limit = max(1, budget(max_tokens) - _ENVELOPE_TOKENS)
+    encoder = ResultEncoder()
+    encoded: List[Dict[str, Any]] = []
+    used = 0
+    for p in paragraphs:
+        crumbs = len(encoder.breadcrumbs)
+        entry = encoder.paragraph(p)
+        cost = _tokens(entry) + sum(_tokens(c) for c in encoder.breadcrumbs[crumbs:])
+        if used + cost > limit:
+            if not encoded:
+                room = limit - (cost - count_tokens(entry["t"]))
+                cut = truncate_to_tokens(entry["t"], max(1, room))
+                if cut != entry["t"]:
+                    entry["t"], entry["cut"] = cut, True
+                encoded.append(entry)
+            break
+        encoded.append(entry)
+        used += cost
+    return encoded, encoder.breadcrumbs[: _crumbs_used(encoded)]
+
+
+def _crumbs_used(encoded: List[Dict[str, Any]]) -> int:
+    """Length of the breadcrumb table the leading ``encoded`` entries refer to."""
+    return max((e["bc"] + 1 for e in encoded if isinstance(e.get("bc"), int)), default=0)
+
+
+def shrink(
+    build: Callable[[List[Dict[str, Any]], List[str]], Dict[str, Any]],
+    encoded: List[Dict[str, Any]],
+    breadcrumbs: List[str],
+    max_tokens: Optional[int],
+) -> Dict[str, Any]:
+    """Return ``build(entries, breadcrumbs)`` for the longest fitting prefix of ``encoded``.
+
+    The prefix keeps at least one entry, even if that does not fit the budget.
+    Breadcrumb indexes are given in first-use order, so a prefix of the
+    entries needs only a prefix of the table.
+    """
+    limit = budget(max_tokens)
+    count = len(encoded)
+    result = build(encoded, breadcrumbs)
+    while count > 1 and _tokens(result) > limit:
+        count -= 1
+        kept = encoded[:count]
+        result = build(kept, breadcrumbs[: _crumbs_used(kept)])
+    return result
+
+
+def paginate(
+    key: str,
+    paragraphs: List[Dict[str, Any]],
+    max_tokens: Optional[int],
+    offset: int,
+    next_call: Callable[[int], str],
+    **fields: Any,
+) -> Dict[str, Any]:
+    """Encode ``paragraphs[offset:]`` into a budgeted result under ``key``.
+
+    ``fields`` are added to the result (and counted against the budget).
+    ``next_call(next_offset)`` describes the call that fetches the rest.
+    """
+    offset = max(0, offset)
+
+    def build(entries: List[Dict[str, Any]], crumbs: List[str]) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            key: entries, "breadcrumbs": crumbs, "count": len(paragraphs), **fields
+        }
+        shown_until = offset + len(entries)
+        if shown_until < len(paragraphs):
+            result["more"] = more(shown_until, len(paragraphs), next_call(shown_until))
+        return result
+
+    return shrink(build, *fit_paragraphs(paragraphs[offset:], max_tokens), max_tokens)
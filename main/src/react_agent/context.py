@@ -32,6 +32,32 @@ class Context:
         },
     )
 
+    time_granularity: int = field(
+        default=3600,
+        metadata={
+            "description": "Seconds the system time in the prompt is rounded down to. "
+            "A coarse time keeps the prompt prefix identical between calls, so the "
+            "provider's prompt cache can be used; 0 gives the exact time."
+        },
+    )
+
+    history_max_tokens: int = field(
+        default=12000,
+        metadata={
+            "description": "Token budget of the conversation history sent to the model. "
+            "Answered tool results are replaced by stubs and the oldest turns by "
+            "summaries to stay within it."
+        },
+    )
+
+    fast_commands: bool = field(
+        default=True,
+        metadata={
+            "description": "Answer direct document commands such as 'show outline' or "
+            "'search for X' by running the tool without calling the model."
+        },
+    )
+
     def __post_init__(self) -> None:
         """Fetch env vars for attributes that were not passed as args."""
         for f in fields(self):
@@ -47,4 +73,7 @@ class Context:
                         env_model = f"openai/{env_model}"
                     setattr(self, f.name, env_model)
                 else:
-                    setattr(self, f.name, os.environ.get(f.name.upper(), f.default))
+                    value = os.environ.get(f.name.upper(), f.default)
+                    if isinstance(f.default, bool) and isinstance(value, str):
+                        value = value.strip().lower() not in ("0", "false", "no", "off", "")
+                    setattr(self, f.name, type(f.default)(value))
@@ -0,0 +1,161 @@
+"""Token-budgeted chunks of the document body, kept up to date through edits.
+
+Summaries and whole-document questions read the body chunk by chunk, so the
+number and size of the calls is known up front. Chunks are computed when the
+body is indexed. Each one holds consecutive body slots (see
+paragraph_sequence) whose text fits a token budget, and ends before a
+heading where it can, so sections are not split unless they are larger than
+the budget.
+
+Chunk boundaries are offset arrays over slot positions: ``starts[i]`` is
+the first slot of chunk i. They sit next to the token count and heading
+level of every slot. An edit re-counts one slot and repacks chunks from the
+first one whose packing looked at that slot. Repacking stops as soon as a
+new boundary meets an old one, because packing from there on would give
+the same chunks.
+"""
+
+import json
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Any, Iterable, Optional, Tuple
+
+from react_agent.tokens import count_tokens
+
+# Token budget of a chunk when none is configured
+DEFAULT_CHUNK_TOKENS = 1500
+
+
+@lru_cache(maxsize=1)
+def _paragraph_overhead() -> int:
+    """Tokens a paragraph costs in a tool result on top of its text (see compact)."""
+    return count_tokens('{"a":"b.00.0.0.00","id":"00000000","t":"","h":0,"bc":00},')
+
+
+def paragraph_tokens(paragraph: Any) -> int:
+    """Return what an indexed paragraph (or None for an empty one) costs in a chunk."""
+    if paragraph is None:
+        return 0
+    return count_tokens(json.dumps(paragraph.text, ensure_ascii=False)) + _paragraph_overhead()
+
+
+class ChunkIndex:
+    """Chunk boundaries over body slot positions."""
+
+    def __init__(self, budget: int = DEFAULT_CHUNK_TOKENS):
+        """Create an empty index for chunks of at most ``budget`` tokens."""
+        if budget < 1:
+            raise ValueError("Chunk budget must be at least 1 token")
+        self.budget = budget
+        self._tokens = array("l")
+        self._levels = array("b")
+        # First slot of each chunk, and the slot where packing it stopped looking
+        self.starts = array("l")
+        self._scanned = array("l")
+
+    def __len__(self) -> int:
+        """Return the number of chunks."""
+        return len(self.starts)
+
+    def build(self, paragraphs: Iterable[Any]) -> None:
+        """Chunk the body from its slots' paragraphs (None for empty slots)."""
+        self._tokens = array("l")
+        self._levels = array("b")
+        for paragraph in paragraphs:
+            self._tokens.append(paragraph_tokens(paragraph))
+            self._levels.append(paragraph.level if paragraph is not None else 0)
+        self.starts = array("l")
+        self._scanned = array("l")
+        self._repack(0, 0)
+
+    def bounds(self, index: int) -> Tuple[int, int]:
+        """Return the first slot position of chunk ``index`` and the one after its last."""
+        end = self.starts[index + 1] if index + 1 < len(self.starts) else len(self._tokens)
+        return self.starts[index], end
+
+    def tokens(self, index: int) -> int:
+        """Return the tokens of chunk ``index``."""
+        start, end = self.bounds(index)
+        return sum(self._tokens[start:end])
+
+    def chunk_of(self, position: int) -> int:
+        """Return the chunk holding the slot at ``position``."""
+        return bisect_right(self.starts, position) - 1
+
+    def update(self, position: int, paragraph: Any) -> None:
+        """Re-count the slot at ``position`` after its paragraph changed."""
+        self._tokens[position] = paragraph_tokens(paragraph)
+        self._levels[position] = paragraph.level if paragraph is not None else 0
+        self._repack(position, 0)
+
+    def insert(self, position: int, paragraph: Any) -> None:
+        """Account for a slot inserted at ``position``."""
+        self._tokens.insert(position, paragraph_tokens(paragraph))
+        self._levels.insert(position, paragraph.level if paragraph is not None else 0)
+        self._repack(position, 1)
+
+    def remove(self, position: int) -> None:
+        """Account for the slot that was at ``position`` being removed."""
+        del self._tokens[position]
+        del self._levels[position]
+        self._repack(position, -1)
+
+    def _repack(self, position: int, shift: int) -> None:
+        """Repack chunks affected by a change at ``position``.
+
+        ``shift`` is +1 if a slot was inserted there, -1 if one was removed.
+        Old boundaries after the change are moved by ``shift`` first, so the
+        unaffected tail can be kept as it is.
+        """
+        if shift > 0:
+            moved = [s + 1 if s >= position else s for s in self.starts]
+            scanned = [s + 1 if s >= position else s for s in self._scanned]
+        elif shift < 0:
+            moved = [s - 1 if s > position else s for s in self.starts]
+            scanned = [s - 1 if s > position else s for s in self._scanned]
+        else:
+            moved, scanned = list(self.starts), list(self._scanned)
+        # The first chunk whose packing looked at the changed slot
+        first = min(bisect_left(scanned, position), max(len(moved) - 1, 0))
+        starts, looked = moved[:first], scanned[:first]
+        old = {start: i for i, start in enumerate(moved) if i > first}
+        current = moved[first] if first > 0 else 0
+        total = len(self._tokens)
+        while current < total:
+            if current > position and current in old:
+                resume = old[current]
+                starts.extend(moved[resume:])
+                looked.extend(scanned[resume:])
+                break
+            end, stop = self._pack(current)
+            starts.append(current)
+            looked.append(stop)
+            current = end
+        self.starts = array("l", starts)
+        self._scanned = array("l", looked)
+
+    def _pack(self, start: int) -> Tuple[int, int]:
+        """Pack one chunk from ``start``; return where it ends and where packing stopped.
+
+        The chunk takes slots while they fit the budget. When the next one
+        does not fit, the chunk ends before the last heading that leaves it
+        at least half full, if any, else before that slot. A chunk always
+        takes at least one slot, however large.
+        """
+        total = len(self._tokens)
+        used = self._tokens[start]
+        cut: Optional[int] = None
+        position = start + 1
+        while position < total:
+            if used + self._tokens[position] > self.budget:
+                break
+            if self._levels[position] > 0 and used * 2 >= self.budget:
+                cut = position
+            used += self._tokens[position]
+            position += 1
+        else:
+            return total, total
+        if self._levels[position] > 0 or cut is None:
+            return position, position
+        return cut, position
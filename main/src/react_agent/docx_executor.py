@@ -0,0 +1,184 @@
+"""Dedicated, bounded executor for CPU-heavy DOCX work.
+
+Tools run indexing, searches and edits off the event loop, but not on the
+default ``asyncio.to_thread`` pool, which the rest of the process (the
+FastAPI backend, LangGraph, HTTP clients) shares. DocxExecutor has its own
+small thread pool and caps how many tasks may be waiting for it; callers
+beyond the cap wait on the event loop without tying up a thread.
+
+Parsing a large body holds the GIL for seconds. With ``process_workers``
+set, the executor also keeps a process pool that DocxIndexer.index() uses,
+so the parse itself runs outside this process (see docx_parallel).
+
+Queue depth and per-task wait and run times are kept for get_metrics().
+"""
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Latency samples kept for the percentiles in get_metrics()
+LATENCY_SAMPLES = 512
+
+
+class DocxExecutor:
+    """Thread pool (and optional process pool) reserved for DOCX work."""
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 32, process_workers: int = 0):
+        """Create the executor.
+
+        ``max_workers`` threads run tasks; at most ``max_pending`` tasks are
+        queued or running at once, further run() calls wait for a slot.
+        ``process_workers`` > 0 adds a process pool of that size for parsing.
+        """
+        if max_workers < 1 or max_pending < max_workers:
+            raise ValueError("Need max_workers >= 1 and max_pending >= max_workers")
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.process_workers = process_workers
+        self._threads = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="docx")
+        self._processes: Optional[ProcessPoolExecutor] = None
+        # One gate per event loop; asyncio primitives cannot be shared between loops.
+        self._gates: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._max_queued = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._wait: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._run: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    @property
+    def process_pool(self) -> Optional[ProcessPoolExecutor]:
+        """The process pool for parsing, started on first use; None if disabled."""
+        if self.process_workers < 1:
+            return None
+        with self._lock:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(max_workers=self.process_workers)
+            return self._processes
+
+    def _gate(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        gate = self._gates.get(loop)
+        if gate is None:
+            gate = self._gates[loop] = asyncio.Semaphore(self.max_pending)
+        return gate
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(*args)`` on a DOCX worker thread and return its result."""
+        task = {"submitted": time.perf_counter(), "dequeued": False}
+        with self._lock:
+            self._submitted += 1
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+        try:
+            async with self._gate():
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._threads, self._call, fn, args, task)
+        except asyncio.CancelledError:
+            self._dequeue(task)
+            raise
+
+    def _dequeue(self, task: Dict[str, Any]) -> bool:
+        """Take a task off the queue count once; return False if already done."""
+        with self._lock:
+            if task["dequeued"]:
+                return False
+            task["dequeued"] = True
+            self._queued -= 1
+            return True
+
+    def _call(self, fn: Callable[..., T], args: Any, task: Dict[str, Any]) -> T:
+        """Run one task on a worker thread, timing its wait and run."""
+        started = time.perf_counter()
+        self._dequeue(task)
+        with self._lock:
+            self._running += 1
+            self._wait.append(started - task["submitted"])
+        failed = True
+        try:
+            result = fn(*args)
+            failed = False
+            return result
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._run.append(time.perf_counter() - started)
+                if failed:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return queue depth, task counts and wait/run latency in milliseconds."""
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "process_workers": self.process_workers,
+                "queued": self._queued,
+                "running": self._running,
+                "max_queued": self._max_queued,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "wait_ms": latency_summary(self._wait),
+                "run_ms": latency_summary(self._run),
+            }
+
+    def shutdown(self) -> None:
+        """Stop the pools after running tasks finish."""
+        self._threads.shutdown(wait=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=True)
+
+
+def latency_summary(samples: Deque[float]) -> Dict[str, float]:
+    """Summarize durations in seconds as mean, p50, p95 and max milliseconds."""
+    if not samples:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    return {
+        "mean": round(1000 * sum(ordered) / len(ordered), 3),
+        "p50": round(1000 * ordered[len(ordered) // 2], 3),
+        "p95": round(1000 * ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max": round(1000 * ordered[-1], 3),
+    }
+
+
+# Global instance (will be initialized when needed)
+_docx_executor: Optional[DocxExecutor] = None
+
+
+def get_docx_executor() -> DocxExecutor:
+    """Get or create the global DOCX executor."""
+    global _docx_executor
+
+    if _docx_executor is None:
+        _docx_executor = DocxExecutor(
+            max_workers=int(os.environ.get("DOCX_EXECUTOR_WORKERS", "2")),
+            max_pending=int(os.environ.get("DOCX_EXECUTOR_QUEUE", "32")),
+            process_workers=int(os.environ.get("DOCX_PARSE_PROCESSES", "0")),
+        )
+
+    return _docx_executor
+
+
+def reset_docx_executor() -> None:
+    """Shut down and forget the global DOCX executor."""
+    global _docx_executor
+    if _docx_executor is not None:
+        _docx_executor.shutdown()
+    _docx_executor = None
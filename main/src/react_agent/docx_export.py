@@ -0,0 +1,143 @@
+"""Stream document content as plain text, Markdown or JSONL.
+
+Exports are generators that render one paragraph at a time. The output is
+never assembled in memory, so exporting adds a constant amount of memory on
+top of the index, whatever the document's size. Sources are a DOCX file,
+indexed just for the export, or a DocxManager, which is read chunk by chunk
+(see docx_chunks) so that its edits, saved or not, are included.
+
+Formats:
+
+- ``text``: one paragraph per line.
+- ``markdown``: headings as ``#`` to ``######`` by level, bullets as ``-``,
+  paragraphs separated by blank lines.
+- ``jsonl``: one JSON record per paragraph with its anchor, id, breadcrumb,
+  style, level and text.
+
+Usage::
+
+    python -m react_agent.docx_export proposal.docx --format markdown -o proposal.md
+"""
+
+import json
+import re
+import sys
+from dataclasses import asdict, is_dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+
+from react_agent.docx_indexer import DocxIndexer
+
+FORMATS = ("text", "markdown", "jsonl")
+MEDIA_TYPES = {
+    "text": "text/plain; charset=utf-8",
+    "markdown": "text/markdown; charset=utf-8",
+    "jsonl": "application/x-ndjson",
+}
+EXTENSIONS = {"text": "txt", "markdown": "md", "jsonl": "jsonl"}
+# Size of the blocks in_blocks() joins records into
+BLOCK_BYTES = 64 * 1024
+
+# A list item prefix as docx2python writes it: "--\t" for bullets, "1)\t" for numbers
+_LIST_PREFIX = re.compile(r"^(--|\d+[.)])\t")
+# Body text Markdown would read as a heading, rule, quote or list
+_MARKDOWN_MARKUP = re.compile(r"^(#|>|[-+*]\s|\d+[.)]\s)")
+
+
+def render(paragraph: Dict[str, Any], fmt: str) -> str:
+    """Render one indexed paragraph in ``fmt``, with its line ending."""
+    text = paragraph["text"]
+    if fmt == "text":
+        return text + "\n"
+    if fmt == "jsonl":
+        return json.dumps(paragraph, ensure_ascii=False) + "\n"
+    if fmt == "markdown":
+        level = paragraph.get("level", 0)
+        if level > 0:
+            return f"{'#' * min(level, 6)} {text}\n\n"
+        listed = _LIST_PREFIX.match(text)
+        if listed:
+            marker = "-" if listed.group(1) == "--" else listed.group(1)[:-1] + "."
+            return f"{marker} {text[listed.end():]}\n\n"
+        if _MARKDOWN_MARKUP.match(text):
+            text = "\\" + text
+        return text + "\n\n"
+    raise ValueError(f"Unknown export format {fmt!r}; use one of {', '.join(FORMATS)}")
+
+
+def export_paragraphs(paragraphs: Iterable[Any], fmt: str) -> Iterator[str]:
+    """Render indexed paragraphs (Paragraph objects or their dicts) one by one."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; use one of {', '.join(FORMATS)}")
+    for paragraph in paragraphs:
+        yield render(asdict(paragraph) if is_dataclass(paragraph) else paragraph, fmt)
+
+
+def export_docx(docx_path: str, fmt: str, workers: int = 1) -> Iterator[str]:
+    """Index a DOCX file and render its body paragraphs one by one."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; use one of {', '.join(FORMATS)}")
+    indexer = DocxIndexer(docx_path)
+    indexer.index(workers)
+    yield from export_paragraphs(indexer.paragraphs, fmt)
+
+
+def export_manager(manager: Any, fmt: str) -> Iterator[str]:
+    """Render a DocxManager's current body, one chunk at a time.
+
+    The manager lock is held only while a chunk is read, so edits can go
+    on during a long export; each chunk reflects the document as it was
+    when it was read.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; use one of {', '.join(FORMATS)}")
+    for chunk in manager.iter_chunks():
+        for paragraph in chunk["paragraphs"]:
+            yield render(paragraph, fmt)
+
+
+def in_blocks(records: Iterable[str], block_bytes: int = BLOCK_BYTES) -> Iterator[str]:
+    """Join rendered records into blocks of about ``block_bytes``, e.g. for HTTP chunks."""
+    block: List[str] = []
+    size = 0
+    for record in records:
+        block.append(record)
+        size += len(record)
+        if size >= block_bytes:
+            yield "".join(block)
+            block, size = [], 0
+    if block:
+        yield "".join(block)
+
+
+def write_export(records: Iterable[str], out: TextIO) -> int:
+    """Write rendered records to ``out`` as they come; return the paragraph count."""
+    count = 0
+    for record in records:
+        out.write(record)
+        count += 1
+    return count
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Export a DOCX file from the command line."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("docx_path", help="DOCX file to export")
+    parser.add_argument("-f", "--format", choices=FORMATS, default="text", help="output format")
+    parser.add_argument("-o", "--output", help="file to write (default: standard output)")
+    parser.add_argument("--workers", type=int, default=1, help="processes to index in")
+    args = parser.parse_args(argv)
+
+    records = export_docx(args.docx_path, args.format, args.workers)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="\n") as out:
+            count = write_export(records, out)
+        sys.stderr.write(f"Exported {count} paragraphs to {args.output}\n")
+    else:
+        write_export(records, sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
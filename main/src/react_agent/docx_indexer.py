@@ -1,12 +1,66 @@
 """DOCX Indexer for creating structured navigation and anchor mapping."""
 
+import hashlib
+import heapq
 import json
 import re
-from typing import Any, Dict, List, Optional
+import zipfile
+from concurrent.futures import Executor
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
 from docx2python import docx2python
+from docx2python.depth_collector import Par
+from lxml import etree
 from dataclasses import dataclass, asdict
 
+from react_agent import docx_parallel
+from react_agent.heading_rules import HeadingClassifier, HeadingRules
+
+# Indexing profiles:
+#   "full" - hand the whole package to docx2python.
+#   "body" - hand docx2python a slim in-memory package holding only what the
+#            body text needs. Media, headers, footers, footnotes, endnotes and
+#            comments are never decompressed, and comment range markers (which
+#            docx2python resolves with a scan over every run seen so far) are
+#            dropped. The indexed paragraphs are identical to "full".
+PROFILES = ("full", "body")
+
+# Parts kept in the "body" profile besides the main document part and its rels.
+_BODY_PROFILE_PARTS = ("[Content_Types].xml", "_rels/.rels", "word/numbering.xml")
+_COMMENT_RANGE_RE = re.compile(rb"<w:commentRange(?:Start|End)\b[^>]*/>")
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W14_NS = "http://schemas.microsoft.com/office/word/2010/wordml"
+# Word 2010+ gives every paragraph a w14:paraId, 8 hex digits below 0x80000000
+_PARA_ID = f"{{{_W14_NS}}}paraId"
+_STYLES_REL = "/relationships/styles"
+# Raw-byte pre-scans of the body: any namespace prefix (or none), any attribute
+# order and either quote; the val attribute must share the element's prefix.
+_PSTYLE_RE = re.compile(rb"""<(?:(\w+):)?pStyle\b[^>]*?\s(?(1)\1:)val=["']([^"']+)""")
+_DIRECT_OUTLINE_RE = re.compile(rb"""<(?:(\w+):)?outlineLvl\b[^>]*?\s(?(1)\1:)val=["'][0-8]["']""")
+# Built-in heading styles, by their w:name, in case a styles.xml omits outlineLvl.
+_HEADING_NAME_RE = re.compile(r"heading ([1-9])", re.IGNORECASE)
+
+# Non-body parts that can be loaded on demand with DocxIndexer.get_part().
+LAZY_PARTS = ("header", "footer", "footnotes", "endnotes", "comments", "images")
+
+# Anchor namespaces outside the body, mapped to the part each is indexed from.
+# Each is parsed on first access and cached separately from the body index.
+NAMESPACES = {
+    "header": "header",
+    "footer": "footer",
+    "footnote": "footnotes",
+    "comment": "comments",
+}
+# Breadcrumb and style given to paragraphs of each non-body namespace.
+_NAMESPACE_LABELS = {
+    "header": ("Header", "Header"),
+    "footer": ("Footer", "Footer"),
+    "footnote": ("Footnotes", "Footnote Text"),
+    "comment": ("Comments", "Comment Text"),
+}
+
 
 @dataclass
 class Paragraph:
@@ -15,51 +69,125 @@ class Paragraph:
     breadcrumb: str
     style: str
     text: str
-    level: int = 0  # Heading level (0 for normal, 1-6 for headings)
+    level: int = 0  # Heading level (0 for normal, 1-9 for headings)
+    id: Optional[str] = None  # Stable body paragraph id (w14:paraId or minted)
 
 
 class DocxIndexer:
     """Index a DOCX file for easy navigation and manipulation."""
-    
-    def __init__(self, docx_path: str):
-        """Initialize indexer with a DOCX file path."""
+
+    # Smallest chunk worth handing to a worker process when indexing in parallel.
+    min_chunk_bytes = docx_parallel.MIN_CHUNK_BYTES
+
+    def __init__(
+        self,
+        docx_path: str,
+        profile: str = "body",
+        heading_rules: Optional[HeadingRules] = None,
+    ):
+        """Initialize indexer with a DOCX file path and indexing profile.
+
+        ``heading_rules`` configures how heading levels are guessed from text;
+        the defaults cover English, German and French keywords.
+        """
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown indexing profile {profile!r}, expected one of {PROFILES}")
         self.docx_path = Path(docx_path)
+        self.profile = profile
+        self.heading_rules = heading_rules or HeadingRules()
+        self.heading_classifier = HeadingClassifier(self.heading_rules)
         self.paragraphs: List[Paragraph] = []
+        # Anchors of empty body paragraphs, which take up anchor positions
+        # without being indexed
+        self.empty_anchors: List[List[Any]] = []
         self.heading_stack: List[Dict[str, Any]] = []
         self.docx_obj = None
+        self._parts: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+        self._namespaces: Dict[str, Tuple[Tuple[int, int], List[Paragraph]]] = {}
+        self._style_table: Optional[Tuple[Tuple[int, int], Dict[str, int]]] = None
+        # Style id -> outline level for documents that use heading styles;
+        # None when headings are guessed from text (see index()).
+        self.style_levels: Optional[Dict[str, int]] = None
+
+    def _file_signature(self) -> Tuple[int, int]:
+        """Return (mtime, size) of the DOCX file, used to invalidate lazy caches."""
+        stat = self.docx_path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def _body_parts(self) -> Tuple[str, Dict[str, bytes]]:
+        """Return the main part name and the parts the body needs, by zip path."""
+        with zipfile.ZipFile(self.docx_path) as src:
+            main_part = _main_document_part(src)
+            parts = {
+                part: src.read(part)
+                for part in (*_BODY_PROFILE_PARTS, _rels_part(main_part))
+                if part in src.NameToInfo
+            }
+            parts[main_part] = _COMMENT_RANGE_RE.sub(b"", src.read(main_part))
+        return main_part, parts
+
+    def get_style_levels(self) -> Dict[str, int]:
+        """Return paragraph style id -> outline level (0 for body text).
+
+        styles.xml is read once per version of the file, and basedOn chains
+        are resolved up front, so classifying a paragraph is a dict lookup.
+        """
+        signature = self._file_signature()
+        if self._style_table is None or self._style_table[0] != signature:
+            with zipfile.ZipFile(self.docx_path) as src:
+                part = _styles_part(src, _main_document_part(src))
+                table = _resolve_style_levels(src.read(part)) if part in src.NameToInfo else {}
+            self._style_table = (signature, table)
+        return self._style_table[1]
+
+    def _outline_styles(self, main_xml: bytes) -> Optional[Dict[str, int]]:
+        """Return the style table if the body uses outline levels, else None."""
+        levels = self.get_style_levels()
+        used = {sid.decode() for _, sid in set(_PSTYLE_RE.findall(main_xml))}
+        if any(levels.get(sid, 0) > 0 for sid in used) or _DIRECT_OUTLINE_RE.search(main_xml):
+            return levels
+        return None
+
+    def _body_package(self) -> BytesIO:
+        """Build an in-memory package holding only the parts the body needs."""
+        return _slim_package(self._body_parts()[1])
+
+    def get_part(self, part: str) -> Any:
+        """Load a non-body part on first request and cache it.
+
+        The cache is keyed on the file's mtime and size, so a part is parsed
+        again only after the file has changed on disk.
+
+        Args:
+            part: One of LAZY_PARTS. Text parts come back as docx2python nested
+                lists, "comments" as (author, date, text) tuples and "images"
+                as a name to bytes mapping.
+        """
+        if part not in LAZY_PARTS:
+            raise ValueError(f"Unknown part {part!r}, expected one of {LAZY_PARTS}")
+        signature = self._file_signature()
+        cached = self._parts.get(part)
+        if cached is None or cached[0] != signature:
+            with docx2python(str(self.docx_path)) as docx:
+                if part == "comments":
+                    # docx.comments resolves each comment's range by parsing the
+                    # whole body; the comment elements alone are all we need.
+                    value = [_comment_entry(c) for c in docx.docx_reader.comments]
+                else:
+                    value = getattr(docx, part)
+            cached = self._parts[part] = (signature, value)
+        return cached[1]
         
     def _detect_heading_level(self, text: str) -> Optional[int]:
         """Detect if text is a heading and return its level."""
-        # Common heading patterns
-        if not text or not text.strip():
-            return None
-            
-        text = text.strip()
-        
-        # Pattern 1: Numbered headings like "1.", "1.1.", "2.3.4."
-        if re.match(r'^\d+(\.\d+)*\.?\s+', text):
-            dots = text.split()[0].count('.')
-            return min(dots + 1, 6)
-        
-        # Pattern 2: All caps (likely a main heading)
-        if text.isupper() and len(text.split()) <= 10:
-            return 1
-            
-        # Pattern 3: Known heading keywords
-        heading_keywords = ['table of contents', 'summary', 'introduction', 'conclusion']
-        if any(keyword in text.lower() for keyword in heading_keywords):
-            return 2
-            
-        return None
-    
+        return self.heading_classifier.level(text)
+
     def _build_breadcrumb(self, text: str, level: int) -> str:
         """Build a breadcrumb trail based on heading hierarchy."""
-        # Update heading stack
-        # Remove headings at same or deeper level
-        self.heading_stack = [h for h in self.heading_stack if h['level'] < level]
-        
-        # Add current heading
+        # Update heading stack: a heading closes headings at the same or a
+        # deeper level; normal paragraphs (level 0) leave the stack alone
         if level > 0:
+            self.heading_stack = [h for h in self.heading_stack if h['level'] < level]
             self.heading_stack.append({'level': level, 'text': text[:50]})
         
         # Build breadcrumb
@@ -68,71 +196,225 @@ class DocxIndexer:
         
         return " > ".join([h['text'] for h in self.heading_stack])
     
-    def index(self) -> List[Dict[str, Any]]:
-        """Index the DOCX file and return structured paragraph data."""
+    def index(self, workers: int = 1, pool: Optional[Executor] = None) -> List[Dict[str, Any]]:
+        """Index the DOCX file and return structured paragraph data.
+
+        Heading levels come from each paragraph's w:outlineLvl or paragraph
+        style. Only documents that use no outline levels at all fall back to
+        guessing headings from text with the heading rules.
+
+        With ``workers`` > 1, a large body is split into chunks that are indexed
+        in that many processes and stitched back together (see docx_parallel).
+        The result is the same as indexing sequentially; small documents, or
+        bodies without a usable chunk boundary, are always indexed sequentially.
+
+        ``pool`` is a long-lived process pool to index in. With one, a body
+        too large to be worth parsing on this process's GIL
+        (``min_chunk_bytes``) is indexed there as a single chunk even when it
+        is not split.
+        """
         self.paragraphs = []
+        self.empty_anchors = []
         self.heading_stack = []
-        
-        with docx2python(str(self.docx_path)) as docx:
+
+        main_part, parts = self._body_parts()
+        self.style_levels = self._outline_styles(parts[main_part])
+        if workers > 1 or pool is not None:
+            chunks = (
+                docx_parallel.plan_chunks(parts[main_part], workers, self.min_chunk_bytes)
+                if workers > 1 else []
+            )
+            if not chunks and pool is not None and len(parts[main_part]) >= self.min_chunk_bytes:
+                chunks = [docx_parallel.Chunk(xml=parts[main_part], continues=False)]
+            if chunks:
+                self.docx_obj = None
+                self.paragraphs, self.heading_stack, self.empty_anchors = docx_parallel.index_parallel(
+                    str(self.docx_path),
+                    parts,
+                    main_part,
+                    chunks,
+                    workers,
+                    self.heading_rules,
+                    self.style_levels,
+                    pool,
+                )
+                self._assign_ids()
+                return [asdict(p) for p in self.paragraphs]
+
+        source = _slim_package(parts) if self.profile == "body" else str(self.docx_path)
+        with docx2python(source) as docx:
             self.docx_obj = docx
-            pars = docx.body
-            
-            # Recursively iterate through arbitrary depth (up to max_depth=20) for low-level access
-
-            def _traverse(node, anchor_prefix, depth):
-                if depth > 20:
-                    return
-                if isinstance(node, list):
-                    for idx, child in enumerate(node):
-                        _traverse(child, anchor_prefix + [idx], depth + 1)
-                else:
-                    # At the leaf node (paragraph or text)
-                    text = node.strip() if isinstance(node, str) else str(node).strip()
-                    if not text or text == '\n':
-                        return
-                    # Anchor: always starts with "body", then the full path
-                    anchor = ["body"] + anchor_prefix
-                    # Detect heading level
-                    level = self._detect_heading_level(text) or 0
-                    # Determine style
-                    if level == 1:
-                        style = "Heading 1"
-                    elif level == 2:
-                        style = "Heading 2"
-                    elif level > 2:
-                        style = f"Heading {level}"
-                    else:
-                        style = "Normal"
-                    # Build breadcrumb
-                    breadcrumb = self._build_breadcrumb(text, level)
-                    # Create paragraph object
-                    paragraph = Paragraph(
-                        anchor=anchor,
-                        breadcrumb=breadcrumb,
-                        style=style,
-                        text=text,
-                        level=level
-                    )
-                    self.paragraphs.append(paragraph)
-
-            _traverse(pars, [], 0)
+            self._traverse(docx.body_pars, [], 0, "body", self.paragraphs, empty=self.empty_anchors)
+        self._assign_ids()
         return [asdict(p) for p in self.paragraphs]
-    
+
+    def _assign_ids(self) -> None:
+        """Give body paragraphs without a unique w14:paraId a minted id.
+
+        Minted ids depend only on the paragraph's position and text, so the
+        same file always gets the same ids.
+        """
+        taken = set()
+        missing = []
+        for position, p in enumerate(self.paragraphs):
+            if p.id is None or p.id in taken:
+                missing.append((position, p))
+            else:
+                taken.add(p.id)
+        for position, p in missing:
+            p.id = _mint_paragraph_id(f"{position}:{p.text}", taken)
+            taken.add(p.id)
+
+    def body_slots(self) -> List[Tuple[Tuple[Any, ...], Optional[Paragraph]]]:
+        """Return (container, paragraph) for every body paragraph in document order.
+
+        The container is the anchor without its last element; empty paragraphs
+        come with None. This is one entry per w:p of the body.
+        """
+        containers: Dict[Tuple[Any, ...], Tuple[Any, ...]] = {}
+        entries = heapq.merge(
+            ((p.anchor, p) for p in self.paragraphs),
+            ((a, None) for a in self.empty_anchors),
+            key=lambda entry: entry[0][1:],
+        )
+        return [
+            (containers.setdefault(tuple(anchor[:-1]), tuple(anchor[:-1])), paragraph)
+            for anchor, paragraph in entries
+        ]
+
+    def _paragraph_level(self, par: Par, text: str) -> int:
+        """Return the outline level of a body paragraph (0 for body text)."""
+        if self.style_levels is None:
+            return self._detect_heading_level(text) or 0
+        direct = par.elem.find(f"{_W}pPr/{_W}outlineLvl") if par.elem is not None else None
+        if direct is not None:
+            return _outline_level(direct.get(f"{_W}val"))
+        return self.style_levels.get(par.style, 0)
+
+    def _traverse(
+        self,
+        node: Any,
+        anchor_prefix: List[int],
+        depth: int,
+        namespace: str,
+        out: List[Paragraph],
+        breadcrumb: Optional[str] = None,
+        empty: Optional[List[List[Any]]] = None,
+    ) -> None:
+        """Collect the paragraphs of a docx2python nested list into ``out``.
+
+        Body paragraphs (docx2python Par instances) get heading levels and
+        breadcrumbs; other namespaces pass a fixed ``breadcrumb`` and are
+        indexed as plain paragraphs. Anchors of empty body paragraphs are
+        added to ``empty`` if given.
+        """
+        # Recursively iterate through arbitrary depth (up to max_depth=20) for low-level access
+        if depth > 20:
+            return
+        if isinstance(node, list):
+            for idx, child in enumerate(node):
+                self._traverse(
+                    child, anchor_prefix + [idx], depth + 1, namespace, out, breadcrumb, empty
+                )
+            return
+
+        # At the leaf node (paragraph or text)
+        par = node if isinstance(node, Par) else None
+        if par is not None:
+            text = "".join(par.run_strings).strip()
+        else:
+            text = node.strip() if isinstance(node, str) else str(node).strip()
+        if not text or text == '\n':
+            if par is not None and empty is not None:
+                empty.append([namespace] + anchor_prefix)
+            return
+        # Anchor: always starts with the namespace, then the full path
+        anchor = [namespace] + anchor_prefix
+        if breadcrumb is not None:
+            style = _NAMESPACE_LABELS[namespace][1]
+            out.append(Paragraph(anchor=anchor, breadcrumb=breadcrumb, style=style, text=text))
+            return
+        # Detect heading level
+        level = self._paragraph_level(par, text) if par is not None else (
+            self._detect_heading_level(text) or 0
+        )
+        # Determine style
+        style = _style_label(level)
+        # Build breadcrumb
+        breadcrumb = self._build_breadcrumb(text, level)
+        # Create paragraph object
+        out.append(Paragraph(
+            anchor=anchor,
+            breadcrumb=breadcrumb,
+            style=style,
+            text=text,
+            level=level,
+            id=par.elem.get(_PARA_ID) if par is not None and par.elem is not None else None,
+        ))
+
+    def index_namespace(self, namespace: str) -> List[Paragraph]:
+        """Index a non-body namespace on first access and return its paragraphs.
+
+        Anchors start with the namespace, e.g. ["header", 0, 0, 0, 0] or
+        ["comment", 3]. Results are cached until the file changes on disk.
+        """
+        if namespace not in NAMESPACES:
+            raise ValueError(f"Unknown namespace {namespace!r}, expected one of {list(NAMESPACES)}")
+        signature = self._file_signature()
+        cached = self._namespaces.get(namespace)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        paragraphs: List[Paragraph] = []
+        part = self.get_part(NAMESPACES[namespace])
+        title, style = _NAMESPACE_LABELS[namespace]
+        if namespace == "comment":
+            for idx, (author, date, text) in enumerate(part):
+                if text.strip():
+                    crumb = f"{title} > {author}" + (f" ({date})" if date else "")
+                    paragraphs.append(Paragraph(
+                        anchor=["comment", idx], breadcrumb=crumb, style=style, text=text.strip()
+                    ))
+        else:
+            self._traverse(part, [], 0, namespace, paragraphs, breadcrumb=title)
+        self._namespaces[namespace] = (signature, paragraphs)
+        return paragraphs
+
+    def _paragraphs_in(self, namespace: Optional[str]) -> List[Paragraph]:
+        """Return the paragraphs of one namespace, or of every namespace for None."""
+        if namespace == "body":
+            return self.paragraphs
+        if namespace is None:
+            result = list(self.paragraphs)
+            for name in NAMESPACES:
+                result.extend(self.index_namespace(name))
+            return result
+        return self.index_namespace(namespace)
+
     def get_outline(self) -> List[Dict[str, Any]]:
         """Get document outline (headings only)."""
         return [asdict(p) for p in self.paragraphs if p.level > 0]
     
     def find_by_anchor(self, anchor: List[Any]) -> Optional[Dict[str, Any]]:
-        """Find a paragraph by its anchor."""
-        for p in self.paragraphs:
+        """Find a paragraph by its anchor, in whichever namespace it names."""
+        namespace = anchor[0] if anchor else None
+        if namespace != "body" and namespace not in NAMESPACES:
+            return None
+        for p in self._paragraphs_in(namespace):
             if p.anchor == anchor:
                 return asdict(p)
         return None
     
-    def find_by_text(self, search_text: str, case_sensitive: bool = False) -> List[Dict[str, Any]]:
-        """Find paragraphs containing specific text."""
+    def find_by_text(
+        self, search_text: str, case_sensitive: bool = False, namespace: Optional[str] = "body"
+    ) -> List[Dict[str, Any]]:
+        """Find paragraphs containing specific text.
+
+        ``namespace`` limits the search to "body" (the default) or one of
+        NAMESPACES; None searches every namespace.
+        """
         results = []
-        for p in self.paragraphs:
+        for p in self._paragraphs_in(namespace):
             text = p.text if case_sensitive else p.text.lower()
             search = search_text if case_sensitive else search_text.lower()
             if search in text:
@@ -145,18 +427,134 @@ class DocxIndexer:
             json.dump([asdict(p) for p in self.paragraphs], f, indent=2, ensure_ascii=False)
 
 
+def _main_document_part(package: zipfile.ZipFile) -> str:
+    """Return the zip path of the main document part from the package rels."""
+    try:
+        rels = etree.fromstring(package.read("_rels/.rels"))
+    except KeyError:
+        return "word/document.xml"
+    for rel in rels:
+        if rel.get("Type", "").endswith("/officeDocument") and rel.get("Target"):
+            return rel.get("Target").lstrip("/")
+    return "word/document.xml"
+
+
+def _rels_part(part: str) -> str:
+    """Return the zip path of the relationships part of ``part``."""
+    folder, _, name = part.rpartition("/")
+    return f"{folder}/_rels/{name}.rels" if folder else f"_rels/{name}.rels"
+
+
+def _styles_part(package: zipfile.ZipFile, main_part: str) -> str:
+    """Return the zip path of the styles part of the main document part."""
+    try:
+        rels = etree.fromstring(package.read(_rels_part(main_part)))
+    except KeyError:
+        return "word/styles.xml"
+    folder = main_part.rpartition("/")[0]
+    for rel in rels:
+        target = rel.get("Target")
+        if rel.get("Type", "").endswith(_STYLES_REL) and target:
+            if target.startswith("/"):
+                return target.lstrip("/")
+            return f"{folder}/{target}" if folder else target
+    return "word/styles.xml"
+
+
+def _style_label(level: int) -> str:
+    """Return the style name the index reports for a heading level."""
+    return f"Heading {level}" if level > 0 else "Normal"
+
+
+def _mint_paragraph_id(seed: str, taken: Any) -> str:
+    """Return a paraId-shaped id derived from ``seed`` that is not in ``taken``."""
+    digest = hashlib.sha1(seed.encode("utf-8")).digest()
+    value = int.from_bytes(digest[:4], "big") & 0x7FFFFFFF
+    while f"{value:08X}" in taken or value == 0:
+        value = (value + 1) & 0x7FFFFFFF
+    return f"{value:08X}"
+
+
+def _outline_level(value: Optional[str]) -> int:
+    """Map a w:outlineLvl value (0-8 outline, 9 body text) to a heading level."""
+    try:
+        level = int(value)
+    except (TypeError, ValueError):
+        return 0
+    return level + 1 if 0 <= level <= 8 else 0
+
+
+def _resolve_style_levels(styles_xml: bytes) -> Dict[str, int]:
+    """Map each paragraph style id to its outline level, following basedOn."""
+    root = etree.fromstring(styles_xml, etree.XMLParser(huge_tree=True))
+    own: Dict[str, Optional[int]] = {}
+    based_on: Dict[str, str] = {}
+    for style in root.iterfind(f"{_W}style"):
+        if style.get(f"{_W}type") != "paragraph":
+            continue
+        style_id = style.get(f"{_W}styleId")
+        outline = style.find(f"{_W}pPr/{_W}outlineLvl")
+        name = style.find(f"{_W}name")
+        heading = _HEADING_NAME_RE.fullmatch(name.get(f"{_W}val", "")) if name is not None else None
+        if outline is not None:
+            own[style_id] = _outline_level(outline.get(f"{_W}val"))
+        elif heading:
+            own[style_id] = int(heading.group(1))
+        else:
+            own[style_id] = None
+        parent = style.find(f"{_W}basedOn")
+        if parent is not None:
+            based_on[style_id] = parent.get(f"{_W}val")
+
+    levels: Dict[str, int] = {}
+    for style_id in own:
+        seen = set()
+        current: Optional[str] = style_id
+        while current is not None and current not in seen and own.get(current) is None:
+            seen.add(current)
+            current = based_on.get(current)
+        levels[style_id] = (own.get(current) or 0) if current is not None else 0
+    return levels
+
+
+def _slim_package(parts: Dict[str, bytes]) -> BytesIO:
+    """Write ``parts`` into an uncompressed in-memory package."""
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as dst:
+        for name, data in parts.items():
+            dst.writestr(name, data)
+    buffer.seek(0)
+    return buffer
+
+
+def _comment_entry(comment: Any) -> Tuple[str, str, str]:
+    """Return (author, date, text) for a w:comment element."""
+    author = date = ""
+    for key, value in comment.attrib.items():
+        if key.endswith("}author"):
+            author = value
+        elif key.endswith("}date"):
+            date = value
+    paragraphs = [
+        "".join(t.text or "" for t in p.iter() if t.tag.endswith("}t"))
+        for p in comment.iter() if p.tag.endswith("}p")
+    ]
+    return author, date, "\n".join(p for p in paragraphs if p)
+
+
 def main():
     """Example usage of the indexer."""
     import sys
     
     if len(sys.argv) < 2:
-        print("Usage: python docx_indexer.py <docx_path> [output_json]")
+        print("Usage: python docx_indexer.py <docx_path> [output_json] [full|body]")
         sys.exit(1)
     
     docx_path = sys.argv[1]
     output_path = sys.argv[2] if len(sys.argv) > 2 else "index.json"
+    profile = sys.argv[3] if len(sys.argv) > 3 else "body"
     
-    indexer = DocxIndexer(docx_path)
+    indexer = DocxIndexer(docx_path, profile=profile)
     paragraphs = indexer.index()
     
     print(f"Indexed {len(paragraphs)} paragraphs")
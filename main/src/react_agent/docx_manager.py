@@ -1,120 +1,979 @@
 """DOCX Manager for reading and updating DOCX documents."""
 
-import asyncio
+import logging
+import os
+import re
 import shutil
+import threading
+from dataclasses import asdict
+from datetime import UTC, datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from copy import deepcopy
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Pattern, Tuple, Union
 from docx2python import docx2python
 from docx import Document
-from react_agent.docx_indexer import DocxIndexer
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml import OxmlElement, parse_xml
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph as DocxParagraph
+from lxml import etree
+from react_agent.compact import parse_anchor
+from react_agent.docx_chunks import DEFAULT_CHUNK_TOKENS, ChunkIndex
+from react_agent.docx_executor import DocxExecutor, get_docx_executor
+from react_agent.docx_indexer import (
+    _PARA_ID,
+    _W14_NS,
+    NAMESPACES,
+    DocxIndexer,
+    Paragraph,
+    _mint_paragraph_id,
+    _outline_level,
+    _style_label,
+)
+from react_agent.docx_saver import SavePipeline, patch_zip
+from react_agent.edit_journal import EDIT, INSERT, EditJournal, JournalEntry, journal_path_for
+from react_agent.heading_rules import HeadingRules, load_heading_rules
+from react_agent.paragraph_diff import apply_minimal_edit, apply_text_changes, splice
+from react_agent.paragraph_sequence import ParagraphSequence, Slot
+from react_agent.version_store import VersionStore, version_store_path_for
+
+logger = logging.getLogger(__name__)
+
+# A body paragraph reference: its anchor (as a list or in short form such as
+# "b.0.0.0.5"), or its stable id
+ParagraphRef = Union[List[Any], str]
+
+# Paragraphs of a replace_all() shown in its result and approval prompt
+REPLACE_SAMPLE_SIZE = 5
 
 
 class DocxManager:
     """Manage DOCX documents with read and update capabilities."""
     
-    def __init__(self, docx_path: str):
-        """Initialize manager with a DOCX file path."""
+    def __init__(
+        self,
+        docx_path: str,
+        profile: str = "body",
+        index_workers: int = 1,
+        heading_rules: Optional[HeadingRules] = None,
+        save_window: float = 0.0,
+        keep_versions: bool = True,
+        edit_mode: str = "minimal",
+        executor: Optional[DocxExecutor] = None,
+        chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+    ):
+        """Initialize manager with a DOCX file path and indexing profile.
+
+        ``index_workers`` > 1 indexes large documents in that many processes.
+        ``heading_rules`` overrides the default heading detection rules.
+        ``save_window`` is how many seconds edits are collected before they
+        are written to disk in one atomic save (0 saves after every edit).
+        ``keep_versions`` snapshots the document into a deduplicated version
+        store when it is first loaded and after every save.
+        ``edit_mode`` "minimal" rewrites only the runs an edit changes, keeping
+        their formatting; "replace" replaces the paragraph's runs with one
+        unformatted run.
+        ``executor`` runs indexing and the tools' document work; the global
+        DOCX executor by default. Its process pool, if any, is used to parse.
+        ``chunk_tokens`` is the token budget of the chunks get_chunk() returns.
+        """
+        if edit_mode not in ("minimal", "replace"):
+            raise ValueError(f"Unknown edit mode: {edit_mode}")
+        self.edit_mode = edit_mode
         self.docx_path = Path(docx_path)
-        self.indexer = DocxIndexer(str(self.docx_path))
-        self.index_data: List[Dict[str, Any]] = []
+        self.indexer = DocxIndexer(str(self.docx_path), profile=profile, heading_rules=heading_rules)
+        self.index_workers = index_workers
+        self.executor = executor if executor is not None else get_docx_executor()
+        # Body paragraphs in document order; patched in place by edits
+        self.body: Optional[ParagraphSequence] = None
+        # Stable paragraph id -> slot; the slot gives the current anchor
+        self._ids: Dict[str, Slot] = {}
+        # Chunk boundaries over body slot positions; patched by edits
+        self.chunks = ChunkIndex(chunk_tokens)
         self._index_loaded = False
+        # File version the body index was built from or last saved as
+        self._index_signature: Optional[Tuple[int, int]] = None
+        self._all_paragraphs: Optional[List[Dict[str, Any]]] = None
+        # Document whose w:p elements are bound to the body slots
+        self._bound_document: Any = None
+        # Set when an edit changed how headings are detected document-wide
+        self._reindex_after_save = False
+        self._lock = threading.RLock()
+        # The python-docx document being edited, kept between edits so that
+        # unsaved edits accumulate on it, and the file version it matches.
+        self._document: Any = None
+        self._document_signature: Optional[Tuple[int, int]] = None
+        self._saver = SavePipeline(str(self.docx_path), save_window, on_saved=self._on_saved)
+        self.journal = EditJournal(str(journal_path_for(str(self.docx_path))))
+        self._recovered = False
+        # Journal version included in the save being written
+        self._writing_version = 0
+        self.versions = (
+            VersionStore(str(version_store_path_for(str(self.docx_path)))) if keep_versions else None
+        )
     
     def _refresh_index(self) -> None:
-        """Refresh the internal index."""
-        self.index_data = self.indexer.index()
-        self._index_loaded = True
+        """Refresh the internal index.
+
+        The first time, edits left in the journal by a crash are re-applied
+        and saved.
+        """
+        if self.versions is not None and not self.versions.list_versions():
+            self.versions.snapshot(str(self.docx_path), label="original")
+        with self._lock:
+            signature = self.indexer._file_signature()
+            self.indexer.index(self.index_workers, self.executor.process_pool)
+            self.body = ParagraphSequence(self.indexer.body_slots())
+            self._ids = {s.paragraph.id: s for s in self.body if s.paragraph is not None}
+            self.chunks.build(s.paragraph for s in self.body)
+            self._bound_document = None
+            self._all_paragraphs = None
+            self._index_signature = signature
+            self._reindex_after_save = False
+            self._index_loaded = True
+            recovered = 0 if self._recovered else self._recover()
+            self._recovered = True
+        if recovered:
+            self._request_save()
+        elif self.journal.pending():
+            # Everything pending was already on disk.
+            self.journal.record_saved(self.journal.version)
     
     async def _ensure_index_loaded(self) -> None:
-        """Ensure the index is loaded, loading it asynchronously if needed."""
-        if not self._index_loaded:
-            self.index_data = await asyncio.to_thread(self.indexer.index)
-            self._index_loaded = True
+        """Ensure the index is loaded, loading it asynchronously if needed.
+
+        Edits patch the in-memory index, so it is only rebuilt when the file
+        was changed by something else. While edits wait to be saved the
+        index already reflects them and is used as is.
+        """
+        if self._saver.pending:
+            return
+        if not self._index_loaded or self._index_signature != self.indexer._file_signature():
+            await self.executor.run(self._refresh_index)
+
+    @property
+    def index_data(self) -> List[Dict[str, Any]]:
+        """All indexed body paragraphs, as returned by get_all_paragraphs()."""
+        return self.get_all_paragraphs()
+
+    def _load_document(self) -> Any:
+        """Return the python-docx document to edit, reusing it while current."""
+        signature = self.indexer._file_signature()
+        if self._document is None or (
+            not self._saver.pending and self._document_signature != signature
+        ):
+            self._document = Document(str(self.docx_path))
+            self._document_signature = signature
+        return self._document
+
+    def _write_document(self, stream: BinaryIO) -> None:
+        """Serialize the document being edited (run by the save pipeline).
+
+        Edits only change the main document part, so that part and the core
+        properties are written afresh and every other part, media included,
+        is copied from the file on disk without recompressing it.
+        """
+        with self._lock:
+            self._writing_version = self.journal.version
+            doc = self._document
+            doc.core_properties.modified = datetime.now(UTC)
+            core = doc.part.package.part_related_by(RT.CORE_PROPERTIES)
+            replacements = {
+                str(part.partname).lstrip("/"): part.blob for part in (doc.part, core)
+            }
+            try:
+                patch_zip(self.docx_path, stream, replacements)
+            except KeyError:
+                # A part python-docx added (e.g. missing core properties)
+                # needs a full save to update content types and rels.
+                stream.seek(0)
+                stream.truncate()
+                doc.save(stream)
+
+    def _on_saved(self) -> None:
+        """Record the saved file version, in the journal too.
+
+        The index already reflects what was written, so it is kept.
+        """
+        with self._lock:
+            self._document_signature = self.indexer._file_signature()
+            if not self._reindex_after_save:
+                self._index_signature = self._document_signature
+            self.journal.record_saved(self._writing_version)
+            version = self._writing_version
+        if self.versions is not None:
+            self.versions.snapshot(str(self.docx_path), label=f"edit {version}")
+
+    def _element(self, slot: Slot) -> Any:
+        """Return the live w:p of a body slot, or None if slots cannot be bound.
+
+        Every body w:p of the document being edited is bound to its slot in
+        document order the first time one is needed. Indexing produces one
+        slot per w:p, so this only fails for layouts docx2python walks
+        differently, where edits fall back to matching paragraphs by text.
+        Minted paragraph ids are written to their w:p as w14:paraId then, so
+        they are kept in the file from the next save on.
+        """
+        doc = self._load_document()
+        if self._bound_document is not doc:
+            elements = list(doc.element.body.iter(qn("w:p")))
+            if len(elements) != len(self.body):
+                return None
+            for bound, element in zip(self.body, elements):
+                bound.element = element
+                if bound.paragraph is not None:
+                    self._write_id(element, bound.paragraph.id)
+            self._bound_document = doc
+        return slot.element
+
+    def _write_id(self, element: Any, paragraph_id: str) -> None:
+        """Store a paragraph id as the w14:paraId of ``element``.
+
+        Only done when the document declares the w14 namespace; otherwise
+        the id lives in the index alone.
+        """
+        if self._document.element.nsmap.get("w14") == _W14_NS and element.get(_PARA_ID) != paragraph_id:
+            element.set(_PARA_ID, paragraph_id)
+
+    def _new_id(self, element: Any = None) -> str:
+        """Return an unused id for a newly indexed paragraph, keeping its paraId if free."""
+        existing = element.get(_PARA_ID) if element is not None else None
+        if existing is not None and existing not in self._ids:
+            return existing
+        return _mint_paragraph_id(os.urandom(8).hex(), self._ids)
+
+    def _locate(self, ref: ParagraphRef) -> Optional[Slot]:
+        """Return the body slot of an anchor or paragraph id, or None."""
+        if self.body is None:
+            return None
+        ref = _as_anchor(ref)
+        if isinstance(ref, str):
+            return self._ids.get(ref)
+        return self.body.find(ref) if ref and ref[0] == "body" else None
+
+    def _find_slot(self, paragraph_id: Optional[str], anchor: List[Any]) -> Optional[Slot]:
+        """Return the body slot of a journaled paragraph: by its id, else at its anchor."""
+        slot = self._ids.get(paragraph_id) if paragraph_id is not None else None
+        return slot if slot is not None else self._locate(anchor)
+
+    def _level_of(self, element: Any, text: str) -> int:
+        """Return the heading level of a paragraph the way indexing would."""
+        if self.indexer.style_levels is None:
+            return self.indexer._detect_heading_level(text) or 0
+        direct = element.find(f"{qn('w:pPr')}/{qn('w:outlineLvl')}")
+        if direct is not None:
+            return _outline_level(direct.get(qn("w:val")))
+        return self.indexer.style_levels.get(element.style, 0)
+
+    def _has_outline_level(self, element: Any) -> bool:
+        """Whether a paragraph has an outline level of its own or from its style."""
+        direct = element.find(f"{qn('w:pPr')}/{qn('w:outlineLvl')}")
+        if direct is not None:
+            return _outline_level(direct.get(qn("w:val"))) > 0
+        return self.indexer.get_style_levels().get(element.style, 0) > 0
+
+    def _patch_slot(self, slot: Slot, previous: str, new_text: str) -> None:
+        """Update the index entry of an edited paragraph.
+
+        A list number docx2python put in front of the text is kept. The
+        heading level is re-derived and breadcrumbs are fixed up locally.
+        """
+        paragraph = slot.paragraph
+        old_text = paragraph.text if paragraph is not None else ""
+        old_level = paragraph.level if paragraph is not None else 0
+        previous = previous.strip()
+        prefix = old_text[: len(old_text) - len(previous)] if previous and old_text.endswith(previous) else ""
+        text = (prefix + new_text).strip()
+        if not text:
+            if paragraph is not None:
+                self._ids.pop(paragraph.id, None)
+            slot.paragraph = None
+        else:
+            level = self._level_of(slot.element, text) if slot.element is not None else old_level
+            if paragraph is None:
+                paragraph = slot.paragraph = Paragraph(
+                    anchor=[], breadcrumb="", style="", text="", id=self._new_id(slot.element)
+                )
+                self._ids[paragraph.id] = slot
+                if slot.element is not None:
+                    self._write_id(slot.element, paragraph.id)
+            paragraph.text, paragraph.level, paragraph.style = text, level, _style_label(level)
+        levels = [level for level in (old_level, slot.paragraph.level if slot.paragraph else 0) if level > 0]
+        self.body.reflow_breadcrumbs(slot, min(levels, default=0))
+        self.chunks.update(self.body.rank(slot), slot.paragraph)
+        self._all_paragraphs = None
+
+    def flush(self) -> bool:
+        """Write pending edits to disk now. Return True if anything was written."""
+        return self._saver.flush()
+
+    def get_save_metrics(self) -> Dict[str, int]:
+        """Return saves requested, saves performed and bytes written."""
+        return self._saver.get_metrics()
+
+    def describe(self) -> str:
+        """Summarize the document's state in one line for the model's prompt.
+
+        Reads without the lock, which indexing holds for seconds, so the
+        event loop never waits; the line may lag an edit in progress.
+        """
+        parts = [f"Open document: {self.docx_path.name}"]
+        if self._index_loaded:
+            parts.append(f"{len(self._ids)} body paragraphs")
+        if self._saver.pending:
+            parts.append("edits not saved yet")
+        if self.journal.peek_undo() is not None:
+            parts.append("last edit can be undone")
+        return "; ".join(parts) + "."
     
-    def get_paragraph(self, anchor: List[Any]) -> Optional[Dict[str, Any]]:
-        """Get a paragraph by its anchor.
+    def get_paragraph(self, anchor: ParagraphRef) -> Optional[Dict[str, Any]]:
+        """Get a paragraph by its anchor or id.
         
         Args:
-            anchor: List representing [body, table, row, col, par] position
+            anchor: List representing [body, table, row, col, par] position,
+                or the paragraph's stable id. Anchors starting with "header",
+                "footer", "footnote" or "comment" are looked up in that
+                namespace, which is indexed on first use.
             
         Returns:
             Dictionary with paragraph info or None if not found
         """
+        anchor = _as_anchor(anchor)
+        if not isinstance(anchor, str) and anchor and anchor[0] != "body":
+            return self.indexer.find_by_anchor(anchor)
+
         # Note: This method assumes the index is already loaded
         # The async wrapper in tools.py will call _ensure_index_loaded first
-        for p in self.index_data:
-            if p['anchor'] == anchor:
-                return p
-        return None
+        slot = self._locate(anchor)
+        if slot is None or slot.paragraph is None:
+            return None
+        return self._slot_entry(slot)
     
+    def get_paragraphs(self, anchors: List[ParagraphRef]) -> List[Optional[Dict[str, Any]]]:
+        """Get several paragraphs by anchor or id, in the order asked.
+
+        Each body lookup is O(log n), so the cost depends on how many
+        paragraphs are asked for, not on the document size. Entries not
+        found are None.
+        """
+        with self._lock:
+            return [self.get_paragraph(anchor) for anchor in anchors]
+
+    def get_context(
+        self, anchor: ParagraphRef, before: int = 2, after: int = 2
+    ) -> Optional[Dict[str, Any]]:
+        """Get a body paragraph with its neighbours in document order.
+
+        Returns the paragraph and up to ``before`` and ``after`` non-empty
+        paragraphs around it (across table cells, as they read), or None if
+        the anchor does not exist. The walk starts from the paragraph's
+        slot, so it costs O(log n) plus the paragraphs returned.
+        """
+        with self._lock:
+            slot = self._locate(anchor)
+            if slot is None or slot.paragraph is None:
+                return None
+            return {
+                "paragraph": self._slot_entry(slot),
+                "before": self._neighbours(slot, before, self.body.prev)[::-1],
+                "after": self._neighbours(slot, after, self.body.next),
+            }
+
+    def _neighbours(self, slot: Slot, count: int, step: Any) -> List[Dict[str, Any]]:
+        """Return up to ``count`` indexed paragraphs from ``slot`` in one direction."""
+        found: List[Dict[str, Any]] = []
+        current = step(slot)
+        while current is not None and len(found) < count:
+            if current.paragraph is not None:
+                found.append(self._slot_entry(current))
+            current = step(current)
+        return found
+
+    def _slot_entry(self, slot: Slot) -> Dict[str, Any]:
+        """Return an indexed slot's paragraph with its current anchor."""
+        slot.paragraph.anchor = self.body.anchor_of(slot)
+        return asdict(slot.paragraph)
+
+    def get_chunk(self, index: int) -> Optional[Dict[str, Any]]:
+        """Get chunk ``index`` of the body: its paragraphs, in order.
+
+        Returns None for an index out of range. The chunk's slots are found
+        by position, so this costs O(log n) plus the chunk's size.
+        """
+        with self._lock:
+            if self.body is None or not 0 <= index < len(self.chunks):
+                return None
+            start, end = self.chunks.bounds(index)
+            paragraphs: List[Dict[str, Any]] = []
+            slot = self.body.select(start)
+            for _ in range(end - start):
+                if slot.paragraph is not None:
+                    paragraphs.append(self._slot_entry(slot))
+                slot = self.body.next(slot)
+            return {
+                "index": index,
+                "count": len(self.chunks),
+                "tokens": self.chunks.tokens(index),
+                "paragraphs": paragraphs,
+            }
+
+    def iter_chunks(self, start: int = 0) -> Iterator[Dict[str, Any]]:
+        """Yield the body's chunks from ``start`` on, as get_chunk() returns them.
+
+        Each chunk is read when it is reached, so edits made in between
+        are seen.
+        """
+        index = start
+        while (chunk := self.get_chunk(index)) is not None:
+            yield chunk
+            index += 1
+
+    def list_chunks(self) -> List[Dict[str, Any]]:
+        """Describe every chunk: where it starts, its section and its tokens."""
+        with self._lock:
+            if self.body is None:
+                return []
+            chunks: List[Dict[str, Any]] = []
+            for index in range(len(self.chunks)):
+                start, _ = self.chunks.bounds(index)
+                slot = self.body.select(start)
+                first = slot.paragraph or self._first_paragraph_after(slot)
+                chunks.append({
+                    "index": index,
+                    "anchor": self.body.anchor_of(slot),
+                    "breadcrumb": first.breadcrumb if first is not None else "",
+                    "tokens": self.chunks.tokens(index),
+                })
+            return chunks
+
+    def _first_paragraph_after(self, slot: Optional[Slot]) -> Optional[Paragraph]:
+        """Return the first indexed paragraph from ``slot`` on, or None."""
+        while slot is not None and slot.paragraph is None:
+            slot = self.body.next(slot)
+        return slot.paragraph if slot is not None else None
+
     def get_outline(self) -> List[Dict[str, Any]]:
         """Get document outline (headings only).
         
         Returns:
             List of heading paragraphs with metadata
         """
-        return self.indexer.get_outline()
+        return [p for p in self.get_all_paragraphs() if p["level"] > 0]
     
-    def search(self, query: str, case_sensitive: bool = False) -> List[Dict[str, Any]]:
+    def search(
+        self, query: str, case_sensitive: bool = False, namespace: Optional[str] = "body"
+    ) -> List[Dict[str, Any]]:
         """Search for paragraphs containing text.
         
         Args:
             query: Text to search for
             case_sensitive: Whether to match case
+            namespace: "body", "header", "footer", "footnote", "comment",
+                or None for all of them
             
         Returns:
             List of matching paragraphs
         """
-        return self.indexer.find_by_text(query, case_sensitive)
+        results: List[Dict[str, Any]] = []
+        if namespace in ("body", None):
+            search = query if case_sensitive else query.lower()
+            results.extend(
+                p for p in self.get_all_paragraphs()
+                if search in (p["text"] if case_sensitive else p["text"].lower())
+            )
+        if namespace != "body":
+            for name in NAMESPACES if namespace is None else (namespace,):
+                results.extend(self.indexer.find_by_text(query, case_sensitive, name))
+        return results
     
-    def update_paragraph(self, anchor: List[Any], new_text: str) -> bool:
+    def update_paragraph(
+        self, anchor: ParagraphRef, new_text: str, session: Optional[str] = None
+    ) -> bool:
         """Update a paragraph at the given anchor.
         
         Args:
-            anchor: List representing [body, table, row, col, par] position
+            anchor: List representing [body, table, row, col, par] position,
+                or the paragraph's stable id
             new_text: New text content for the paragraph
+            session: Conversation the edit came from, recorded in the journal
             
         Returns:
             True if successful, False otherwise
         """
         try:
-            # Load the document with python-docx for editing
-            doc = Document(str(self.docx_path))
-            
-            # Extract the position from anchor
-            if len(anchor) < 5 or anchor[0] != "body":
-                return False
-            
-            _, table_idx, row_idx, col_idx, par_idx = anchor
-            
-            # For simplicity, we'll update based on paragraph index
-            # Note: This is a simplified approach. In production, you'd want
-            # more sophisticated mapping between docx2python and python-docx structures
-            
-            # Try to find the paragraph by matching text
-            old_para = self.get_paragraph(anchor)
-            if not old_para:
-                return False
-            
-            old_text = old_para['text']
-            
-            # Search for the paragraph in the document
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip() == old_text:
-                    # Update the paragraph
-                    paragraph.text = new_text
-                    
-                    # Save the document
-                    doc.save(str(self.docx_path))
-                    
-                    # Refresh index
-                    self._refresh_index()
-                    return True
-            
-            return False
+            with self._lock:
+                slot = self._locate(anchor)
+                if slot is None or slot.paragraph is None:
+                    return False
+                anchor = self.body.anchor_of(slot)
+                paragraph_id = slot.paragraph.id
+                element = self._element(slot)
+                if element is not None:
+                    previous = self._set_text(DocxParagraph(element, None), new_text)
+                    self._patch_slot(slot, previous, new_text)
+                else:
+                    previous = self._replace_text(anchor, slot.paragraph.text, new_text, paragraph_id)
+                    if previous is None:
+                        return False
+                self.journal.record_edit(anchor, previous, new_text, session, paragraph_id)
+
+            self._request_save()
+            return True
             
         except Exception as e:
             print(f"Error updating paragraph: {e}")
             return False
+
+    def _set_text(self, paragraph: DocxParagraph, new_text: str) -> str:
+        """Give a paragraph new text in the configured edit mode; return the old text."""
+        previous = paragraph.text
+        if self.edit_mode != "minimal" or apply_minimal_edit(paragraph._p, new_text) is None:
+            paragraph.text = new_text
+        return previous
+
+    def _replace_text(
+        self, anchor: List[Any], old_text: str, new_text: str, paragraph_id: Optional[str] = None
+    ) -> Optional[str]:
+        """Replace the paragraph whose stripped text is ``old_text``.
+
+        The paragraph with id ``paragraph_id`` is tried first, then the one
+        at ``anchor``, which moves when paragraphs are inserted or deleted
+        before it; failing both, the first body paragraph with that text is
+        used. Works on the in-memory document, which holds edits since the
+        last save. Returns the paragraph's previous text, or None if not found.
+        """
+        doc = self._load_document()
+        old_text = old_text.strip()
+        first = self.body.first() if self.body is not None else None
+        if first is not None and self._element(first) is not None:
+            tried = [self._ids.get(paragraph_id) if paragraph_id is not None else None]
+            tried.append(self.body.find(anchor) if anchor and anchor[0] == "body" else None)
+            for slot in [s for s in tried if s is not None] + list(self.body):
+                paragraph = DocxParagraph(slot.element, None)
+                if paragraph.text.strip() == old_text:
+                    previous = self._set_text(paragraph, new_text)
+                    self._patch_slot(slot, previous, new_text)
+                    return previous
+            return None
+        for paragraph in doc.paragraphs:
+            if paragraph.text.strip() == old_text:
+                return self._set_text(paragraph, new_text)
+        return None
+
+    def _request_save(self) -> None:
+        """Save now, or with later edits once the save window closes.
+
+        Must be called without holding the manager lock: a coalesced save
+        runs on the pipeline's timer thread and takes that lock to write.
+        """
+        self._saver.request_save(self._write_document)
+
+    def undo_edit(self, session: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Revert the most recent edit, insert or delete that has not been undone.
+
+        Returns the reverted delta, or None if there is nothing to undo.
+        Raises ValueError if the paragraph no longer holds the edited text.
+        """
+        with self._lock:
+            edit = self.journal.peek_undo()
+            if edit is None:
+                return None
+            if not self._apply(edit, forward=False):
+                raise ValueError(f"Paragraph at {edit.anchor} no longer holds the edited text")
+            self.journal.record_undo(edit, session)
+        self._request_save()
+        return {"anchor": edit.anchor, "text": edit.old_text.strip(), "undone_text": edit.new_text}
+
+    def redo_edit(self, session: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Re-apply the most recently undone edit.
+
+        Returns the re-applied delta, or None if there is nothing to redo.
+        Raises ValueError if the paragraph no longer holds the original text.
+        """
+        with self._lock:
+            edit = self.journal.peek_redo()
+            if edit is None:
+                return None
+            if not self._apply(edit):
+                raise ValueError(f"Paragraph at {edit.anchor} no longer holds the original text")
+            self.journal.record_redo(edit, session)
+        self._request_save()
+        return {"anchor": edit.anchor, "text": edit.new_text.strip()}
+
+    def _apply(self, edit: JournalEntry, forward: bool = True) -> bool:
+        """Apply a journaled change, or revert it; return False if its paragraph is not found.
+
+        Inserts and deletes are replayed at their recorded anchor. That is
+        where they happened, since the changes after them have been reverted
+        (undo) or are not applied yet (redo, recovery).
+        """
+        if edit.op == EDIT:
+            old_text, new_text = (edit.old_text, edit.new_text) if forward else (edit.new_text, edit.old_text)
+            return self._replace_text(edit.anchor, old_text, new_text, edit.paragraph_id) is not None
+        if (edit.op == INSERT) == forward:
+            return self._put_back(edit) is not None
+        slot = self._journaled_slot(edit)
+        if slot is None or self.body.is_alone(slot) or self._element(slot) is None:
+            return False
+        self._remove_slot(slot)
+        return True
+
+    def _applied(self, edit: JournalEntry, forward: bool = True) -> bool:
+        """Whether the document already shows a journaled change (or its reversal)."""
+        if edit.op == EDIT:
+            slot = self._find_slot(edit.paragraph_id, edit.anchor)
+            text = (edit.new_text if forward else edit.old_text).strip()
+            return slot is not None and slot.paragraph is not None and slot.paragraph.text == text
+        return (self._journaled_slot(edit) is not None) == ((edit.op == INSERT) == forward)
+
+    def _journaled_slot(self, edit: JournalEntry) -> Optional[Slot]:
+        """Return the slot of an inserted or deleted paragraph, if it is in the body."""
+        slot = self._find_slot(edit.paragraph_id, edit.anchor)
+        text = slot.paragraph.text if slot is not None and slot.paragraph is not None else ""
+        expected = edit.new_text if edit.op == INSERT else edit.old_text
+        return slot if slot is not None and text == expected.strip() else None
+
+    def _put_back(self, edit: JournalEntry) -> Optional[Slot]:
+        """Put a journaled paragraph back at its anchor; None if that place is gone."""
+        container, position = list(edit.anchor[:-1]), edit.anchor[-1]
+        neighbour = self._locate([*container, max(position - 1, 0)])
+        if neighbour is None or self._element(neighbour) is None:
+            return None
+        element = parse_xml(edit.xml)
+        if position == 0:
+            neighbour.element.addprevious(element)
+        else:
+            neighbour.element.addnext(element)
+        text = edit.new_text if edit.op == INSERT else edit.old_text
+        return self._add_slot(neighbour, element, text.strip(), edit.paragraph_id, before=position == 0)
+
+    def _add_slot(
+        self, slot: Slot, element: Any, text: str, paragraph_id: Optional[str], before: bool = False
+    ) -> Slot:
+        """Index ``element``, just placed after (or before) the w:p of ``slot``, as a new slot.
+
+        It keeps ``paragraph_id`` if that is free.
+        """
+        level = self._level_of(element, text) if text else 0
+        if self.indexer.style_levels is None and self._has_outline_level(element):
+            # The first outline-level paragraph switches the whole
+            # document from guessed to styled headings.
+            self._reindex_after_save = True
+        if paragraph_id is None or paragraph_id in self._ids:
+            paragraph_id = self._new_id(element)
+        entry = Paragraph(
+            anchor=[], breadcrumb="", style=_style_label(level), text=text, level=level, id=paragraph_id,
+        ) if text else None
+        new = (self.body.insert_before if before else self.body.insert_after)(slot, entry)
+        new.element = element
+        if entry is not None:
+            self._ids[entry.id] = new
+            self._write_id(element, entry.id)
+        self.body.reflow_breadcrumbs(new, level)
+        self.chunks.insert(self.body.rank(new), entry)
+        self._all_paragraphs = None
+        return new
+
+    def _forget(self, slot: Slot) -> int:
+        """Drop a slot's paragraph from the id map before it goes; return its level."""
+        paragraph = slot.paragraph
+        level = paragraph.level if paragraph is not None else 0
+        if paragraph is not None:
+            self._ids.pop(paragraph.id, None)
+        if self.indexer.style_levels is not None and level > 0:
+            # Without outline-level paragraphs headings are guessed instead.
+            self._reindex_after_save = not any(
+                p.level > 0 for s in self.body if s is not slot and (p := s.paragraph)
+            )
+        return level
+
+    def _remove_slot(self, slot: Slot) -> None:
+        """Remove a bound slot that is not alone in its container, and its w:p."""
+        level = self._forget(slot)
+        position = self.body.rank(slot)
+        following = self.body.next(slot)
+        slot.element.getparent().remove(slot.element)
+        self.body.remove(slot)
+        self.chunks.remove(position)
+        if following is not None:
+            self.body.reflow_breadcrumbs(following, level)
+        self._all_paragraphs = None
+
+    def insert_paragraph(
+        self,
+        after_anchor: ParagraphRef,
+        text: str,
+        style: Optional[str] = None,
+        session: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Insert a paragraph after the body paragraph at ``after_anchor``.
+
+        The new paragraph goes into the same container (top-level text or
+        table cell). Without ``style`` it copies the paragraph properties and
+        run formatting of the one before it, so a new bullet follows a
+        bullet; ``style`` names a paragraph style such as "Heading 2".
+        Later anchors in the container shift by one without re-indexing.
+
+        ``after_anchor`` may also be a paragraph id. The insert is journaled,
+        so undo_edit() takes it out again. Returns the new
+        paragraph, or None if the anchor does not exist. Raises ValueError
+        for an unknown style or when paragraph positions cannot be matched
+        to the document.
+        """
+        with self._lock:
+            slot = self._locate(after_anchor)
+            if slot is None:
+                return None
+            previous = self._element(slot)
+            if previous is None:
+                raise ValueError("Paragraph positions do not match the document; re-index it first")
+            element = OxmlElement("w:p")
+            if style is None and previous.pPr is not None:
+                properties = deepcopy(previous.pPr)
+                for section in properties.findall(qn("w:sectPr")):
+                    properties.remove(section)
+                element.append(properties)
+            paragraph = DocxParagraph(element, self._document._body)
+            if style is not None:
+                try:
+                    paragraph.style = style
+                except KeyError:
+                    raise ValueError(f"No paragraph style named {style!r}") from None
+            run = paragraph.add_run(text)
+            runs = previous.xpath("w:r[w:t] | w:hyperlink/w:r[w:t]")
+            if style is None and runs and runs[-1].rPr is not None:
+                run._r.insert(0, deepcopy(runs[-1].rPr))
+            previous.addnext(element)
+
+            text = text.strip()
+            if style is None and slot.paragraph is not None:
+                # Keep a bullet docx2python shows in front of the text; a
+                # list number is only right after the next full index.
+                prefix = slot.paragraph.text[: len(slot.paragraph.text) - len(
+                    DocxParagraph(previous, None).text.strip()
+                )]
+                if prefix and not any(c.isalnum() for c in prefix):
+                    text = prefix + text
+            new = self._add_slot(slot, element, text, None)
+            entry = new.paragraph
+            anchor = self.body.anchor_of(new)
+            self.journal.record_insert(
+                anchor, entry.id if entry is not None else None, _serialize(element), text, session
+            )
+        self._request_save()
+        if entry is None:
+            return {"anchor": anchor, "text": ""}
+        entry.anchor = anchor
+        return asdict(entry)
+
+    def delete_paragraph(
+        self, anchor: ParagraphRef, session: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Delete the body paragraph at ``anchor``.
+
+        Later anchors in its container shift down by one without
+        re-indexing. The only paragraph of a container (a table cell must
+        keep one) is emptied instead, so no other anchor moves. Either way
+        the change is journaled, so undo_edit() puts the paragraph back.
+
+        ``anchor`` may also be a paragraph id. Returns the deleted
+        paragraph, or None if the anchor does not exist. Raises ValueError
+        for a paragraph carrying section properties or when paragraph
+        positions cannot be matched to the document.
+        """
+        with self._lock:
+            slot = self._locate(anchor)
+            if slot is None:
+                return None
+            anchor = self.body.anchor_of(slot)
+            element = self._element(slot)
+            if element is None:
+                raise ValueError("Paragraph positions do not match the document; re-index it first")
+            if element.find(f"{qn('w:pPr')}/{qn('w:sectPr')}") is not None:
+                raise ValueError(f"Paragraph at {anchor} ends a section and cannot be deleted")
+            deleted = slot.paragraph
+            paragraph_id = deleted.id if deleted is not None else None
+            if self.body.is_alone(slot):
+                # Emptied, not removed: journaled as an edit of its text
+                previous = DocxParagraph(element, None).text
+                level = self._forget(slot)
+                for child in list(element):
+                    if child.tag != qn("w:pPr"):
+                        element.remove(child)
+                slot.paragraph = None
+                self.chunks.update(self.body.rank(slot), None)
+                self.body.reflow_breadcrumbs(slot, level)
+                self._all_paragraphs = None
+                self.journal.record_edit(anchor, previous, "", session, paragraph_id)
+            else:
+                xml = _serialize(element)
+                self._remove_slot(slot)
+                self.journal.record_delete(
+                    anchor, paragraph_id, xml, deleted.text if deleted is not None else "", session
+                )
+        self._request_save()
+        if deleted is None:
+            return {"anchor": list(anchor), "text": ""}
+        deleted.anchor = list(anchor)
+        return asdict(deleted)
+
+    def _scope(self, scope: Optional[ParagraphRef]) -> Iterator[Slot]:
+        """Yield the body slots ``scope`` covers.
+
+        None (or "body") is the whole body. A heading covers its section, up
+        to the next heading at the same or a higher level; any other
+        paragraph covers only itself. Raises ValueError for an unknown scope.
+        """
+        if scope is None or scope == "body":
+            yield from self.body if self.body is not None else ()
+            return
+        slot = self._locate(scope)
+        if slot is None or slot.paragraph is None:
+            raise ValueError(f"No paragraph at scope {scope}")
+        level = slot.paragraph.level
+        current: Optional[Slot] = slot
+        while current is not None:
+            if current is not slot and level > 0 and current.paragraph is not None and (
+                0 < current.paragraph.level <= level
+            ):
+                return
+            yield current
+            if level == 0:
+                return
+            current = self.body.next(current)
+
+    def preview_replace(
+        self,
+        pattern: str,
+        replacement: str,
+        scope: Optional[ParagraphRef] = None,
+        regex: bool = False,
+        case_sensitive: bool = True,
+    ) -> Dict[str, Any]:
+        """Count what replace_all() would change, from the index alone.
+
+        Returns the number of matches and paragraphs, and a sample of the
+        paragraphs before and after. Raises ValueError like replace_all().
+        """
+        compiled = _compile_pattern(pattern, regex, case_sensitive)
+        matches = paragraphs = 0
+        sample: List[Dict[str, Any]] = []
+        with self._lock:
+            for slot in self._scope(scope):
+                if slot.paragraph is None:
+                    continue
+                text = slot.paragraph.text
+                changes = _match_spans(compiled, replacement, text, regex)
+                if not changes:
+                    continue
+                matches += len(changes)
+                paragraphs += 1
+                if len(sample) < REPLACE_SAMPLE_SIZE:
+                    sample.append(_replace_sample(
+                        self.body.anchor_of(slot), slot.paragraph.id, text, splice(text, changes)
+                    ))
+        return {"matches": matches, "paragraphs": paragraphs, "sample": sample}
+
+    def replace_all(
+        self,
+        pattern: str,
+        replacement: str,
+        scope: Optional[ParagraphRef] = None,
+        regex: bool = False,
+        case_sensitive: bool = True,
+        session: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        r"""Replace every match of ``pattern`` in the body paragraphs of ``scope``.
+
+        Candidate paragraphs are found in the index; each is then changed in
+        place, span by span, so a replacement takes the formatting of the
+        first character it replaces and runs around it are kept. All changed
+        paragraphs are journaled together and saved once. With ``regex``,
+        ``replacement`` may use group references such as ``\1``.
+
+        Returns the number of matches and paragraphs changed, and a sample.
+        Raises ValueError for an empty or invalid pattern, an unknown scope,
+        or when paragraph positions cannot be matched to the document.
+        """
+        compiled = _compile_pattern(pattern, regex, case_sensitive)
+        matches = 0
+        sample: List[Dict[str, Any]] = []
+        edits: List[Tuple[List[Any], Optional[str], str, str]] = []
+        with self._lock:
+            candidates = [
+                slot for slot in self._scope(scope)
+                if slot.paragraph is not None and compiled.search(slot.paragraph.text)
+            ]
+            if candidates and self._element(candidates[0]) is None:
+                raise ValueError("Paragraph positions do not match the document; re-index it first")
+            for slot in candidates:
+                paragraph = DocxParagraph(slot.element, None)
+                old_text = paragraph.text
+                changes = _match_spans(compiled, replacement, old_text, regex)
+                if not changes:
+                    continue
+                new_text = splice(old_text, changes)
+                paragraph_id = slot.paragraph.id
+                if self.edit_mode != "minimal" or apply_text_changes(slot.element, changes) is None:
+                    paragraph.text = new_text
+                self._patch_slot(slot, old_text, new_text)
+                anchor = self.body.anchor_of(slot)
+                edits.append((anchor, paragraph_id, old_text, new_text))
+                matches += len(changes)
+                if len(sample) < REPLACE_SAMPLE_SIZE:
+                    kept_id = slot.paragraph.id if slot.paragraph is not None else None
+                    sample.append(_replace_sample(anchor, kept_id, old_text, new_text))
+            if edits:
+                self.journal.record_edits(edits, session)
+        if edits:
+            self._request_save()
+        return {"matches": matches, "paragraphs": len(edits), "sample": sample}
+
+    def list_versions(self) -> List[Dict[str, Any]]:
+        """Return the stored versions of the document, oldest first."""
+        if self.versions is None:
+            return []
+        return [asdict(v) for v in self.versions.list_versions()]
+
+    def restore_version(self, version: int) -> Dict[str, Any]:
+        """Replace the document with a stored version.
+
+        Pending edits are saved first, so the state being replaced is kept as
+        a version too. The restored document is stored as a new version.
+        Edits made before the restore can no longer be undone or redone.
+        Raises KeyError if the version does not exist or versions are off.
+        """
+        if self.versions is None:
+            raise KeyError("Version store is disabled")
+        self.flush()
+        with self._lock:
+            self.versions.restore(version, str(self.docx_path))
+            self.journal.record_restore(version)
+            self._document = None
+            self._document_signature = None
+            self._index_loaded = False
+            self._index_signature = None
+        return asdict(self.versions.snapshot(str(self.docx_path), label=f"restore {version}"))
+
+    def _recover(self) -> int:
+        """Re-apply journaled edits that never reached disk. Returns their count.
+
+        An entry whose paragraph already shows the result was saved before
+        the crash and is skipped; one whose paragraph shows neither side of
+        the change is logged as a warning and skipped.
+        """
+        recovered = 0
+        for entry in self.journal.pending():
+            edit, forward = self.journal.effect(entry)
+            if self._applied(edit, forward):
+                continue
+            if not self._apply(edit, forward):
+                logger.warning(
+                    "Could not recover journaled %s #%s at %s", entry.op, entry.seq, edit.anchor
+                )
+                continue
+            recovered += 1
+        return recovered
     
     def get_all_paragraphs(self) -> List[Dict[str, Any]]:
         """Get all paragraphs with metadata.
@@ -122,7 +981,11 @@ class DocxManager:
         Returns:
             List of all paragraphs
         """
-        return self.index_data.copy()
+        if self.body is None:
+            return []
+        if self._all_paragraphs is None:
+            self._all_paragraphs = [asdict(p) for p in self.body.paragraphs()]
+        return self._all_paragraphs.copy()
     
     def export_index(self, output_path: str) -> None:
         """Export the index to a JSON file.
@@ -130,9 +993,49 @@ class DocxManager:
         Args:
             output_path: Path to save the JSON file
         """
+        if self.body is not None:
+            self.indexer.paragraphs = list(self.body.paragraphs())
         self.indexer.save_index(output_path)
 
 
+def _as_anchor(ref: ParagraphRef) -> ParagraphRef:
+    """Return a short anchor string as an anchor list; other refs unchanged."""
+    if isinstance(ref, str):
+        return parse_anchor(ref) or ref
+    return ref
+
+
+def _compile_pattern(pattern: str, regex: bool, case_sensitive: bool) -> Pattern[str]:
+    """Compile a replace_all() pattern; raise ValueError if it is empty or invalid."""
+    if not pattern:
+        raise ValueError("Pattern must not be empty")
+    try:
+        return re.compile(pattern if regex else re.escape(pattern), 0 if case_sensitive else re.IGNORECASE)
+    except re.error as e:
+        raise ValueError(f"Invalid pattern {pattern!r}: {e}") from None
+
+
+def _match_spans(
+    compiled: Pattern[str], replacement: str, text: str, regex: bool
+) -> List[Tuple[int, int, str]]:
+    """Return the ``(start, end, replacement)`` spans of the matches in ``text``."""
+    return [
+        (m.start(), m.end(), m.expand(replacement) if regex else replacement)
+        for m in compiled.finditer(text)
+        if m.end() > m.start()
+    ]
+
+
+def _serialize(element: Any) -> str:
+    """Return the XML of a w:p, as the journal keeps inserted and deleted paragraphs."""
+    return etree.tostring(element, encoding="unicode")
+
+
+def _replace_sample(anchor: List[Any], paragraph_id: Optional[str], before: str, after: str) -> Dict[str, Any]:
+    """Describe one replaced paragraph for a replace_all() result."""
+    return {"anchor": anchor, "id": paragraph_id, "before": before[:100], "after": after[:100]}
+
+
 # Global instance (will be initialized when needed)
 _docx_manager: Optional[DocxManager] = None
 
@@ -145,12 +1048,34 @@ def get_docx_manager(docx_path: Optional[str] = None) -> DocxManager:
         if docx_path is None:
             # Default path - you can make this configurable
             docx_path = "/Users/yash/Documents/rfp/DOCX-agent/response/master.docx"
-        _docx_manager = DocxManager(docx_path)
+        workers = int(os.environ.get("DOCX_INDEX_WORKERS", "1"))
+        rules_path = os.environ.get("DOCX_HEADING_RULES")
+        rules = load_heading_rules(rules_path) if rules_path else None
+        save_window = float(os.environ.get("DOCX_SAVE_WINDOW", "0"))
+        keep_versions = os.environ.get("DOCX_KEEP_VERSIONS", "1") != "0"
+        edit_mode = os.environ.get("DOCX_EDIT_MODE", "minimal")
+        chunk_tokens = int(os.environ.get("DOCX_CHUNK_TOKENS", str(DEFAULT_CHUNK_TOKENS)))
+        _docx_manager = DocxManager(
+            docx_path,
+            index_workers=workers,
+            heading_rules=rules,
+            save_window=save_window,
+            keep_versions=keep_versions,
+            edit_mode=edit_mode,
+            chunk_tokens=chunk_tokens,
+        )
     
     return _docx_manager
 
 
+def describe_open_document() -> Optional[str]:
+    """Describe the global manager's document, or None if none is open."""
+    return _docx_manager.describe() if _docx_manager is not None else None
+
+
 def reset_docx_manager() -> None:
     """Reset the global DOCX manager instance."""
     global _docx_manager
+    if _docx_manager is not None:
+        _docx_manager.flush()
     _docx_manager = None
@@ -0,0 +1,265 @@
+"""Parallel indexing of one large DOCX body across worker processes.
+
+The body is split into chunks at top-level block boundaries. Each chunk is
+wrapped into its own slim package and indexed by docx2python in a worker
+process, which returns the chunk's paragraphs with anchors and breadcrumbs
+built as if the chunk were a document of its own. A stitching pass then
+shifts anchors by the tables of the preceding chunks and fixes up the
+breadcrumbs at the start of each chunk with the heading stack carried over
+from the previous one, so the result is identical to sequential indexing.
+
+Only boundaries that docx2python handles the same whether or not the body is
+split are used:
+
+* next to a top-level table, where docx2python starts a new top-level table
+  anyway;
+* between two top-level paragraphs. docx2python groups runs of top-level
+  paragraphs into one pseudo-table, so the second chunk's leading paragraphs
+  continue the first chunk's last table and their anchors are shifted to
+  match.
+
+List numbering is counted across the whole body. Each worker first replays
+the list counters reached at its chunk start in a throwaway table, which is
+dropped from its output.
+"""
+
+import re
+from bisect import bisect_left
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Tuple
+
+from docx2python import docx2python
+from lxml import etree
+
+from react_agent.heading_rules import HeadingRules
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_P, _TBL, _VAL = f"{_W}p", f"{_W}tbl", f"{_W}val"
+_NSMAP = {"w": _W[1:-1]}
+_NUMPR_XPATH = etree.XPath("descendant-or-self::w:p/w:pPr/w:numPr", namespaces=_NSMAP)
+_BODY_START_RE = re.compile(rb"<w:body\b[^>]*>")
+_BODY_END = b"</w:body></w:document>"
+
+# Chunks smaller than this are not worth a process round trip.
+MIN_CHUNK_BYTES = 512 * 1024
+
+
+@dataclass
+class Chunk:
+    """One slice of the body to be indexed by a worker."""
+
+    xml: bytes  # a complete main document part holding only this slice
+    continues: bool  # leading paragraphs continue the previous chunk's last table
+    list_counters: List[Tuple[str, str, int]] = field(default_factory=list)
+
+
+@dataclass
+class ChunkResult:
+    """Paragraphs of one chunk, anchored and breadcrumbed locally."""
+
+    paragraphs: List[Any]
+    tables: int  # top-level tables docx2python produced for the chunk
+    last_cell_paragraphs: int  # paragraphs (empty ones included) in the last table cell
+    heading_stack: List[Dict[str, Any]]  # local heading stack after the last paragraph
+    empty_anchors: List[List[Any]] = field(default_factory=list)  # of empty paragraphs
+
+
+def plan_chunks(main_xml: bytes, chunks: int, min_chunk_bytes: int = MIN_CHUNK_BYTES) -> List[Chunk]:
+    """Split a main document part into at most ``chunks`` chunks.
+
+    Returns an empty list when the body is too small or has no usable
+    boundary, in which case the caller should index sequentially.
+    """
+    start = _BODY_START_RE.search(main_xml)
+    if start is None or chunks < 2:
+        return []
+    head = main_xml[: start.end()]
+    body = etree.fromstring(main_xml, etree.XMLParser(huge_tree=True)).find(f"{_W}body")
+    children = list(body)
+    blobs = [etree.tostring(child) for child in children]
+    ends = list(accumulate(len(b) for b in blobs))
+    total = ends[-1] if ends else 0
+    chunks = min(chunks, total // max(min_chunk_bytes, 1))
+    if chunks < 2:
+        return []
+
+    # Boundary i sits between children[i - 1] and children[i].
+    boundaries = [
+        i for i in range(1, len(children))
+        if _TBL in (children[i - 1].tag, children[i].tag)
+        or children[i - 1].tag == children[i].tag == _P
+    ]
+    if not boundaries:
+        return []
+    cuts = []
+    for k in range(1, chunks):
+        target = total * k // chunks
+        pos = bisect_left(boundaries, bisect_left(ends, target) + 1)
+        nearest = min(boundaries[max(pos - 1, 0): pos + 1], key=lambda b: abs(ends[b - 1] - target))
+        if (not cuts or nearest > cuts[-1]) and nearest < len(children):
+            cuts.append(nearest)
+    if not cuts:
+        return []
+
+    result = []
+    counters: Dict[str, Dict[str, int]] = {}
+    for lo, hi in zip([0, *cuts], [*cuts, len(children)]):
+        result.append(Chunk(
+            xml=head + b"".join(blobs[lo:hi]) + _BODY_END,
+            continues=lo > 0 and children[lo - 1].tag == children[lo].tag == _P,
+            list_counters=[
+                (num_id, ilvl, count)
+                for num_id, levels in counters.items()
+                for ilvl, count in sorted(levels.items())
+            ],
+        ))
+        for child in children[lo:hi]:
+            for num_pr in _NUMPR_XPATH(child):
+                _count_list_paragraph(counters, num_pr)
+    return result
+
+
+def _count_list_paragraph(counters: Dict[str, Dict[str, int]], num_pr: Any) -> None:
+    """Advance list counters the way docx2python's BulletGenerator does."""
+    num_id = num_pr.find(f"{_W}numId")
+    ilvl = num_pr.find(f"{_W}ilvl")
+    if num_id is None or ilvl is None:
+        return
+    num_id, ilvl = num_id.get(_VAL), ilvl.get(_VAL)
+    if num_id is None or ilvl is None:
+        return
+    levels = counters.setdefault(num_id, {})
+    levels[ilvl] = levels.get(ilvl, 0) + 1
+    # docx2python compares levels as strings.
+    for deeper in [k for k in levels if k > ilvl]:
+        del levels[deeper]
+
+
+def _priming_table(list_counters: List[Tuple[str, str, int]]) -> bytes:
+    """Return a table of empty list paragraphs that replays ``list_counters``."""
+    paragraphs = b"".join(
+        b'<w:p><w:pPr><w:numPr><w:ilvl w:val="%s"/><w:numId w:val="%s"/></w:numPr></w:pPr></w:p>'
+        % (ilvl.encode(), num_id.encode())
+        for num_id, ilvl, count in list_counters
+        for _ in range(count)
+    )
+    return b"<w:tbl><w:tr><w:tc>" + paragraphs + b"</w:tc></w:tr></w:tbl>"
+
+
+def index_chunk(
+    docx_path: str,
+    parts: Dict[str, bytes],
+    main_part: str,
+    chunk: Chunk,
+    heading_rules: Optional[HeadingRules] = None,
+    style_levels: Optional[Dict[str, int]] = None,
+) -> ChunkResult:
+    """Index one chunk. Runs in a worker process."""
+    from react_agent.docx_indexer import DocxIndexer, _slim_package
+
+    xml = chunk.xml
+    if chunk.list_counters:
+        start = _BODY_START_RE.search(xml).end()
+        xml = xml[:start] + _priming_table(chunk.list_counters) + xml[start:]
+    indexer = DocxIndexer(docx_path, heading_rules=heading_rules)
+    indexer.style_levels = style_levels
+    with docx2python(_slim_package({**parts, main_part: xml})) as docx:
+        tables = docx.body_pars[1:] if chunk.list_counters else docx.body_pars
+        paragraphs: List[Any] = []
+        empty: List[List[Any]] = []
+        indexer._traverse(tables, [], 0, "body", paragraphs, empty=empty)
+    return ChunkResult(
+        paragraphs=paragraphs,
+        tables=len(tables),
+        last_cell_paragraphs=len(tables[-1][-1][-1]) if tables else 0,
+        heading_stack=indexer.heading_stack,
+        empty_anchors=empty,
+    )
+
+
+def index_parallel(
+    docx_path: str,
+    parts: Dict[str, bytes],
+    main_part: str,
+    chunks: List[Chunk],
+    workers: int,
+    heading_rules: Optional[HeadingRules] = None,
+    style_levels: Optional[Dict[str, int]] = None,
+    pool: Optional[Executor] = None,
+) -> Tuple[List[Any], List[Dict[str, Any]], List[List[Any]]]:
+    """Index ``chunks`` in ``workers`` processes and stitch the results.
+
+    ``pool`` is a long-lived process pool to use instead of starting one.
+    Returns the paragraphs, the heading stack open after the last one and
+    the anchors of empty paragraphs.
+    """
+    if pool is None:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as own:
+            return index_parallel(
+                docx_path, parts, main_part, chunks, workers, heading_rules, style_levels, own
+            )
+    futures = [
+        pool.submit(index_chunk, docx_path, parts, main_part, c, heading_rules, style_levels)
+        for c in chunks
+    ]
+    return stitch(chunks, [f.result() for f in futures])
+
+
+def stitch(
+    chunks: List[Chunk], results: List[ChunkResult]
+) -> Tuple[List[Any], List[Dict[str, Any]], List[List[Any]]]:
+    """Join chunk results into what sequential indexing would produce."""
+    paragraphs: List[Any] = []
+    empty: List[List[Any]] = []
+    tables = last_cell = 0
+    stack: List[Dict[str, Any]] = []
+    for chunk, result in zip(chunks, results):
+        offset = tables - 1 if chunk.continues else tables
+
+        def shift(anchor: List[Any]) -> List[Any]:
+            table, *rest = anchor[1:]
+            if chunk.continues and table == 0:
+                rest[-1] += last_cell
+            return ["body", table + offset, *rest]
+
+        for p in result.paragraphs:
+            p.anchor = shift(p.anchor)
+        empty.extend(shift(a) for a in result.empty_anchors)
+        _carry_breadcrumbs(result.paragraphs, stack)
+        paragraphs.extend(result.paragraphs)
+
+        if chunk.continues and result.tables == 1:
+            last_cell += result.last_cell_paragraphs
+        else:
+            last_cell = result.last_cell_paragraphs
+        tables = offset + result.tables
+        stack = _carried_stack(stack, result)
+    return paragraphs, stack, empty
+
+
+def _carry_breadcrumbs(paragraphs: List[Any], carried: List[Dict[str, Any]]) -> None:
+    """Prefix local breadcrumbs with the headings still open from earlier chunks.
+
+    Only paragraphs before the chunk's first heading that closes every carried
+    heading need fixing; from there on the local breadcrumbs are already right.
+    """
+    local: List[Dict[str, Any]] = []
+    for p in paragraphs:
+        if p.level > 0:
+            carried = [h for h in carried if h["level"] < p.level]
+            local = [h for h in local if h["level"] < p.level]
+            local.append({"level": p.level, "text": p.text[:50]})
+        if not carried:
+            return
+        p.breadcrumb = " > ".join(h["text"] for h in carried + local)
+
+
+def _carried_stack(carried: List[Dict[str, Any]], result: ChunkResult) -> List[Dict[str, Any]]:
+    """Return the heading stack open after a chunk, given the one open before it."""
+    levels = [p.level for p in result.paragraphs if p.level > 0]
+    lowest = min(levels, default=None)
+    if lowest is not None:
+        carried = [h for h in carried if h["level"] < lowest]
+    return carried + result.heading_stack
@@ -0,0 +1,267 @@
+"""Append-only journal of document edits for undo/redo and crash recovery.
+
+Each document gets a JSON-lines journal next to it (``.<name>.journal.jsonl``).
+Every applied edit, undo and redo is appended and fsynced before the document
+save is requested, and a "saved" entry is appended once a save has reached
+disk. Entries carry the document version they produced, so on startup any
+entry newer than the last "saved" one is an approved edit that never made it
+to disk and is replayed.
+
+Undo and redo apply only the inverse (or original) text delta of one edit.
+An inserted or deleted paragraph is kept as its w:p XML, so undo and redo
+can take it out or put it back at its anchor. Edits name their paragraph by
+its stable id as well as its anchor, since the anchor moves when paragraphs
+are inserted or deleted before it.
+Restoring a stored version replaces the whole document, so a "restore" entry
+closes the history: edits before it can no longer be undone or redone.
+The journal is compacted once it has grown by ``compact_every`` entries and
+nothing is waiting to be saved: it is rewritten to hold just the undo and
+redo stacks, capped at ``max_undo`` edits.
+"""
+
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from react_agent.docx_saver import atomic_write
+
+EDIT, UNDO, REDO, SAVED, RESTORE = "edit", "undo", "redo", "saved", "restore"
+INSERT, DELETE = "insert", "delete"
+# Ops that change the document and can be undone
+CHANGES = (EDIT, INSERT, DELETE)
+
+
+@dataclass
+class JournalEntry:
+    """One journal record."""
+
+    seq: int
+    op: str  # EDIT, INSERT, DELETE, UNDO, REDO, SAVED or RESTORE
+    version: int  # document version after this entry
+    anchor: Optional[List[Any]] = None
+    paragraph_id: Optional[str] = None  # stable id of the paragraph, when it has one
+    old_text: Optional[str] = None  # "" for an insert
+    new_text: Optional[str] = None  # "" for a delete
+    xml: Optional[str] = None  # w:p of an inserted or deleted paragraph
+    target: Optional[int] = None  # seq of the edit an undo or redo applies to; restored version
+    timestamp: str = field(default_factory=lambda: datetime.now(tz=UTC).isoformat())
+    session: Optional[str] = None
+
+
+def journal_path_for(docx_path: str) -> Path:
+    """Return the journal path of a document."""
+    path = Path(docx_path)
+    return path.with_name(f".{path.name}.journal.jsonl")
+
+
+class EditJournal:
+    """Undo/redo stacks and unsaved edits of one document, backed by a file."""
+
+    def __init__(self, path: str, max_undo: int = 100, compact_every: int = 500):
+        """Open the journal at ``path``, replaying it if it exists."""
+        self.path = Path(path)
+        self.max_undo = max_undo
+        self.compact_every = compact_every
+        self.version = 0
+        self.saved_version = 0
+        self._next_seq = 0
+        self._edits: Dict[int, JournalEntry] = {}
+        self._done: List[int] = []  # seqs of applied edits, most recent last
+        self._redo: List[int] = []  # seqs of undone edits, next to redo last
+        self._entries: List[JournalEntry] = []
+        self._appended = 0
+        self._load()
+
+    def _load(self) -> None:
+        """Rebuild the stacks from the journal file."""
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = JournalEntry(**json.loads(line))
+                except (ValueError, TypeError):
+                    # A torn last line from a crash mid-append
+                    break
+                self._replay(entry)
+
+    def _replay(self, entry: JournalEntry) -> None:
+        """Apply one entry to the in-memory state."""
+        self._entries.append(entry)
+        self._next_seq = max(self._next_seq, entry.seq + 1)
+        if entry.op == SAVED:
+            self.saved_version = max(self.saved_version, entry.version)
+            return
+        self.version = max(self.version, entry.version)
+        if entry.op in CHANGES:
+            self._edits[entry.seq] = entry
+            self._done.append(entry.seq)
+            self._redo.clear()
+        elif entry.op == RESTORE:
+            self._done.clear()
+            self._redo.clear()
+        elif entry.op == UNDO and self._done and self._done[-1] == entry.target:
+            self._redo.append(self._done.pop())
+        elif entry.op == REDO and self._redo and self._redo[-1] == entry.target:
+            self._done.append(self._redo.pop())
+
+    def _append(self, op: str, **fields: Any) -> JournalEntry:
+        """Write an entry durably, then apply it."""
+        version = fields.pop("version", None)
+        if version is None:
+            version = self.version + 1
+        entry = JournalEntry(seq=self._next_seq, op=op, version=version, **fields)
+        self._write([entry])
+        return entry
+
+    def _write(self, entries: List[JournalEntry]) -> None:
+        """Append entries with a single fsync, then apply them."""
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(asdict(e), ensure_ascii=False) + "\n" for e in entries))
+            f.flush()
+            os.fsync(f.fileno())
+        for entry in entries:
+            self._replay(entry)
+        self._appended += len(entries)
+
+    def record_edit(
+        self,
+        anchor: List[Any],
+        old_text: str,
+        new_text: str,
+        session: Optional[str] = None,
+        paragraph_id: Optional[str] = None,
+    ) -> JournalEntry:
+        """Record an applied edit of the paragraph at ``anchor`` (with id ``paragraph_id``)."""
+        return self._append(
+            EDIT, anchor=anchor, paragraph_id=paragraph_id, old_text=old_text, new_text=new_text,
+            session=session,
+        )
+
+    def record_edits(
+        self, edits: Sequence[Tuple[List[Any], Optional[str], str, str]], session: Optional[str] = None
+    ) -> List[JournalEntry]:
+        """Record several applied ``(anchor, paragraph_id, old_text, new_text)`` edits in one write.
+
+        Each is still its own edit, undone one at a time.
+        """
+        entries = [
+            JournalEntry(
+                seq=self._next_seq + i, op=EDIT, version=self.version + 1 + i, anchor=anchor,
+                paragraph_id=paragraph_id, old_text=old_text, new_text=new_text, session=session,
+            )
+            for i, (anchor, paragraph_id, old_text, new_text) in enumerate(edits)
+        ]
+        self._write(entries)
+        return entries
+
+    def record_insert(
+        self,
+        anchor: List[Any],
+        paragraph_id: Optional[str],
+        xml: str,
+        text: str,
+        session: Optional[str] = None,
+    ) -> JournalEntry:
+        """Record that the paragraph ``xml``, with index text ``text``, was inserted at ``anchor``."""
+        return self._append(
+            INSERT, anchor=anchor, paragraph_id=paragraph_id, old_text="", new_text=text, xml=xml,
+            session=session,
+        )
+
+    def record_delete(
+        self,
+        anchor: List[Any],
+        paragraph_id: Optional[str],
+        xml: str,
+        text: str,
+        session: Optional[str] = None,
+    ) -> JournalEntry:
+        """Record that the paragraph ``xml``, with index text ``text``, was deleted at ``anchor``."""
+        return self._append(
+            DELETE, anchor=anchor, paragraph_id=paragraph_id, old_text=text, new_text="", xml=xml,
+            session=session,
+        )
+
+    def peek_undo(self) -> Optional[JournalEntry]:
+        """Return the edit undo_edit would revert, if any."""
+        return self._edits[self._done[-1]] if self._done else None
+
+    def peek_redo(self) -> Optional[JournalEntry]:
+        """Return the edit redo_edit would re-apply, if any."""
+        return self._edits[self._redo[-1]] if self._redo else None
+
+    def record_undo(self, edit: JournalEntry, session: Optional[str] = None) -> JournalEntry:
+        """Record that ``edit`` (the top of the undo stack) was reverted."""
+        return self._append(
+            UNDO, anchor=edit.anchor, paragraph_id=edit.paragraph_id, target=edit.seq, session=session
+        )
+
+    def record_redo(self, edit: JournalEntry, session: Optional[str] = None) -> JournalEntry:
+        """Record that ``edit`` (the top of the redo stack) was re-applied."""
+        return self._append(
+            REDO, anchor=edit.anchor, paragraph_id=edit.paragraph_id, target=edit.seq, session=session
+        )
+
+    def record_restore(self, version: int, session: Optional[str] = None) -> None:
+        """Record that stored ``version`` replaced the document on disk.
+
+        The undo and redo stacks are emptied. The restore is already on
+        disk, so it is recorded as saved in the same write.
+        """
+        restored = JournalEntry(
+            seq=self._next_seq, op=RESTORE, version=self.version + 1, target=version, session=session,
+        )
+        self._write([restored, JournalEntry(seq=self._next_seq + 1, op=SAVED, version=restored.version)])
+
+    def record_saved(self, version: int) -> None:
+        """Record that the document up to ``version`` is on disk."""
+        if version <= self.saved_version:
+            return
+        self._append(SAVED, version=version)
+        if self._appended >= self.compact_every and not self.pending():
+            self.compact()
+
+    def pending(self) -> List[JournalEntry]:
+        """Return the edits, undos and redos newer than the last save, in order."""
+        return [
+            e for e in self._entries if e.op != SAVED and e.version > self.saved_version
+        ]
+
+    def effect(self, entry: JournalEntry) -> Tuple[JournalEntry, bool]:
+        """Return the change an entry makes and whether it is applied (False: reverted)."""
+        if entry.op in (UNDO, REDO):
+            return self._edits[entry.target], entry.op == REDO
+        return entry, True
+
+    def compact(self) -> None:
+        """Rewrite the journal to hold only the undo and redo stacks."""
+        done = [self._edits[s] for s in self._done[-self.max_undo:]]
+        redo = [self._edits[s] for s in self._redo[-self.max_undo:]]
+        # Replaying the redo edits newest-undone last, then undoing them
+        # in stack order, rebuilds the redo stack.
+        edits = done + redo[::-1]
+        renumbered = {e.seq: i for i, e in enumerate(edits)}
+        version = self.saved_version
+        lines = [
+            JournalEntry(**{**asdict(e), "seq": renumbered[e.seq], "version": version})
+            for e in edits
+        ]
+        for e in redo:
+            lines.append(JournalEntry(
+                seq=len(lines), op=UNDO, version=version, anchor=e.anchor,
+                paragraph_id=e.paragraph_id, target=renumbered[e.seq], session=e.session,
+            ))
+        lines.append(JournalEntry(seq=len(lines), op=SAVED, version=version))
+
+        payload = "".join(json.dumps(asdict(e), ensure_ascii=False) + "\n" for e in lines)
+        atomic_write(self.path, lambda f: f.write(payload.encode("utf-8")))
+        self._edits, self._done, self._redo, self._entries = {}, [], [], []
+        self.version = self.saved_version = self._next_seq = 0
+        for entry in lines:
+            self._replay(entry)
+        self.version = version
+        self._appended = 0
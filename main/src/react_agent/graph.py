@@ -3,7 +3,6 @@
 Works with a chat model with tool calling support.
 """
 
-from datetime import UTC, datetime
 from typing import Any, Dict, List, Literal, cast
 
 from langchain_core.messages import AIMessage, ToolMessage
@@ -12,10 +11,19 @@ from langgraph.prebuilt import ToolNode
 from langgraph.runtime import Runtime
 from langgraph.types import Command, interrupt
 
+from react_agent.commands import route_after_command, route_command
 from react_agent.context import Context
+from react_agent.docx_manager import describe_open_document, get_docx_manager
+from react_agent.history import compact_history, summary_prompt
+from react_agent.prompt_cache import (
+    assemble_prompt,
+    cache_kwargs,
+    coarse_time,
+    record_usage,
+)
 from react_agent.state import InputState, State
-from react_agent.tools import TOOLS
-from react_agent.utils import load_chat_model
+from react_agent.tools import AGENT_TOOLS
+from react_agent.utils import get_bound_model, tool_names
 
 # Define the function that calls the model
 
@@ -36,21 +44,32 @@ async def call_model(
     """
     try:
         # Initialize the model with tool binding. Change the model or add more tools here.
-        model = load_chat_model(runtime.context.model).bind_tools(TOOLS)
+        model = get_bound_model(runtime.context.model, AGENT_TOOLS)
 
         # Format the system prompt. Customize this to change the agent's behavior.
+        # The time is coarsened so the prompt prefix stays cacheable between calls.
         system_message = runtime.context.system_prompt.format(
-            system_time=datetime.now(tz=UTC).isoformat()
+            system_time=coarse_time(runtime.context.time_granularity)
+        )
+        if state.summary:
+            system_message += "\n\n" + summary_prompt(
+                state.summary, runtime.context.history_max_tokens
+            )
+        provider = runtime.context.model.split("/", maxsplit=1)[0]
+        messages = assemble_prompt(
+            system_message, state.messages, provider, volatile=describe_open_document()
+        )
+        hints = cache_kwargs(
+            provider, runtime.context.model, tool_names(AGENT_TOOLS), system_message
         )
 
         # Get the model's response
-        response = await model.ainvoke(
-            [{"role": "system", "content": system_message}, *state.messages]
-        )
+        response = await model.ainvoke(messages, **hints)
 
         # Ensure we got an AIMessage
         if not isinstance(response, AIMessage):
             raise ValueError(f"Model returned {type(response).__name__}, expected AIMessage")
+        record_usage(response)
 
         # Handle the case when it's the last step and the model still wants to use a tool
         if state.is_last_step and response.tool_calls:
@@ -75,7 +94,15 @@ async def call_model(
 
 
 # List of tools that require human approval (write operations)
-WRITE_TOOLS = {"apply_edit"}  # Add more write tools here as needed
+WRITE_TOOLS = {
+    "apply_edit",
+    "insert_paragraph",
+    "delete_paragraph",
+    "replace_all",
+    "undo_edit",
+    "redo_edit",
+    "restore_version",
+}  # Add more write tools here as needed
 
 
 def requires_approval(tool_name: str) -> bool:
@@ -132,6 +159,74 @@ async def approval_node(state: State) -> Dict[str, Any]:
             f"- New text: {new_text[:100]}{'...' if len(new_text) > 100 else ''}\n\n"
             f"Do you approve this change? (yes/no)"
         )
+    elif tool_name == "insert_paragraph":
+        after = get_docx_manager().get_paragraph(tool_args.get("after_anchor", [])) or {}
+        text = tool_args.get("text", "")
+        description = (
+            f"**Insert Operation**\n"
+            f"- After: {tool_args.get('after_anchor', [])} {after.get('text', '')[:60]}\n"
+            f"- Style: {tool_args.get('style') or 'same as previous paragraph'}\n"
+            f"- New text: {text[:100]}{'...' if len(text) > 100 else ''}\n\n"
+            f"Do you approve this change? (yes/no)"
+        )
+    elif tool_name == "delete_paragraph":
+        target = get_docx_manager().get_paragraph(tool_args.get("anchor", [])) or {}
+        text = target.get("text", "")
+        description = (
+            f"**Delete Operation**\n"
+            f"- Location: {tool_args.get('anchor', [])}\n"
+            f"- Text: {text[:100]}{'...' if len(text) > 100 else ''}\n\n"
+            f"Do you approve this change? (yes/no)"
+        )
+    elif tool_name == "replace_all":
+        manager = get_docx_manager()
+        await manager._ensure_index_loaded()
+        try:
+            preview = await manager.executor.run(
+                manager.preview_replace,
+                tool_args.get("pattern", ""),
+                tool_args.get("replacement", ""),
+                tool_args.get("scope"),
+                tool_args.get("regex", False),
+                tool_args.get("case_sensitive", True),
+            )
+        except ValueError as e:
+            preview = {"matches": 0, "paragraphs": 0, "sample": [], "error": str(e)}
+        lines = [
+            f"- {change['anchor']}: {change['before']} -> {change['after']}"
+            for change in preview["sample"]
+        ]
+        if preview["paragraphs"] > len(lines):
+            lines.append(f"- ... and {preview['paragraphs'] - len(lines)} more paragraphs")
+        description = (
+            f"**Replace All Operation**\n"
+            f"- Find: {tool_args.get('pattern', '')!r}\n"
+            f"- Replace with: {tool_args.get('replacement', '')!r}\n"
+            f"- Scope: {tool_args.get('scope') or 'whole document'}\n"
+            f"- Matches: {preview['matches']} in {preview['paragraphs']} paragraphs\n"
+            + (f"- Problem: {preview['error']}\n" if "error" in preview else "")
+            + "\n".join(lines)
+            + "\n\nDo you approve this change? (yes/no)"
+        )
+    elif tool_name in ("undo_edit", "redo_edit"):
+        edit = (
+            get_docx_manager().journal.peek_undo()
+            if tool_name == "undo_edit"
+            else get_docx_manager().journal.peek_redo()
+        )
+        if edit is None:
+            description = f"There is nothing to {tool_name.split('_')[0]}. Proceed anyway? (yes/no)"
+        else:
+            before, after = (
+                (edit.new_text, edit.old_text) if tool_name == "undo_edit" else (edit.old_text, edit.new_text)
+            )
+            description = (
+                f"**{'Undo' if tool_name == 'undo_edit' else 'Redo'} Operation**\n"
+                f"- Location: {edit.anchor}\n"
+                f"- Current text: {before[:100]}{'...' if len(before) > 100 else ''}\n"
+                f"- Restored text: {after[:100]}{'...' if len(after) > 100 else ''}\n\n"
+                f"Do you approve this change? (yes/no)"
+            )
     else:
         description = f"Approve {tool_name} with args: {tool_args}? (yes/no)"
     
@@ -242,13 +337,19 @@ def route_approval(state: State) -> Literal["tools", "call_model"]:
 builder = StateGraph(State, input_schema=InputState, context_schema=Context)
 
 # Define the nodes
+builder.add_node(route_command)
+builder.add_node(compact_history)
 builder.add_node(call_model)
 builder.add_node("approval_node", approval_node)
-builder.add_node("tools", ToolNode(TOOLS))
+builder.add_node("tools", ToolNode(AGENT_TOOLS))
+
+# Set the entrypoint as `route_command`, which answers direct document commands
+# itself and passes anything else on to the model
+builder.add_edge("__start__", "route_command")
+builder.add_conditional_edges("route_command", route_after_command)
 
-# Set the entrypoint as `call_model`
-# This means that this node is the first one called
-builder.add_edge("__start__", "call_model")
+# `compact_history` always runs before `call_model`
+builder.add_edge("compact_history", "call_model")
 
 # Add a conditional edge to determine the next step after `call_model`
 builder.add_conditional_edges(
@@ -264,9 +365,9 @@ builder.add_conditional_edges(
     route_approval,
 )
 
-# Add a normal edge from `tools` to `call_model`
+# Add a normal edge from `tools` back to the model, through `compact_history`
 # This creates a cycle: after using tools, we always return to the model
-builder.add_edge("tools", "call_model")
+builder.add_edge("tools", "compact_history")
 
 # Compile the builder into an executable graph
 graph = builder.compile(name="ReAct Agent")
@@ -0,0 +1,213 @@
+"""Configurable heading detection for documents without usable styles.
+
+A HeadingClassifier applies, in order:
+
+1. a numbering pattern ("1.", "2.3", "4.1.2 ...") whose depth gives the level;
+2. an all-caps rule for short paragraphs;
+3. per-language keyword sets, matched with one Aho-Corasick automaton built
+   over every enabled language, so the cost per paragraph depends on the
+   paragraph's length and not on how many keywords are configured. Short
+   keyword lists (SMALL_KEYWORD_SET) use plain substring search instead.
+
+Rules come from HeadingRules, which can be loaded from a JSON file so each
+tenant can ship its own keywords::
+
+    {
+      "languages": ["en", "de"],
+      "keywords": {"de": {"leistungsbeschreibung": 1, "preisblatt": 2}},
+      "all_caps_max_words": 8
+    }
+
+Keyword sets in the file are merged over the defaults, language by language.
+"""
+
+import json
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Keyword -> heading level, per language. Keywords match anywhere in the text,
+# case-insensitively.
+DEFAULT_KEYWORDS: Dict[str, Dict[str, int]] = {
+    "en": {
+        "table of contents": 2,
+        "summary": 2,
+        "introduction": 2,
+        "conclusion": 2,
+    },
+    "de": {
+        "inhaltsverzeichnis": 2,
+        "zusammenfassung": 2,
+        "einleitung": 2,
+        "einführung": 2,
+        "fazit": 2,
+        "schlussfolgerung": 2,
+    },
+    "fr": {
+        "table des matières": 2,
+        "sommaire": 2,
+        "résumé": 2,
+        "introduction": 2,
+        "conclusion": 2,
+    },
+}
+
+DEFAULT_NUMBERED_PATTERN = r"^\d+(\.\d+)*\.?\s+"
+
+# Up to this many keywords, one C-level substring search per keyword beats
+# stepping the automaton through the text in Python.
+SMALL_KEYWORD_SET = 32
+
+_NO_MATCH = 1 << 30
+
+
+@dataclass
+class HeadingRules:
+    """Rules for guessing heading levels from paragraph text."""
+
+    # Regex for numbered headings; the level is the number of dots in the
+    # first word plus one. None disables the rule.
+    numbered_pattern: Optional[str] = DEFAULT_NUMBERED_PATTERN
+    # All-caps paragraphs of at most this many words are level 1; 0 disables.
+    all_caps_max_words: int = 10
+    keywords: Dict[str, Dict[str, int]] = field(
+        default_factory=lambda: {lang: dict(kw) for lang, kw in DEFAULT_KEYWORDS.items()}
+    )
+    # Languages whose keywords are used; None means all of them.
+    languages: Optional[List[str]] = None
+    max_level: int = 6
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "HeadingRules":
+        """Build rules from a config mapping, merging keywords over the defaults."""
+        unknown = set(data) - {f for f in cls.__dataclass_fields__}
+        if unknown:
+            raise ValueError(f"Unknown heading rule settings: {sorted(unknown)}")
+        rules = cls(**{k: v for k, v in data.items() if k != "keywords"})
+        for language, keywords in data.get("keywords", {}).items():
+            rules.keywords.setdefault(language, {}).update(
+                {keyword: int(level) for keyword, level in keywords.items()}
+            )
+        return rules
+
+    def active_keywords(self) -> Dict[str, int]:
+        """Return the keywords of the enabled languages, lowercased."""
+        merged: Dict[str, int] = {}
+        for language, keywords in self.keywords.items():
+            if self.languages is not None and language not in self.languages:
+                continue
+            for keyword, level in keywords.items():
+                keyword = keyword.lower()
+                if keyword:
+                    merged[keyword] = min(level, merged.get(keyword, level))
+        return merged
+
+
+def load_heading_rules(path: str) -> HeadingRules:
+    """Load HeadingRules from a JSON file."""
+    return HeadingRules.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton reporting the lowest level of any keyword found.
+
+    Failure links are folded into a full transition table when the automaton
+    is built, so scanning is a single dict lookup per character.
+    """
+
+    def __init__(self, keywords: Dict[str, int]):
+        """Build the automaton for a keyword -> level mapping."""
+        goto: List[Dict[str, int]] = [{}]
+        level: List[Optional[int]] = [None]
+        for keyword, kw_level in keywords.items():
+            state = 0
+            for char in keyword:
+                nxt = goto[state].get(char)
+                if nxt is None:
+                    nxt = goto[state][char] = len(goto)
+                    goto.append({})
+                    level.append(None)
+                state = nxt
+            level[state] = kw_level if level[state] is None else min(level[state], kw_level)
+
+        # Breadth-first: a state's transitions are those of its failure state,
+        # overridden by its own edges; its level includes its failure state's.
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            fallback = fail[state]
+            inherited = level[fallback]
+            if inherited is not None:
+                level[state] = inherited if level[state] is None else min(level[state], inherited)
+            delta[state] = dict(delta[fallback])
+            for char, nxt in goto[state].items():
+                fail[nxt] = delta[fallback].get(char, 0) if state else 0
+                delta[state][char] = nxt
+                queue.append(nxt)
+        self._delta = delta
+        # Non-accepting states get a level no keyword can have.
+        self._level = [_NO_MATCH if lv is None else lv for lv in level]
+        self._best = min(self._level)
+
+    def match(self, text: str) -> Optional[int]:
+        """Return the lowest level among keywords occurring in ``text``."""
+        delta, levels, best = self._delta, self._level, self._best
+        state, found = 0, _NO_MATCH
+        for char in text:
+            state = delta[state].get(char, 0)
+            if levels[state] < found:
+                found = levels[state]
+                if found == best:
+                    break
+        return None if found == _NO_MATCH else found
+
+
+class _KeywordList:
+    """Substring search per keyword; faster than the automaton for short lists."""
+
+    def __init__(self, keywords: Dict[str, int]):
+        self._keywords = sorted(keywords.items(), key=lambda item: item[1])
+
+    def match(self, text: str) -> Optional[int]:
+        for keyword, level in self._keywords:
+            if keyword in text:
+                return level
+        return None
+
+
+class HeadingClassifier:
+    """Classify paragraph text into a heading level using HeadingRules."""
+
+    def __init__(self, rules: Optional[HeadingRules] = None):
+        """Precompile the rules."""
+        self.rules = rules or HeadingRules()
+        pattern = self.rules.numbered_pattern
+        self._numbered = re.compile(pattern) if pattern else None
+        keywords = self.rules.active_keywords()
+        if len(keywords) > SMALL_KEYWORD_SET:
+            self._keywords = KeywordAutomaton(keywords)
+        else:
+            self._keywords = _KeywordList(keywords)
+
+    def level(self, text: str) -> Optional[int]:
+        """Return the heading level of ``text``, or None for body text."""
+        if not text:
+            return None
+        text = text.strip()
+        if not text:
+            return None
+
+        if self._numbered is not None and self._numbered.match(text):
+            dots = text.split()[0].count(".")
+            return min(dots + 1, self.rules.max_level)
+
+        max_words = self.rules.all_caps_max_words
+        if max_words and text.isupper() and len(text.split()) <= max_words:
+            return 1
+
+        return self._keywords.match(text.lower())
+
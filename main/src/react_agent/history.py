@@ -0,0 +1,274 @@
+"""Compaction of the conversation history sent to the model.
+
+Every message in ``State.messages`` is re-sent on every model call, so a long
+thread gets slower and more expensive until it no longer fits the context
+window. compact_history() runs before each model call and keeps the history
+within a token budget in three stages:
+
+1. Tool results the model has already answered in an earlier turn become
+   stubs: ``{"stub": ref, "tool": name, "tokens": n, "head": ...}``.
+2. If the history is still over budget, results consumed in the current
+   turn are stubbed too, oldest first.
+3. If it is still over budget, the oldest turns are removed and each is
+   collapsed into a one-line summary, shown after the system prompt.
+
+Stubbed results and removed turns are kept in ``State.archive``, so they stay
+in the thread's checkpoints; recall_result() returns them to the model by
+their ref. Stubs keep their message and tool call ids, so every tool call
+still has its result. A history is only rewritten when a turn ends or the
+budget is exceeded, so its prefix stays cacheable between calls.
+"""
+
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.messages import (
+    AIMessage,
+    AnyMessage,
+    BaseMessage,
+    HumanMessage,
+    RemoveMessage,
+    ToolMessage,
+)
+from langgraph.prebuilt import InjectedState
+from langgraph.runtime import Runtime
+from typing_extensions import Annotated
+
+from react_agent.compact import budget
+from react_agent.context import Context
+from react_agent.state import State
+from react_agent.tokens import count_tokens, truncate_to_tokens
+from react_agent.utils import get_message_text
+
+# Token budget of the history; Context.history_max_tokens overrides it
+DEFAULT_HISTORY_TOKENS = 12000
+# Tool results this small are cheaper to keep than to stub
+STUB_MIN_TOKENS = 60
+# Tokens of a result's start kept in its stub
+STUB_HEAD_TOKENS = 24
+# Share of the history budget the turn summaries may take
+SUMMARY_SHARE = 4
+# Tokens per summary line for the user request and the answer
+_SUMMARY_TEXT_TOKENS = 40
+SUMMARY_HEADER = "Earlier in this conversation (recall_result returns a turn in full):"
+
+
+@dataclass
+class Compaction:
+    """What compact_messages() changed: state updates, archived content, summaries."""
+
+    messages: List[AnyMessage] = field(default_factory=list)
+    archive: Dict[str, str] = field(default_factory=dict)
+    summary: List[str] = field(default_factory=list)
+
+
+def message_tokens(message: BaseMessage) -> int:
+    """Count the tokens a message adds to the prompt, tool calls included."""
+    tokens = count_tokens(
+        message.content if isinstance(message.content, str) else json.dumps(message.content)
+    )
+    if isinstance(message, AIMessage) and message.tool_calls:
+        tokens += count_tokens(json.dumps([[c["name"], c["args"]] for c in message.tool_calls]))
+    return tokens
+
+
+def _stub(message: ToolMessage, tokens: int) -> ToolMessage:
+    """Replace a tool result with a stub naming its ref, keeping its ids."""
+    text = get_message_text(message)
+    stub = {
+        "stub": message.tool_call_id,
+        "tool": message.name,
+        "tokens": tokens,
+        "head": truncate_to_tokens(text, STUB_HEAD_TOKENS),
+        "recall": f"recall_result({message.tool_call_id!r})",
+    }
+    return ToolMessage(
+        content=json.dumps(stub, ensure_ascii=False, separators=(",", ":")),
+        tool_call_id=message.tool_call_id,
+        name=message.name,
+        id=message.id,
+    )
+
+
+def _turns(messages: Sequence[BaseMessage]) -> List[List[int]]:
+    """Split message positions into turns, each starting at a user message."""
+    turns: List[List[int]] = []
+    for i, message in enumerate(messages):
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(i)
+    return turns
+
+
+def _summarize(ref: str, turn: Sequence[BaseMessage]) -> str:
+    """Collapse a turn into one line: the request, the tools used, the answer."""
+    request = next((get_message_text(m) for m in turn if isinstance(m, HumanMessage)), "")
+    answer = next(
+        (get_message_text(m) for m in reversed(turn) if isinstance(m, AIMessage) and not m.tool_calls),
+        "",
+    )
+    calls = Counter(c["name"] for m in turn if isinstance(m, AIMessage) for c in m.tool_calls)
+    line = f"[{ref}] User: {truncate_to_tokens(request, _SUMMARY_TEXT_TOKENS)}"
+    if calls:
+        line += " | Tools: " + ", ".join(
+            name if n == 1 else f"{name} x{n}" for name, n in calls.items()
+        )
+    if answer:
+        line += f" | Answer: {truncate_to_tokens(answer, _SUMMARY_TEXT_TOKENS)}"
+    return line
+
+
+def _transcript(turn: Sequence[BaseMessage]) -> str:
+    """Render a turn as "role: text" lines for the archive."""
+    lines = []
+    for message in turn:
+        text = get_message_text(message)
+        if isinstance(message, AIMessage) and message.tool_calls:
+            calls = json.dumps([[c["name"], c["args"]] for c in message.tool_calls], ensure_ascii=False)
+            text = f"{text} {calls}".strip()
+        lines.append(f"{message.type}: {text}")
+    return "\n".join(lines)
+
+
+def compact_messages(
+    messages: Sequence[BaseMessage],
+    archive: Dict[str, str],
+    summarized: int,
+    max_tokens: int = DEFAULT_HISTORY_TOKENS,
+) -> Compaction:
+    """Work out how to bring ``messages`` within ``max_tokens``.
+
+    ``archive`` holds what earlier compactions stubbed, ``summarized`` how
+    many turns they collapsed. Returns the messages to replace or remove
+    (for add_messages), the newly archived content and the new summary
+    lines; an empty Compaction if nothing needs to change.
+    """
+    current = list(messages)
+    tokens = [message_tokens(m) for m in current]
+    turns = _turns(current)
+    result = Compaction()
+
+    def stub(i: int) -> None:
+        message = current[i]
+        result.archive[message.tool_call_id] = get_message_text(message)
+        current[i] = _stub(message, tokens[i])
+        tokens[i] = message_tokens(current[i])
+
+    def stubbable(i: int) -> bool:
+        message = current[i]
+        return (
+            isinstance(message, ToolMessage)
+            and message.tool_call_id not in archive
+            and message.tool_call_id not in result.archive
+            and tokens[i] > STUB_MIN_TOKENS
+        )
+
+    # 1. Results answered in earlier turns
+    for turn in turns[:-1]:
+        for i in turn:
+            if stubbable(i):
+                stub(i)
+
+    # 2. Results the model has already seen in the current turn
+    if turns and sum(tokens) > max_tokens:
+        last_ai = max((i for i in turns[-1] if isinstance(current[i], AIMessage)), default=-1)
+        for i in turns[-1]:
+            if i > last_ai or sum(tokens) <= max_tokens:
+                break
+            if stubbable(i):
+                stub(i)
+
+    # 3. Oldest turns, collapsed into summary lines
+    removed: List[int] = []
+    for turn in turns[:-1]:
+        if sum(tokens) <= max_tokens:
+            break
+        ref = f"turn-{summarized + len(result.summary) + 1}"
+        result.archive[ref] = _transcript([current[i] for i in turn])
+        result.summary.append(_summarize(ref, [current[i] for i in turn]))
+        for i in turn:
+            removed.append(i)
+            tokens[i] = 0
+
+    removed_set = set(removed)
+    for i, message in enumerate(current):
+        if i in removed_set:
+            if messages[i].id is not None:
+                result.messages.append(RemoveMessage(id=messages[i].id))
+        elif message is not messages[i]:
+            result.messages.append(message)
+    return result
+
+
+def summary_prompt(summary: Sequence[str], max_tokens: int = DEFAULT_HISTORY_TOKENS) -> str:
+    """Render the newest summary lines that fit a share of the history budget."""
+    if not summary:
+        return ""
+    room = max_tokens // SUMMARY_SHARE
+    lines: List[str] = []
+    for line in reversed(summary):
+        room -= count_tokens(line) + 1
+        if room < 0:
+            break
+        lines.append(line)
+    left_out = len(summary) - len(lines)
+    if left_out:
+        lines.append(f"[turn-1 to turn-{left_out}] {left_out} earlier turns")
+    return "\n".join([SUMMARY_HEADER, *reversed(lines)])
+
+
+async def recall_result(
+    ref: str,
+    state: Annotated[Any, InjectedState],
+    max_tokens: Optional[int] = None,
+) -> dict[str, Any]:
+    """Fetch a tool result or conversation turn that was compacted out of the history.
+
+    Older tool results are replaced by stubs and older turns by one-line
+    summaries to keep the conversation short. Use this when you need one of
+    them again in full.
+
+    Args:
+        ref: The "stub" of a stubbed tool result, or a turn such as "turn-3" from the summary
+        max_tokens: Token budget for the result
+
+    Returns:
+        Dict with the archived content, cut to the budget if needed
+    """
+    archive = state.archive if hasattr(state, "archive") else state.get("archive", {})
+    content = archive.get(ref)
+    if content is None:
+        return {"success": False, "message": f"Nothing was archived under {ref!r}."}
+    text = truncate_to_tokens(content, budget(max_tokens))
+    result: dict[str, Any] = {"ref": ref, "content": text}
+    if text != content:
+        result["cut"] = True
+    return result
+
+
+async def compact_history(state: State, runtime: Runtime[Context]) -> Dict[str, Any]:
+    """Keep the history within the context's token budget before the model is called.
+
+    Answered tool results are replaced by stubs and, if that is not enough,
+    the oldest turns by summary lines; both are archived in the state.
+
+    Args:
+        state (State): The current state of the conversation.
+        runtime (Runtime[Context]): Runtime context containing configuration.
+
+    Returns:
+        dict: Replaced and removed messages, archived content and summary lines.
+    """
+    compaction = compact_messages(
+        state.messages, state.archive, len(state.summary), runtime.context.history_max_tokens
+    )
+    update: Dict[str, Any] = {}
+    if compaction.messages:
+        update["messages"] = compaction.messages
+    if compaction.archive:
+        update["archive"] = compaction.archive
+    if compaction.summary:
+        update["summary"] = compaction.summary
+    return update
@@ -0,0 +1,170 @@
+"""Minimal, run-preserving text edits of a WordprocessingML paragraph.
+
+Assigning ``paragraph.text`` in python-docx replaces every run with a single
+unformatted one, losing bold, italics and hyperlinks. apply_minimal_edit()
+instead diffs the old and new text word by word and rewrites only the
+``w:t`` elements that overlap a changed span. Text typed into a replaced
+span takes the formatting of the first replaced character, and inserted
+text that of the character before it, as in Word. apply_text_changes() does
+the same for spans the caller has already found, such as regex matches.
+"""
+
+import re
+from difflib import SequenceMatcher
+from typing import Any, List, Optional, Set, Tuple
+
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+_TOKEN_RE = re.compile(r"\w+|\s+|[^\w\s]")
+# Run children that python-docx renders as paragraph text (see CT_R.text),
+# in runs directly in the paragraph or in a hyperlink
+_TEXT_XPATH = (
+    "(w:r | w:hyperlink/w:r)/*[self::w:br or self::w:cr or self::w:noBreakHyphen"
+    " or self::w:ptab or self::w:t or self::w:tab]"
+)
+_T = qn("w:t")
+_R = qn("w:r")
+_RPR = qn("w:rPr")
+_HYPERLINK = qn("w:hyperlink")
+
+
+def text_changes(old: str, new: str) -> List[Tuple[int, int, str]]:
+    """Return the ``(start, end, replacement)`` spans turning ``old`` into ``new``.
+
+    Spans are character offsets into ``old``, found by a word-level diff and
+    listed left to right.
+    """
+    a, b = _TOKEN_RE.findall(old), _TOKEN_RE.findall(new)
+    a_offsets, b_offsets = _offsets(a), _offsets(b)
+    matcher = SequenceMatcher(None, a, b, autojunk=False)
+    return [
+        (a_offsets[i1], a_offsets[i2], new[b_offsets[j1]:b_offsets[j2]])
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def _offsets(tokens: List[str]) -> List[int]:
+    offsets = [0]
+    for token in tokens:
+        offsets.append(offsets[-1] + len(token))
+    return offsets
+
+
+def splice(text: str, changes: List[Tuple[int, int, str]]) -> str:
+    """Return ``text`` with the ``(start, end, replacement)`` spans applied."""
+    parts = []
+    position = 0
+    for start, end, replacement in changes:
+        parts.append(text[position:start])
+        parts.append(replacement)
+        position = end
+    parts.append(text[position:])
+    return "".join(parts)
+
+
+def apply_minimal_edit(p: Any, new_text: str) -> Optional[int]:
+    """Change the text of the ``w:p`` element ``p`` to ``new_text`` in place.
+
+    Returns the number of runs touched, or None if the edit cannot be made
+    without rebuilding the paragraph (it has no text runs, or inserted text
+    contains a tab or line break); the caller should then fall back to
+    assigning ``paragraph.text``.
+    """
+    old_text = "".join(str(child) for child in _text_children(p))
+    if old_text == new_text:
+        return 0
+    return apply_text_changes(p, text_changes(old_text, new_text))
+
+
+def apply_text_changes(p: Any, changes: List[Tuple[int, int, str]]) -> Optional[int]:
+    """Apply ``(start, end, replacement)`` spans of ``paragraph.text`` to ``p`` in place.
+
+    Spans must be sorted and must not overlap. Returns the number of runs
+    touched, or None under the same conditions as apply_minimal_edit(); the
+    caller should then assign ``splice(old_text, changes)`` instead.
+    """
+    pieces: List[Tuple[Any, int, int]] = []  # (element, start, end) of each text piece
+    position = 0
+    for child in _text_children(p):
+        text = str(child)
+        if text:
+            pieces.append((child, position, position + len(text)))
+            position += len(text)
+    if not changes:
+        return 0
+    new_text = splice("".join(str(piece[0]) for piece in pieces), changes)
+    if not pieces or any(c in text for _, _, text in changes for c in "\t\n\r"):
+        return None
+
+    touched: Set[Any] = set()
+    # Right to left, so the offsets of pieces still to be visited stay valid.
+    for start, end, text in reversed(changes):
+        host = _host(pieces, start, replacing=end > start) if text else None
+        if host is not None and host[0].tag != _T:
+            # A tab or break takes no text: put the new text in a w:t beside it.
+            t = OxmlElement("w:t")
+            t.text = text
+            if host[1] == 0:
+                host[0].addprevious(t)
+            else:
+                host[0].addnext(t)
+            touched.add(t)
+            host = None
+        for element, piece_start, piece_end in pieces:
+            if piece_end <= start or piece_start >= end or element.getparent() is None:
+                continue
+            touched.add(element)
+            if element.tag == _T:
+                lo, hi = max(start, piece_start) - piece_start, min(end, piece_end) - piece_start
+                element.text = element.text[:lo] + element.text[hi:]
+            else:
+                element.getparent().remove(element)
+        if host is not None:
+            element, offset = host
+            element.text = element.text[:offset] + text + element.text[offset:]
+            touched.add(element)
+
+    runs = {element.getparent() for element in touched if element.getparent() is not None}
+    for element in touched:
+        if element.tag == _T and element.getparent() is not None:
+            if element.text:
+                element.set(qn("xml:space"), "preserve")
+            else:
+                element.getparent().remove(element)
+    for run in runs:
+        _drop_if_empty(run)
+    if "".join(str(child) for child in _text_children(p)) != new_text:
+        return None
+    return len(runs)
+
+
+def _text_children(p: Any) -> List[Any]:
+    """Return the run children that make up ``paragraph.text``, in order."""
+    return p.xpath(_TEXT_XPATH)
+
+
+def _host(pieces: List[Tuple[Any, int, int]], start: int, replacing: bool) -> Tuple[Any, int]:
+    """Return the element new text at ``start`` goes into, and the offset in it.
+
+    Replacement text joins the first replaced character's piece; inserted
+    text joins the piece of the character before it (the first piece at 0).
+    """
+    for element, piece_start, piece_end in pieces:
+        if replacing or start == 0:
+            if piece_start <= start < piece_end:
+                return element, start - piece_start
+        elif piece_start < start <= piece_end:
+            return element, start - piece_start
+    raise ValueError(f"Offset {start} is outside the paragraph")
+
+
+def _drop_if_empty(run: Any) -> None:
+    """Remove a run left without content, and a hyperlink left without runs."""
+    if any(child.tag != _RPR for child in run):
+        return
+    parent = run.getparent()
+    parent.remove(run)
+    if parent.tag == _HYPERLINK and not parent.findall(_R):
+        parent.getparent().remove(parent)
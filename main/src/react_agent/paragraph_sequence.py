@@ -0,0 +1,303 @@
+"""Order-statistics sequence of body paragraphs for incremental edits.
+
+Body anchors are positional: ``["body", table, row, cell, par]`` numbers a
+paragraph by its place in its container (a docx2python pseudo-table cell),
+counting empty paragraphs too. Inserting or deleting a paragraph shifts the
+anchors of every later paragraph in the same container.
+
+ParagraphSequence keeps one slot per body ``w:p`` in document order, empty
+ones included, in an implicit treap: a binary tree ordered by position with
+subtree sizes, balanced by heap-ordered priorities. Anchors are not stored;
+a slot's anchor is its rank minus the rank of its container's first slot,
+and both are O(log n) to compute, as are inserts, deletes and lookups by
+anchor. Nothing after an edit has to be renumbered.
+
+Breadcrumbs are updated locally: an edited or inserted heading only changes
+the breadcrumbs up to the next heading at the same or a higher level. Each
+slot keeps the headings open at it, as a tuple shared by every slot of the
+section, so the headings open before a change are read off the slot before
+it instead of walking back to the previous top-level heading.
+"""
+
+import random
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+Container = Tuple[Any, ...]
+# Headings open at a slot, outermost first: (level, first 50 characters)
+Headings = Tuple[Tuple[int, str], ...]
+
+
+class Slot:
+    """One body paragraph position (a treap node)."""
+
+    __slots__ = (
+        "paragraph", "container", "element", "headings", "left", "right", "parent", "size", "priority",
+    )
+
+    def __init__(self, container: Container, paragraph: Any = None, priority: Optional[float] = None):
+        """Create a slot in ``container``, with a random priority unless one is given."""
+        self.paragraph = paragraph  # docx_indexer.Paragraph, or None for an empty paragraph
+        self.container = container
+        self.element: Any = None  # the live w:p, once bound
+        self.headings: Headings = ()  # set by ParagraphSequence, kept by reflow_breadcrumbs
+        self.left: Optional[Slot] = None
+        self.right: Optional[Slot] = None
+        self.parent: Optional[Slot] = None
+        self.size = 1
+        # Built nodes get their subtree size (>= 1); inserted ones a random
+        # value below 1, so they settle under the built tree.
+        self.priority = random.random() if priority is None else priority
+
+
+def _size(slot: Optional[Slot]) -> int:
+    return slot.size if slot is not None else 0
+
+
+class ParagraphSequence:
+    """Body paragraph slots in document order, with O(log n) positional edits."""
+
+    def __init__(self, slots: Sequence[Tuple[Container, Any]] = ()):
+        """Build a balanced sequence from ``(container, paragraph or None)`` pairs."""
+        nodes = [Slot(container, paragraph) for container, paragraph in slots]
+        self._root = _build(nodes, 0, len(nodes), None)
+        self._heads: Dict[Container, Slot] = {}
+        headings: Headings = ()
+        for node in nodes:
+            self._heads.setdefault(node.container, node)
+            headings = node.headings = _open_headings(headings, node.paragraph)
+
+    def __len__(self) -> int:
+        """Return the number of slots."""
+        return _size(self._root)
+
+    def __iter__(self) -> Iterator[Slot]:
+        """Iterate over the slots in document order."""
+        node = self.first()
+        while node is not None:
+            yield node
+            node = self.next(node)
+
+    def first(self) -> Optional[Slot]:
+        """Return the first slot, or None if the sequence is empty."""
+        return _leftmost(self._root) if self._root is not None else None
+
+    def rank(self, node: Slot) -> int:
+        """Return the position of ``node`` in document order."""
+        rank = _size(node.left)
+        while node.parent is not None:
+            if node is node.parent.right:
+                rank += _size(node.parent.left) + 1
+            node = node.parent
+        return rank
+
+    def select(self, rank: int) -> Optional[Slot]:
+        """Return the slot at position ``rank``, or None if out of range."""
+        node = self._root
+        while node is not None:
+            left = _size(node.left)
+            if rank < left:
+                node = node.left
+            elif rank == left:
+                return node
+            else:
+                rank -= left + 1
+                node = node.right
+        return None
+
+    def next(self, node: Slot) -> Optional[Slot]:
+        """Return the slot after ``node``."""
+        if node.right is not None:
+            return _leftmost(node.right)
+        while node.parent is not None and node is node.parent.right:
+            node = node.parent
+        return node.parent
+
+    def prev(self, node: Slot) -> Optional[Slot]:
+        """Return the slot before ``node``."""
+        if node.left is not None:
+            node = node.left
+            while node.right is not None:
+                node = node.right
+            return node
+        while node.parent is not None and node is node.parent.left:
+            node = node.parent
+        return node.parent
+
+    def find(self, anchor: List[Any]) -> Optional[Slot]:
+        """Return the slot at a body anchor, or None if there is none."""
+        if len(anchor) < 2 or not isinstance(anchor[-1], int) or anchor[-1] < 0:
+            return None
+        container = tuple(anchor[:-1])
+        head = self._heads.get(container)
+        if head is None:
+            return None
+        node = self.select(self.rank(head) + anchor[-1])
+        return node if node is not None and node.container == container else None
+
+    def anchor_of(self, node: Slot) -> List[Any]:
+        """Return the current anchor of ``node``."""
+        return [*node.container, self.rank(node) - self.rank(self._heads[node.container])]
+
+    def is_alone(self, node: Slot) -> bool:
+        """Whether ``node`` is the only slot of its container."""
+        before, after = self.prev(node), self.next(node)
+        return (before is None or before.container != node.container) and (
+            after is None or after.container != node.container
+        )
+
+    def insert_after(self, node: Slot, paragraph: Any) -> Slot:
+        """Insert a slot for ``paragraph`` right after ``node``, in its container.
+
+        The new slot's open headings are those of ``node`` until
+        reflow_breadcrumbs() is called for it.
+        """
+        new = Slot(node.container, paragraph)
+        new.headings = node.headings
+        if node.right is None:
+            node.right = new
+        else:
+            node = _leftmost(node.right)
+            node.left = new
+        self._attach(new, node)
+        return new
+
+    def insert_before(self, node: Slot, paragraph: Any) -> Slot:
+        """Insert a slot for ``paragraph`` right before ``node``, in its container."""
+        before = self.prev(node)
+        if before is not None and before.container == node.container:
+            return self.insert_after(before, paragraph)
+        new = Slot(node.container, paragraph)
+        new.headings = before.headings if before is not None else ()
+        if self._heads.get(node.container) is node:
+            self._heads[node.container] = new
+        if node.left is None:
+            node.left = new
+        else:
+            node = node.left
+            while node.right is not None:
+                node = node.right
+            node.right = new
+        self._attach(new, node)
+        return new
+
+    def _attach(self, new: Slot, parent: Slot) -> None:
+        """Hang the new leaf ``new`` under ``parent`` and restore the heap order."""
+        new.parent = parent
+        while parent is not None:
+            parent.size += 1
+            parent = parent.parent
+        while new.parent is not None and new.priority > new.parent.priority:
+            self._rotate_up(new)
+
+    def remove(self, node: Slot) -> None:
+        """Remove ``node``. It must not be the only slot of its container."""
+        if self._heads.get(node.container) is node:
+            self._heads[node.container] = self.next(node)
+        while node.left is not None or node.right is not None:
+            if node.left is None:
+                child = node.right
+            elif node.right is None:
+                child = node.left
+            else:
+                child = node.left if node.left.priority > node.right.priority else node.right
+            self._rotate_up(child)
+        parent = node.parent
+        if parent is None:
+            self._root = None
+        elif parent.left is node:
+            parent.left = None
+        else:
+            parent.right = None
+        node.parent = None
+        while parent is not None:
+            parent.size -= 1
+            parent = parent.parent
+
+    def _rotate_up(self, node: Slot) -> None:
+        """Rotate ``node`` above its parent, keeping document order."""
+        parent = node.parent
+        grand = parent.parent
+        if node is parent.left:
+            parent.left = node.right
+            if node.right is not None:
+                node.right.parent = parent
+            node.right = parent
+        else:
+            parent.right = node.left
+            if node.left is not None:
+                node.left.parent = parent
+            node.left = parent
+        parent.parent = node
+        node.parent = grand
+        if grand is None:
+            self._root = node
+        elif grand.left is parent:
+            grand.left = node
+        else:
+            grand.right = node
+        parent.size = 1 + _size(parent.left) + _size(parent.right)
+        node.size = 1 + _size(node.left) + _size(node.right)
+
+    def paragraphs(self) -> Iterator[Any]:
+        """Yield the indexed paragraphs in document order with fresh anchors."""
+        container: Optional[Container] = None
+        position = 0
+        for node in self:
+            if node.container != container:
+                container, position = node.container, 0
+            if node.paragraph is not None:
+                node.paragraph.anchor = [*container, position]
+                yield node.paragraph
+            position += 1
+
+    def heading_stack_before(self, node: Slot) -> List[Dict[str, Any]]:
+        """Return the headings open just before ``node``, outermost first."""
+        before = self.prev(node)
+        headings = before.headings if before is not None else ()
+        return [{"level": level, "text": text} for level, text in headings]
+
+    def reflow_breadcrumbs(self, node: Slot, level: int) -> None:
+        """Rebuild breadcrumbs from ``node`` on after a change at heading ``level``.
+
+        ``level`` is the shallowest heading level the change touched (0 when
+        only body text changed). Paragraphs after the next heading at that
+        level or above keep their breadcrumbs.
+        """
+        before = self.prev(node)
+        stack = before.headings if before is not None else ()
+        current: Optional[Slot] = node
+        while current is not None:
+            p = current.paragraph
+            if p is not None:
+                if current is not node and (level == 0 or 0 < p.level <= level):
+                    break
+                stack = _open_headings(stack, p)
+                p.breadcrumb = " > ".join(text for _, text in stack) if stack else "Document Root"
+            current.headings = stack
+            current = self.next(current)
+
+
+def _open_headings(headings: Headings, paragraph: Any) -> Headings:
+    """Return the headings open after ``paragraph``, given those open before it."""
+    if paragraph is None or paragraph.level <= 0:
+        return headings
+    return (*(h for h in headings if h[0] < paragraph.level), (paragraph.level, paragraph.text[:50]))
+
+
+def _leftmost(node: Slot) -> Slot:
+    while node.left is not None:
+        node = node.left
+    return node
+
+
+def _build(nodes: List[Slot], lo: int, hi: int, parent: Optional[Slot]) -> Optional[Slot]:
+    """Link ``nodes[lo:hi]`` into a perfectly balanced subtree."""
+    if lo >= hi:
+        return None
+    mid = (lo + hi) // 2
+    node = nodes[mid]
+    node.parent = parent
+    node.left = _build(nodes, lo, mid, node)
+    node.right = _build(nodes, mid + 1, hi, node)
+    node.size = node.priority = hi - lo
+    return node
@@ -0,0 +1,468 @@
+"""Plan-and-execute mode: one model call plans the tool calls, the graph runs them.
+
+The ReAct graph calls the model after every tool execution, so a request
+like "find all mentions of the old SLA and show their sections" costs a
+model round trip per search and per section. In this graph the model can
+instead call Plan with every step at once::
+
+    {"steps": [
+        {"id": "s1", "tool": "search_document", "args": {"query": "old SLA"}},
+        {"id": "s2", "tool": "get_context", "for_each": "$s1.matches",
+         "args": {"anchor": "$item.a"}}
+    ]}
+
+execute_plan() then runs the steps in waves, each wave one AIMessage whose
+tool calls the ToolNode runs in parallel: every step whose dependencies
+have finished, with a for_each step fanned out into one call per item.
+A step depends on the steps its args reference, those in its ``after``
+list and the edits before it; an edit depends on every step before it, so
+it runs alone and goes through the approval node like any other edit. An
+edit with for_each is sent out one item per wave, so each item is approved
+on its own.
+
+The model is called again once the plan has run: to answer from the
+results or, if steps failed, to call Plan again. Plain tool calls without
+a plan work as in the ReAct graph.
+"""
+
+import copy
+import json
+import uuid
+from typing import Any, Dict, List, Literal, Optional, Set, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langgraph.graph import StateGraph
+from langgraph.prebuilt import ToolNode
+from langgraph.runtime import Runtime
+from pydantic import BaseModel, Field
+
+from react_agent import prompts
+from react_agent.commands import route_after_command, route_command
+from react_agent.context import Context
+from react_agent.docx_manager import describe_open_document
+from react_agent.graph import (
+    approval_node,
+    requires_approval,
+    route_approval,
+    route_model_output,
+)
+from react_agent.history import compact_history, summary_prompt
+from react_agent.prompt_cache import (
+    assemble_prompt,
+    cache_kwargs,
+    coarse_time,
+    record_usage,
+)
+from react_agent.state import InputState, State
+from react_agent.tools import AGENT_TOOLS
+from react_agent.utils import get_bound_model, tool_names
+
+# Calls a for_each step may fan out into; further items are left out
+MAX_FANOUT = 20
+# Plans the model may submit for one user message
+MAX_PLANS = 3
+
+
+class PlanStep(BaseModel):
+    """One tool call of a plan."""
+
+    id: str = Field(description='Short unique id of the step, e.g. "s1"')
+    tool: str = Field(description="Name of the tool to call")
+    args: Dict[str, Any] = Field(
+        default_factory=dict,
+        description='Tool arguments. A string "$s1.matches.*.a" is replaced by that part '
+        'of step s1\'s result ("*" maps over a list), "$item.a" by part of the for_each item.',
+    )
+    for_each: Optional[str] = Field(
+        default=None,
+        description='Reference to a list in an earlier result, e.g. "$s1.matches". '
+        "The tool is called once per item, in parallel.",
+    )
+    after: List[str] = Field(
+        default_factory=list,
+        description="Ids of earlier steps that must finish first, besides those referenced",
+    )
+
+
+class Plan(BaseModel):
+    """Run several tool calls without a model call between them.
+
+    Steps that do not depend on each other run in parallel. You get every
+    result once the plan has run, or as far as it got if a step failed.
+    """
+
+    steps: List[PlanStep] = Field(description="The steps, in the order they should run")
+
+
+TOOL_NAMES = set(tool_names(AGENT_TOOLS))
+PLANNER_TOOLS: List[Any] = [*AGENT_TOOLS, Plan]
+
+
+def _references(value: Any) -> Set[str]:
+    """Return the ids of the steps a value refers to with "$<id>" strings."""
+    if isinstance(value, str):
+        if value.startswith("$"):
+            head = value[1:].split(".", 1)[0]
+            return set() if head == "item" else {head}
+        return set()
+    if isinstance(value, dict):
+        return set().union(*(_references(v) for v in value.values()))
+    if isinstance(value, list):
+        return set().union(*(_references(v) for v in value))
+    return set()
+
+
+def _walk(value: Any, path: List[str]) -> Any:
+    for i, key in enumerate(path):
+        if key == "*":
+            return [_walk(item, path[i + 1:]) for item in value]
+        value = value[int(key)] if isinstance(value, list) else value[key]
+    return value
+
+
+def resolve(value: Any, results: Dict[str, Any], item: Any = None) -> Any:
+    """Replace the "$<id>.<path>" and "$item.<path>" strings in a value.
+
+    Raises KeyError, IndexError, TypeError or ValueError if a path does
+    not exist in the result it refers to.
+    """
+    if isinstance(value, str) and value.startswith("$"):
+        head, *path = value[1:].split(".")
+        return _walk(item if head == "item" else results[head], path)
+    if isinstance(value, dict):
+        return {k: resolve(v, results, item) for k, v in value.items()}
+    if isinstance(value, list):
+        return [resolve(v, results, item) for v in value]
+    return value
+
+
+def new_plan(steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Check a plan's steps and work out their dependencies.
+
+    Steps may only refer to earlier steps, which rules out cycles. Besides
+    the steps it refers to, a step depends on the last edit before it and
+    an edit on every step before it, so edits run alone and in order.
+
+    Raises:
+        ValueError: If a step is malformed, repeats an id, names an unknown
+            tool or refers to a step that does not come before it.
+    """
+    if not steps:
+        raise ValueError("the plan has no steps")
+    deps: Dict[str, List[str]] = {}
+    earlier: List[str] = []
+    last_edit: Optional[str] = None
+    checked = []
+    for raw in steps:
+        step = PlanStep.model_validate(raw).model_dump()
+        sid = step["id"]
+        if sid in deps or sid == "item":
+            raise ValueError(f"step id {sid!r} is used twice or reserved")
+        if step["tool"] not in TOOL_NAMES:
+            raise ValueError(f"step {sid} calls unknown tool {step['tool']!r}")
+        needs = set(step["after"]) | _references(step["args"]) | _references(step["for_each"])
+        unknown = needs - set(earlier)
+        if unknown:
+            raise ValueError(f"step {sid} refers to {sorted(unknown)}, which are not earlier steps")
+        if requires_approval(step["tool"]):
+            needs |= set(earlier)
+            last_edit = sid
+        elif last_edit is not None:
+            needs.add(last_edit)
+        deps[sid] = sorted(needs)
+        earlier.append(sid)
+        checked.append(step)
+    return {"steps": checked, "deps": deps, "results": {}, "failed": {}, "partial": {}, "running": {}}
+
+
+def next_wave(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Start every step that can run now and return their tool calls.
+
+    Steps whose dependencies failed are marked failed too, as are steps
+    whose references cannot be resolved. A for_each edit starts one item
+    at a time, since the approval node only asks about one edit per wave.
+    ``plan`` is updated in place.
+    """
+    results, failed, running = plan["results"], plan["failed"], plan["running"]
+    while True:
+        busy = {sid for sid, _ in running.values()}
+        calls: List[Dict[str, Any]] = []
+        settled = False
+        for step in plan["steps"]:
+            sid = step["id"]
+            if sid in results or sid in failed or sid in busy:
+                continue
+            deps = plan["deps"][sid]
+            broken = [d for d in deps if d in failed]
+            if broken:
+                failed[sid] = f"Not run because step {broken[0]} failed."
+                settled = True
+                continue
+            if any(d not in results for d in deps):
+                continue
+            try:
+                if step["for_each"] is None:
+                    batch = [(-1, resolve(step["args"], results))]
+                else:
+                    items = resolve(step["for_each"], results)
+                    if not isinstance(items, list):
+                        raise TypeError(f"{step['for_each']} is not a list")
+                    if len(items) > MAX_FANOUT:
+                        plan.setdefault("cut", {})[sid] = len(items)
+                    items = items[:MAX_FANOUT]
+                    batch = [(i, resolve(step["args"], results, item)) for i, item in enumerate(items)]
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                failed[sid] = f"Could not resolve its arguments: {e!r}"
+                settled = True
+                continue
+            if step["for_each"] is not None:
+                if not batch:
+                    results[sid] = []
+                    settled = True
+                    continue
+                done = plan["partial"].setdefault(sid, [None] * len(batch))
+                if requires_approval(step["tool"]):
+                    batch = [next((i, args) for i, args in batch if done[i] is None)]
+            for index, args in batch:
+                call_id = f"{sid}_{uuid.uuid4().hex[:8]}"
+                running[call_id] = [sid, index]
+                calls.append({"name": step["tool"], "args": args, "id": call_id})
+        if calls or not settled:
+            return calls
+
+
+def _tool_result(message: ToolMessage) -> Tuple[Any, Optional[str]]:
+    """Return a tool message's result and, if the call failed, why."""
+    try:
+        value = json.loads(message.content) if isinstance(message.content, str) else message.content
+    except json.JSONDecodeError:
+        value = message.content
+    if message.status == "error":
+        return value, str(value)
+    if value is None:
+        return value, "The tool found nothing."
+    if isinstance(value, dict) and value.get("success") is False:
+        return value, str(value.get("message") or value.get("error") or "The tool failed.")
+    return value, None
+
+
+def record_results(plan: Dict[str, Any], messages: List[BaseMessage]) -> None:
+    """Store the results of the plan's tool calls found in ``messages``.
+
+    Each item of a for_each step keeps its result, failed or not; the step
+    has a result once every item has one. ``plan`` is updated in place.
+    """
+    running = plan["running"]
+    for message in messages:
+        if not isinstance(message, ToolMessage) or message.tool_call_id not in running:
+            continue
+        sid, index = running.pop(message.tool_call_id)
+        value, error = _tool_result(message)
+        if index < 0:
+            if error is None:
+                plan["results"][sid] = value
+            else:
+                plan["failed"][sid] = error
+            continue
+        partial = plan["partial"][sid]
+        partial[index] = value if error is None else {"success": False, "message": error}
+        # Items never hold None: a call that returned nothing is a failure
+        if None not in partial:
+            plan["results"][sid] = plan["partial"].pop(sid)
+
+
+def plan_report(plan: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Describe what did not go to plan, for the model; None if all went well."""
+    if not plan:
+        return None
+    lines = [f"- {sid}: {reason}" for sid, reason in plan["failed"].items()]
+    settled = set(plan["results"]) | set(plan["failed"])
+    lines += [f"- {s['id']}: not run" for s in plan["steps"] if s["id"] not in settled]
+    lines += [
+        f"- {sid}: ran for the first {MAX_FANOUT} of {total} items"
+        for sid, total in plan.get("cut", {}).items()
+    ]
+    if not lines:
+        return None
+    return "The last plan did not run as planned:\n" + "\n".join(lines) + (
+        "\nCall Plan again for what is missing, or answer with what you have."
+    )
+
+
+def _plans_this_turn(messages: List[BaseMessage]) -> int:
+    count = 0
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            break
+        if isinstance(message, AIMessage):
+            count += sum(1 for c in message.tool_calls if c["name"] == Plan.__name__)
+    return count
+
+
+async def call_planner(state: State, runtime: Runtime[Context]) -> Dict[str, Any]:
+    """Call the model, with Plan offered next to the tools.
+
+    Like the ReAct graph's call_model, with the planning instructions added
+    to the system prompt and, after a plan that did not fully run, a report
+    of what went wrong added to the volatile context.
+
+    Args:
+        state (State): The current state of the conversation.
+        runtime (Runtime[Context]): Runtime context containing configuration.
+
+    Returns:
+        dict: The model's response; the finished plan is cleared.
+    """
+    try:
+        model = get_bound_model(runtime.context.model, PLANNER_TOOLS)
+        system_message = runtime.context.system_prompt.format(
+            system_time=coarse_time(runtime.context.time_granularity)
+        ) + "\n\n" + prompts.PLANNER_PROMPT
+        if state.summary:
+            system_message += "\n\n" + summary_prompt(
+                state.summary, runtime.context.history_max_tokens
+            )
+        provider = runtime.context.model.split("/", maxsplit=1)[0]
+        volatile = "\n\n".join(
+            part for part in (describe_open_document(), plan_report(state.plan)) if part
+        )
+        messages = assemble_prompt(system_message, state.messages, provider, volatile=volatile)
+        hints = cache_kwargs(
+            provider, runtime.context.model, tool_names(PLANNER_TOOLS), system_message
+        )
+
+        response = await model.ainvoke(messages, **hints)
+        if not isinstance(response, AIMessage):
+            raise ValueError(f"Model returned {type(response).__name__}, expected AIMessage")
+        record_usage(response)
+
+        if state.is_last_step and response.tool_calls:
+            return {
+                "messages": [
+                    AIMessage(
+                        id=response.id,
+                        content="Sorry, I could not find an answer to your question in the specified number of steps.",
+                    )
+                ],
+                "plan": None,
+            }
+        return {"messages": [response], "plan": None}
+
+    except Exception as e:
+        return {
+            "messages": [AIMessage(content=f"An error occurred while calling the model: {str(e)}")],
+            "plan": None,
+        }
+
+
+async def execute_plan(state: State) -> Dict[str, Any]:
+    """Start a new plan, or record the last wave's results, and issue the next wave.
+
+    A Plan call is answered with a tool message saying how many steps run,
+    or why the plan was refused. Tool calls made next to Plan become steps
+    of it. The next wave is an AIMessage with one tool call per step (or
+    for_each item) that can run now.
+
+    Args:
+        state (State): The current state of the conversation.
+
+    Returns:
+        dict: The plan's tool messages and next wave, and the updated plan.
+    """
+    last_message = state.messages[-1]
+    plan_calls = (
+        [c for c in last_message.tool_calls if c["name"] == Plan.__name__]
+        if isinstance(last_message, AIMessage)
+        else []
+    )
+    if not plan_calls:
+        if state.plan is None:
+            return {}
+        plan = copy.deepcopy(state.plan)
+        record_results(plan, state.messages[-len(plan["running"]) - 1:])
+        calls = next_wave(plan)
+        update: Dict[str, Any] = {"plan": plan}
+        if calls:
+            update["messages"] = [AIMessage(content="", tool_calls=calls)]
+        return update
+
+    plan_call = plan_calls[0]
+    others = [c for c in last_message.tool_calls if c is not plan_call]
+    steps = list(plan_call["args"].get("steps") or [])
+    steps += [
+        {"id": c["id"], "tool": c["name"], "args": c["args"]}
+        for c in others
+        if c["name"] != Plan.__name__
+    ]
+    try:
+        if _plans_this_turn(state.messages) > MAX_PLANS:
+            raise ValueError(f"more than {MAX_PLANS} plans for one request; answer with what you have")
+        plan = new_plan(steps)
+    except ValueError as e:
+        # ValidationError is a ValueError too
+        refused = f"The plan was not run: {e}"
+        return {
+            "messages": [
+                ToolMessage(content=refused, tool_call_id=c["id"], name=c["name"], status="error")
+                for c in last_message.tool_calls
+            ],
+            "plan": None,
+        }
+    messages: List[BaseMessage] = []
+    for c in last_message.tool_calls:
+        if c is plan_call:
+            content = f"Running {len(plan['steps'])} steps."
+        elif c["name"] == Plan.__name__:
+            content = "Only one plan runs at a time; this one was ignored."
+        else:
+            content = f"Added to the plan as step {c['id']}."
+        messages.append(ToolMessage(content=content, tool_call_id=c["id"], name=c["name"]))
+    calls = next_wave(plan)
+    if calls:
+        messages.append(AIMessage(content="", tool_calls=calls))
+    return {"messages": messages, "plan": plan}
+
+
+def route_planner_output(
+    state: State,
+) -> Literal["__end__", "execute_plan", "approval_node", "tools"]:
+    """Run a plan, plain tool calls as in the ReAct graph, or finish."""
+    last_message = state.messages[-1]
+    if isinstance(last_message, AIMessage) and any(
+        c["name"] == Plan.__name__ for c in last_message.tool_calls
+    ):
+        return "execute_plan"
+    return route_model_output(state)
+
+
+def route_plan_execution(state: State) -> Literal["approval_node", "tools", "compact_history"]:
+    """Run the next wave, through approval if it edits; back to the model when done."""
+    last_message = state.messages[-1]
+    if not isinstance(last_message, AIMessage) or not last_message.tool_calls:
+        return "compact_history"
+    if any(requires_approval(c["name"]) for c in last_message.tool_calls):
+        return "approval_node"
+    return "tools"
+
+
+builder = StateGraph(State, input_schema=InputState, context_schema=Context)
+
+builder.add_node(route_command)
+builder.add_node(compact_history)
+builder.add_node("call_model", call_planner)
+builder.add_node(execute_plan)
+builder.add_node("approval_node", approval_node)
+builder.add_node("tools", ToolNode(AGENT_TOOLS))
+
+builder.add_edge("__start__", "route_command")
+builder.add_conditional_edges("route_command", route_after_command)
+builder.add_edge("compact_history", "call_model")
+builder.add_conditional_edges("call_model", route_planner_output)
+builder.add_conditional_edges("execute_plan", route_plan_execution)
+# A rejected edit goes back to the model, which can answer or plan again
+builder.add_conditional_edges("approval_node", route_approval)
+# Tool results go to execute_plan, which starts the next wave or, when the
+# plan is done (or the calls were not part of a plan), returns to the model
+builder.add_edge("tools", "execute_plan")
+
+graph = builder.compile(name="Plan-and-Execute Agent")
@@ -0,0 +1,152 @@
+"""Prompt assembly that keeps a stable, cacheable prefix.
+
+Providers cache the longest prompt prefix they have seen recently: OpenAI
+does so automatically for prompts of 1024 tokens or more, and Anthropic at
+the ``cache_control`` breakpoints a request marks. A cache hit needs the
+prefix to be identical byte for byte, so prompts are assembled as:
+
+1. the tool schemas, bound once to the model (see utils.get_bound_model);
+2. the system prompt, with the time floored to ``time_granularity``
+   seconds so it changes once an hour rather than on every call;
+3. the conversation history, which only ever grows at the end;
+4. volatile context, such as the open document's state, last.
+
+Cached and uncached input token counts of each call are read from the
+response's usage metadata and kept for get_prompt_cache_metrics().
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+logger = logging.getLogger(__name__)
+
+# Breakpoint Anthropic caches the prompt up to
+_EPHEMERAL = {"type": "ephemeral"}
+
+
+@dataclass
+class PromptCacheMetrics:
+    """Input token counters over all model calls."""
+
+    calls: int = 0
+    calls_with_hits: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    cache_write_tokens: int = 0
+
+
+_metrics = PromptCacheMetrics()
+_metrics_lock = threading.Lock()
+
+
+def coarse_time(granularity: int, now: Optional[datetime] = None) -> str:
+    """Return the UTC time floored to ``granularity`` seconds, in ISO format.
+
+    ``granularity`` 0 or less keeps the exact time.
+    """
+    now = now or datetime.now(tz=UTC)
+    if granularity <= 0:
+        return now.isoformat()
+    seconds = int(now.timestamp()) // granularity * granularity
+    return datetime.fromtimestamp(seconds, tz=UTC).isoformat()
+
+
+def _with_breakpoint(message: BaseMessage) -> BaseMessage:
+    """Copy ``message`` with an Anthropic cache breakpoint on its last content block."""
+    content = message.content
+    if isinstance(content, str):
+        blocks: List[Any] = [{"type": "text", "text": content}]
+    else:
+        blocks = [b if isinstance(b, dict) else {"type": "text", "text": b} for b in content]
+    if not blocks:
+        return message
+    blocks[-1] = {**blocks[-1], "cache_control": _EPHEMERAL}
+    return message.model_copy(update={"content": blocks})
+
+
+def assemble_prompt(
+    system_prompt: str,
+    messages: Sequence[BaseMessage],
+    provider: str,
+    volatile: Optional[str] = None,
+) -> List[BaseMessage]:
+    """Order the prompt as stable system prompt, history, then volatile context.
+
+    For Anthropic, the system prompt and the last history message are marked
+    as cache breakpoints. Volatile context goes in a trailing system message
+    for OpenAI; Anthropic and others only accept a system message first, so
+    it is sent as a user message there.
+    """
+    system = SystemMessage(content=system_prompt)
+    history = list(messages)
+    if provider == "anthropic":
+        system = _with_breakpoint(system)
+        if history:
+            history[-1] = _with_breakpoint(history[-1])
+    prompt: List[BaseMessage] = [system, *history]
+    if volatile:
+        tail = SystemMessage if provider == "openai" else HumanMessage
+        prompt.append(tail(content=volatile))
+    return prompt
+
+
+def cache_kwargs(provider: str, model: str, tool_names: Sequence[str], system_prompt: str) -> Dict[str, Any]:
+    """Return the provider's per-call cache hints.
+
+    OpenAI routes requests with the same ``prompt_cache_key`` to the same
+    cache, which raises the hit rate for prompts that share a prefix; the
+    key names the model, tools and system prompt. It is not sent when
+    ``OPENAI_BASE_URL`` points elsewhere, as compatible servers may reject
+    it. Anthropic's hints are the breakpoints assemble_prompt() sets.
+    """
+    if provider != "openai" or os.environ.get("OPENAI_BASE_URL"):
+        return {}
+    prefix = "\n".join([model, *tool_names, system_prompt])
+    return {"prompt_cache_key": hashlib.sha256(prefix.encode()).hexdigest()[:32]}
+
+
+def record_usage(response: AIMessage) -> Optional[Dict[str, int]]:
+    """Add a response's input and cached token counts to the metrics.
+
+    Return the counts, or None if the provider reported no usage.
+    """
+    usage = response.usage_metadata
+    if not usage:
+        return None
+    details = usage.get("input_token_details") or {}
+    counts = {
+        "input_tokens": usage.get("input_tokens", 0),
+        "cached_tokens": details.get("cache_read") or 0,
+        "cache_write_tokens": details.get("cache_creation") or 0,
+    }
+    with _metrics_lock:
+        _metrics.calls += 1
+        _metrics.calls_with_hits += counts["cached_tokens"] > 0
+        _metrics.input_tokens += counts["input_tokens"]
+        _metrics.cached_tokens += counts["cached_tokens"]
+        _metrics.cache_write_tokens += counts["cache_write_tokens"]
+    logger.debug("Model call: %(input_tokens)d input tokens, %(cached_tokens)d cached", counts)
+    return counts
+
+
+def get_prompt_cache_metrics() -> Dict[str, Any]:
+    """Return the token counters and the share of input tokens read from cache."""
+    with _metrics_lock:
+        metrics: Dict[str, Any] = asdict(_metrics)
+    total = metrics["input_tokens"]
+    metrics["cached_ratio"] = round(metrics["cached_tokens"] / total, 4) if total else 0.0
+    return metrics
+
+
+def reset_prompt_cache_metrics() -> None:
+    """Zero the token counters."""
+    global _metrics
+    with _metrics_lock:
+        _metrics = PromptCacheMetrics()
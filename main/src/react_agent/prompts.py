@@ -3,3 +3,17 @@
 SYSTEM_PROMPT = """You are a helpful AI assistant.
 
 System time: {system_time}"""
+
+PLANNER_PROMPT = """When a request needs several tool calls, call Plan once with all of them \
+instead of calling tools one at a time. The steps run without you: steps that \
+do not depend on each other run in parallel, and you see every result at the end.
+
+- In args, "$<step id>.<key>" stands for part of an earlier step's result, and \
+"*" for every item of a list, e.g. "$s1.matches.*.a" for the anchors of all \
+matches of search step s1.
+- for_each calls the tool once per item of a list, e.g. "for_each": "$s1.matches" \
+with "args": {"anchor": "$item.a"}.
+- Edits still need the user's approval, one at a time, after the steps before them.
+- If a step fails, you get the results so far and can call Plan again or answer.
+
+For a single tool call, call the tool directly."""
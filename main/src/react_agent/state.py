@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
+import operator
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional, Sequence
+from typing import Any, Dict, List, Optional, Sequence
 
 from langchain_core.messages import AnyMessage
 from langgraph.graph import add_messages
@@ -11,6 +12,11 @@ from langgraph.managed import IsLastStep
 from typing_extensions import Annotated
 
 
+def merge_archive(left: Dict[str, str], right: Dict[str, str]) -> Dict[str, str]:
+    """Add newly archived entries to the archive."""
+    return {**left, **right}
+
+
 @dataclass
 class InputState:
     """Defines the input state for the agent, representing a narrower interface to the outside world.
@@ -66,6 +72,24 @@ class State(InputState):
     }
     """
 
+    archive: Annotated[Dict[str, str], merge_archive] = field(default_factory=dict)
+    """
+    Content compacted out of `messages`, by ref: tool results by their tool
+    call id and collapsed turns as "turn-<n>" (see react_agent.history).
+    """
+
+    summary: Annotated[List[str], operator.add] = field(default_factory=list)
+    """
+    One line per turn collapsed out of `messages`, oldest first.
+    """
+
+    plan: Optional[Dict[str, Any]] = field(default=None)
+    """
+    The plan being run by the plan-and-execute graph (see react_agent.planner):
+    its steps, their dependencies, results and failures, and the tool calls
+    in flight.
+    """
+
     # Additional attributes can be added here as needed.
     # Common examples include:
     # retrieved_documents: List[Document] = field(default_factory=list)
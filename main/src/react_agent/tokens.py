@@ -0,0 +1,68 @@
+"""Local token counting for budgeting what is sent to the model.
+
+Counts use tiktoken with the ``DOCX_TOKENIZER`` encoding (cl100k_base by
+default). tiktoken downloads an encoding the first time it is used; where
+that is not possible (no network and no ``TIKTOKEN_CACHE_DIR``), counts fall
+back to an estimate of about one token per four characters of a word and
+one per punctuation mark, which is close for English prose.
+"""
+
+import math
+import os
+import re
+import threading
+from typing import Any
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+
+_lock = threading.Lock()
+_encoding: Any = None
+_loaded = False
+
+
+def _get_encoding() -> Any:
+    """Return the tiktoken encoding, or None if it cannot be loaded."""
+    global _encoding, _loaded
+    if not _loaded:
+        with _lock:
+            if not _loaded:
+                try:
+                    import tiktoken
+
+                    _encoding = tiktoken.get_encoding(os.environ.get("DOCX_TOKENIZER", "cl100k_base"))
+                except Exception:
+                    _encoding = None
+                _loaded = True
+    return _encoding
+
+
+def tokenizer_name() -> str:
+    """Name of the encoding in use, or "estimate"."""
+    encoding = _get_encoding()
+    return encoding.name if encoding is not None else "estimate"
+
+
+def count_tokens(text: str) -> int:
+    """Return the number of tokens in ``text``."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return sum(math.ceil(len(piece) / 4) for piece in _PIECE_RE.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, marker: str = "…") -> str:
+    """Return ``text`` cut to at most ``max_tokens`` tokens, ending in ``marker`` if cut."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    budget = max(0, max_tokens - count_tokens(marker))
+    encoding = _get_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:budget]) + marker
+    end = used = 0
+    for piece in _PIECE_RE.finditer(text):
+        used += math.ceil(len(piece.group()) / 4)
+        if used > budget:
+            break
+        end = piece.end()
+    return text[:end] + marker
+
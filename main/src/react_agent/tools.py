@@ -2,15 +2,58 @@
 
 These tools allow interaction with DOCX documents including reading, updating,
 and searching content within the document structure. Tools are exposed via MCP server.
+
+Tools never scan the document on the event loop: anything beyond an O(log n)
+lookup runs on the DOCX executor (see docx_executor).
+
+Results use the compact encoding from compact: paragraphs are
+{"a": short anchor, "id", "t": text, "h": heading level, "bc": breadcrumb}
+with "bc" an index into the result's "breadcrumbs" list. Tools that return
+many paragraphs take ``max_tokens`` and, when the result is cut, say in
+"more" how to fetch the rest.
 """
 
-import asyncio
-from typing import Any, Callable, List, Optional, cast
+from typing import Any, Callable, List, Optional, Union
+
+from langgraph.config import get_config
 
+from react_agent.compact import (
+    budget,
+    encode_paragraph,
+    fit_items,
+    fit_paragraphs,
+    more,
+    paginate,
+    parse_anchor,
+    short_anchor,
+    shrink,
+)
 from react_agent.docx_manager import get_docx_manager
+from react_agent.history import recall_result
+
+# Headings previewed by index_docx
+OUTLINE_PREVIEW = 10
+# Anchors of left-out paragraphs listed in a get_paragraphs "more" hint
+MORE_ANCHORS = 10
+
 
+def _session_id() -> Optional[str]:
+    """Return the conversation thread running the current tool, if any."""
+    try:
+        return get_config().get("configurable", {}).get("thread_id")
+    except RuntimeError:
+        # Called outside a graph run (e.g. directly or from the MCP server)
+        return None
 
-async def index_docx(docx_path: Optional[str] = None, export_json: bool = False) -> dict[str, Any]:
+
+def _short(ref: Union[List[Any], str]) -> Union[List[Any], str]:
+    """Return an anchor list in short form; ids and short anchors unchanged."""
+    return short_anchor(ref) if isinstance(ref, list) else ref
+
+
+async def index_docx(
+    docx_path: Optional[str] = None, export_json: bool = False, max_tokens: Optional[int] = None
+) -> dict[str, Any]:
     """Index or re-index a DOCX document to create structured navigation and anchor mapping.
     
     This tool parses the DOCX file and creates an index of all paragraphs with their
@@ -20,40 +63,55 @@ async def index_docx(docx_path: Optional[str] = None, export_json: bool = False)
     Args:
         docx_path: Optional path to the DOCX file. If not provided, uses the default document.
         export_json: Whether to export the index to a JSON file (default: False)
+        max_tokens: Token budget for the outline preview
     
     Returns:
-        Dict containing index statistics and structure information
+        Dict containing index statistics and a preview of the outline
     """
     manager = get_docx_manager(docx_path)
     await manager._ensure_index_loaded()
     
-    paragraphs = manager.get_all_paragraphs()
-    outline = manager.get_outline()
+    total_paragraphs, outline = await manager.executor.run(
+        lambda: (len(manager.get_all_paragraphs()), manager.get_outline())
+    )
     
-    result = {
-        "success": True,
-        "total_paragraphs": len(paragraphs),
-        "total_headings": len(outline),
-        "outline": outline[:10],  # Return first 10 headings for preview
-        "message": f"Successfully indexed document with {len(paragraphs)} paragraphs and {len(outline)} headings"
-    }
+    def build(preview: List[Any], breadcrumbs: List[str]) -> dict[str, Any]:
+        result: dict[str, Any] = {
+            "success": True,
+            "total_paragraphs": total_paragraphs,
+            "total_headings": len(outline),
+            "outline": preview,
+            "breadcrumbs": breadcrumbs,
+            "message": f"Successfully indexed document with {total_paragraphs} paragraphs and {len(outline)} headings"
+        }
+        if len(preview) < len(outline):
+            result["more"] = more(
+                len(preview), len(outline), f"get_document_outline(offset={len(preview)})"
+            )
+        return result
+    
+    result = shrink(build, *fit_paragraphs(outline[:OUTLINE_PREVIEW], max_tokens), max_tokens)
     
     if export_json:
         output_path = "document_index.json"
-        manager.export_index(output_path)
+        await manager.executor.run(manager.export_index, output_path)
         result["exported_to"] = output_path
     
     return result
 
 
-async def apply_edit(anchor: List[Any], new_text: str) -> dict[str, Any]:
+async def apply_edit(anchor: Union[List[Any], str], new_text: str) -> dict[str, Any]:
     """Apply an edit to a specific paragraph in the DOCX document.
     
     This tool updates the text content of a paragraph identified by its anchor position.
-    The anchor is a list representing the exact location: [body, table, row, col, par].
+    The anchor is the "a" of a paragraph in another tool result, e.g. "b.0.0.0.5"
+    (body, table, row, col, par), or the same as a list: ["body", 0, 0, 0, 5].
+    A paragraph's "id" can be passed instead; unlike the anchor it does not
+    change when paragraphs are inserted or deleted.
     
     Args:
-        anchor: List representing [body, table, row, col, par] position, e.g. ["body", 0, 0, 0, 5]
+        anchor: Anchor of the paragraph, e.g. "b.0.0.0.5",
+            or the paragraph id, e.g. "1A2B3C4D"
         new_text: New text content for the paragraph
     
     Returns:
@@ -61,119 +119,522 @@ async def apply_edit(anchor: List[Any], new_text: str) -> dict[str, Any]:
     """
     manager = get_docx_manager()
     await manager._ensure_index_loaded()
-    success = await asyncio.to_thread(manager.update_paragraph, anchor, new_text)
+    success = await manager.executor.run(
+        manager.update_paragraph, anchor, new_text, _session_id()
+    )
     
     if success:
         return {
             "success": True,
             "message": "Edit applied successfully",
-            "anchor": anchor,
+            "anchor": _short(anchor),
             "new_text": new_text[:100] + "..." if len(new_text) > 100 else new_text
         }
     else:
         return {
             "success": False,
             "message": "Failed to apply edit. Verify the anchor is correct.",
-            "anchor": anchor
+            "anchor": _short(anchor)
         }
 
 
-async def update_toc() -> dict[str, Any]:
-    """Update the Table of Contents (TOC) in the DOCX document.
+async def insert_paragraph(
+    after_anchor: Union[List[Any], str], text: str, style: Optional[str] = None
+) -> dict[str, Any]:
+    """Insert a new paragraph into the DOCX document after an existing one.
     
-    This tool regenerates the table of contents based on the current heading structure.
-    It extracts all headings (Heading 1-6) and creates a hierarchical TOC.
+    The new paragraph goes into the same place as the one before it (the
+    document body or the same table cell). Without a style it is formatted
+    like that paragraph, so inserting after a bullet adds another bullet.
+    Anchors of later paragraphs in the same block shift by one; use the
+    returned anchor for follow-up edits. undo_edit removes it again.
+    
+    Args:
+        after_anchor: Anchor or id of the paragraph to insert after, e.g. "b.0.0.0.5"
+        text: Text of the new paragraph
+        style: Optional paragraph style name, e.g. "Heading 2" or "List Bullet"
     
     Returns:
-        Dict with the updated TOC structure and success status
+        Dict with success status and the new paragraph's id, anchor and breadcrumb
     """
     manager = get_docx_manager()
     await manager._ensure_index_loaded()
-    outline = manager.get_outline()
+    try:
+        inserted = await manager.executor.run(
+            manager.insert_paragraph, after_anchor, text, style, _session_id()
+        )
+    except ValueError as e:
+        return {"success": False, "message": str(e)}
+    if inserted is None:
+        return {
+            "success": False,
+            "message": "Failed to insert paragraph. Verify the anchor is correct.",
+            "anchor": _short(after_anchor),
+        }
+    return {"success": True, "message": "Paragraph inserted", "paragraph": encode_paragraph(inserted)}
+
+
+async def delete_paragraph(anchor: Union[List[Any], str]) -> dict[str, Any]:
+    """Delete a paragraph from the DOCX document.
+    
+    Anchors of later paragraphs in the same block shift down by one.
+    undo_edit puts the paragraph back.
+    
+    Args:
+        anchor: Anchor or id of the paragraph to delete, e.g. "b.0.0.0.5"
     
-    # Build TOC structure
-    toc = {
-        "title": "Table of Contents",
-        "entries": []
+    Returns:
+        Dict with success status and the deleted paragraph
+    """
+    manager = get_docx_manager()
+    await manager._ensure_index_loaded()
+    try:
+        deleted = await manager.executor.run(manager.delete_paragraph, anchor, _session_id())
+    except ValueError as e:
+        return {"success": False, "message": str(e)}
+    if deleted is None:
+        return {
+            "success": False,
+            "message": "Failed to delete paragraph. Verify the anchor is correct.",
+            "anchor": _short(anchor),
+        }
+    return {"success": True, "message": "Paragraph deleted", "paragraph": encode_paragraph(deleted)}
+
+
+async def replace_all(
+    pattern: str,
+    replacement: str,
+    scope: Optional[Union[List[Any], str]] = None,
+    regex: bool = False,
+    case_sensitive: bool = True,
+) -> dict[str, Any]:
+    r"""Replace every occurrence of a text in the DOCX document in one edit.
+    
+    Use this instead of search_document followed by one apply_edit per
+    paragraph, e.g. to rename a client or product throughout. Formatting of
+    the surrounding text is kept, and the document is saved once.
+    
+    Args:
+        pattern: Text to find (a regular expression if regex is True)
+        replacement: Replacement text; with regex it may use groups like \1
+        scope: None for the whole document, or the anchor or id of a heading
+            to limit the replacement to its section (or of a single paragraph)
+        regex: Whether pattern is a regular expression
+        case_sensitive: Whether to match case
+    
+    Returns:
+        Dict with success status, the number of matches and paragraphs changed,
+        and a sample of changed paragraphs before and after
+    """
+    manager = get_docx_manager()
+    await manager._ensure_index_loaded()
+    try:
+        result = await manager.executor.run(
+            manager.replace_all, pattern, replacement, scope, regex, case_sensitive, _session_id()
+        )
+    except ValueError as e:
+        return {"success": False, "message": str(e)}
+    return {
+        "success": True,
+        "message": f"Replaced {result['matches']} matches in {result['paragraphs']} paragraphs",
+        **result,
+        "sample": [{**s, "anchor": short_anchor(s["anchor"])} for s in result["sample"]],
     }
+
+
+async def undo_edit() -> dict[str, Any]:
+    """Undo the most recent edit applied to the DOCX document.
+    
+    Only the paragraph that edit changed is restored to its previous text;
+    an inserted paragraph is removed and a deleted one put back.
+    Call repeatedly to step further back; redo_edit re-applies undone edits.
+    
+    Returns:
+        Dict with success status, the restored anchor and text
+    """
+    manager = get_docx_manager()
+    await manager._ensure_index_loaded()
+    try:
+        undone = await manager.executor.run(manager.undo_edit, _session_id())
+    except ValueError as e:
+        return {"success": False, "message": str(e)}
+    if undone is None:
+        return {"success": False, "message": "There is no edit to undo."}
+    return {"success": True, "message": "Edit undone", **undone, "anchor": _short(undone["anchor"])}
+
+
+async def redo_edit() -> dict[str, Any]:
+    """Re-apply the most recently undone edit to the DOCX document.
+    
+    Returns:
+        Dict with success status, the anchor and the re-applied text
+    """
+    manager = get_docx_manager()
+    await manager._ensure_index_loaded()
+    try:
+        redone = await manager.executor.run(manager.redo_edit, _session_id())
+    except ValueError as e:
+        return {"success": False, "message": str(e)}
+    if redone is None:
+        return {"success": False, "message": "There is no undone edit to redo."}
+    return {"success": True, "message": "Edit redone", **redone, "anchor": _short(redone["anchor"])}
+
+
+async def list_versions(max_tokens: Optional[int] = None) -> dict[str, Any]:
+    """List the saved versions of the DOCX document, oldest first.
+    
+    A version is kept when the document is first loaded and after every save,
+    so each approved edit can be audited or rolled back with restore_version.
+    If they do not all fit in ``max_tokens``, the newest are listed.
+    
+    Args:
+        max_tokens: Token budget for the result
+    
+    Returns:
+        Dict with each version's number, timestamp, size and label
+    """
+    manager = get_docx_manager()
+    versions = await manager.executor.run(manager.list_versions)
+    shown = fit_items(versions[::-1], max_tokens)[::-1]
+    result: dict[str, Any] = {"versions": shown, "count": len(versions)}
+    if len(shown) < len(versions):
+        result["more"] = more(
+            len(shown), len(versions), "list_versions(max_tokens=...) with a larger budget"
+        )
+    return result
+
+
+async def restore_version(version: int) -> dict[str, Any]:
+    """Replace the DOCX document with one of its saved versions.
+    
+    The current state is kept as a version first, so a restore can itself
+    be undone by restoring again. undo_edit and redo_edit do not reach
+    edits made before a restore.
+    
+    Args:
+        version: Version number from list_versions
+    
+    Returns:
+        Dict with success status and the new version created by the restore
+    """
+    manager = get_docx_manager()
+    try:
+        restored = await manager.executor.run(manager.restore_version, version)
+    except KeyError as e:
+        return {"success": False, "message": str(e.args[0])}
+    return {"success": True, "message": f"Restored version {version}", "version": restored}
+
+
+async def update_toc(max_tokens: Optional[int] = None, offset: int = 0) -> dict[str, Any]:
+    """Update the Table of Contents (TOC) in the DOCX document.
+    
+    This tool regenerates the table of contents based on the current heading structure.
+    It extracts all headings (Heading 1-6) and creates a hierarchical TOC; each
+    entry's "h" is its level.
     
-    for heading in outline:
-        level = heading.get("level", 0)
-        text = heading.get("text", "")
-        anchor = heading.get("anchor", [])
-        
-        toc["entries"].append({
-            "level": level,
-            "text": text,
-            "anchor": anchor,
-            "indent": "  " * (level - 1)
-        })
+    Args:
+        max_tokens: Token budget for the result
+        offset: Index of the first entry to return, from a previous result's "more"
     
+    Returns:
+        Dict with the TOC entries, their count and success status
+    """
+    manager = get_docx_manager()
+    await manager._ensure_index_loaded()
+    outline = await manager.executor.run(manager.get_outline)
     return {
         "success": True,
-        "toc": toc,
-        "total_entries": len(toc["entries"]),
-        "message": f"Table of Contents generated with {len(toc['entries'])} entries"
+        **paginate(
+            "entries", outline, max_tokens, offset, lambda n: f"update_toc(offset={n})",
+            title="Table of Contents",
+            message=f"Table of Contents generated with {len(outline)} entries",
+        ),
     }
 
 
-async def get_paragraph(anchor: List[Any]) -> Optional[dict[str, Any]]:
-    """Get a paragraph from the DOCX document by its anchor.
+async def get_paragraph(
+    anchor: Union[List[Any], str], max_tokens: Optional[int] = None
+) -> Optional[dict[str, Any]]:
+    """Get a paragraph from the DOCX document by its anchor or id.
     
     Args:
-        anchor: List representing [body, table, row, col, par] position, e.g. ["body", 0, 0, 0, 5]
+        anchor: Anchor such as "b.0.0.0.5" ([body, table, row, col, par]). The first
+            part is the namespace, "b" (body), "h" (header), "f" (footer), "fn"
+            (footnote) or "c" (comment, whose anchors are "c.<index>"). A body
+            paragraph can also be given by its id, e.g. "1A2B3C4D".
+        max_tokens: Token budget; longer text is cut and the result has "cut": true.
+            Pass a larger budget to read all of it.
     
     Returns:
-        Dict with paragraph information including text, style, breadcrumb, and metadata
+        Dict with the paragraph's anchor "a", id, text "t", heading level "h"
+        and breadcrumb "bc"
     """
     manager = get_docx_manager()
     await manager._ensure_index_loaded()
-    return manager.get_paragraph(anchor)
+    if isinstance(anchor, str):
+        anchor = parse_anchor(anchor) or anchor
+    if not isinstance(anchor, str) and anchor and anchor[0] != "body":
+        # Non-body namespaces are parsed on first access.
+        found = await manager.executor.run(manager.get_paragraph, anchor)
+    else:
+        found = manager.get_paragraph(anchor)
+    return encode_paragraph(found, max_tokens) if found is not None else None
 
 
-async def search_document(query: str, case_sensitive: bool = False) -> dict[str, Any]:
+async def get_paragraphs(
+    anchors: List[Union[List[Any], str]], max_tokens: Optional[int] = None
+) -> dict[str, Any]:
+    """Get several paragraphs from the DOCX document in one call.
+    
+    Prefer this to repeated get_paragraph calls when you already know which
+    paragraphs to read, e.g. the anchors returned by search_document.
+    
+    Args:
+        anchors: Anchors or ids of the paragraphs, e.g. ["b.0.0.0.5", "1A2B3C4D"]
+        max_tokens: Token budget for the result
+    
+    Returns:
+        Dict with the paragraphs in the order requested, their breadcrumbs and
+        the anchors not found
+    """
+    manager = get_docx_manager()
+    await manager._ensure_index_loaded()
+    found = await manager.executor.run(manager.get_paragraphs, anchors)
+    present = [p for p in found if p is not None]
+    not_found = [_short(a) for a, p in zip(anchors, found) if p is None]
+    
+    def build(paragraphs: List[Any], breadcrumbs: List[str]) -> dict[str, Any]:
+        result: dict[str, Any] = {
+            "paragraphs": paragraphs,
+            "breadcrumbs": breadcrumbs,
+            "not_found": not_found,
+        }
+        if len(paragraphs) < len(present):
+            rest = [short_anchor(p["anchor"]) for p in present[len(paragraphs):]]
+            listed = repr(rest[:MORE_ANCHORS])[:-1] + (", ...]" if len(rest) > MORE_ANCHORS else "]")
+            result["more"] = more(len(paragraphs), len(present), f"get_paragraphs(anchors={listed})")
+        return result
+    
+    return shrink(build, *fit_paragraphs(present, max_tokens), max_tokens)
+
+
+async def get_context(
+    anchor: Union[List[Any], str],
+    before: int = 2,
+    after: int = 2,
+    max_tokens: Optional[int] = None,
+) -> dict[str, Any]:
+    """Get a paragraph together with the paragraphs around it, in reading order.
+    
+    Use this to read a passage around a search hit instead of fetching each
+    neighbouring paragraph separately. If the passage does not fit in
+    ``max_tokens``, the neighbours closest to the paragraph are kept.
+    
+    Args:
+        anchor: Anchor or id of the body paragraph, e.g. "b.0.0.0.5"
+        before: Number of paragraphs to include before it (at most 50)
+        after: Number of paragraphs to include after it (at most 50)
+        max_tokens: Token budget for the result
+    
+    Returns:
+        Dict with the paragraph, the lists of paragraphs before and after it,
+        and their breadcrumbs
+    """
+    manager = get_docx_manager()
+    await manager._ensure_index_loaded()
+    context = await manager.executor.run(
+        manager.get_context, anchor, max(0, min(before, 50)), max(0, min(after, 50))
+    )
+    if context is None:
+        return {
+            "success": False,
+            "message": "No body paragraph at that anchor.",
+            "anchor": _short(anchor),
+        }
+    return {"success": True, **_fit_context(context, max_tokens)}
+
+
+def _fit_context(context: dict[str, Any], max_tokens: Optional[int]) -> dict[str, Any]:
+    """Encode a get_context() result, keeping the neighbours nearest the paragraph."""
+    before, after = context["before"][::-1], context["after"]
+    # Nearest first, alternating sides: (side, distance)
+    order = [("before", i) for i in range(len(before))] + [("after", i) for i in range(len(after))]
+    order.sort(key=lambda item: (item[1], item[0] == "after"))
+    sides = {"before": before, "after": after}
+    
+    def build(encoded: List[Any], breadcrumbs: List[str]) -> dict[str, Any]:
+        kept: dict[str, List[Any]] = {"before": [], "after": []}
+        for (side, i), entry in zip(order, encoded[1:]):
+            kept[side].append((i, entry))
+        result: dict[str, Any] = {
+            "paragraph": encoded[0],
+            "before": [entry for _, entry in sorted(kept["before"], key=lambda k: -k[0])],
+            "after": [entry for _, entry in sorted(kept["after"], key=lambda k: k[0])],
+            "breadcrumbs": breadcrumbs,
+        }
+        if len(encoded) <= len(order):
+            result["more"] = more(
+                len(encoded) - 1, len(order),
+                f"get_context({encoded[0]['a']!r}, before={len(before)}, after={len(after)}, "
+                f"max_tokens={2 * budget(max_tokens)})",
+            )
+        return result
+    
+    paragraphs = [context["paragraph"]] + [sides[side][i] for side, i in order]
+    return shrink(build, *fit_paragraphs(paragraphs, max_tokens), max_tokens)
+
+
+async def get_chunk(index: int, max_tokens: Optional[int] = None) -> dict[str, Any]:
+    """Read one chunk of the document body.
+    
+    When the document is indexed its body is split, along section boundaries,
+    into chunks that each fit a fixed token budget. To summarize the document
+    or answer a question about all of it, read chunks 0 to count - 1 in turn:
+    the number of calls is known from the first result (or iter_chunks).
+    
+    Args:
+        index: Chunk number, from 0
+        max_tokens: Token budget for the result
+    
+    Returns:
+        Dict with the chunk's paragraphs, their breadcrumbs, the number of
+        chunks and the call that reads the next one
+    """
+    manager = get_docx_manager()
+    await manager._ensure_index_loaded()
+    chunk = await manager.executor.run(manager.get_chunk, index)
+    if chunk is None:
+        return {
+            "success": False,
+            "message": f"No chunk {index}; the document has {len(manager.chunks)} chunks.",
+        }
+    total = len(chunk["paragraphs"])
+    
+    def build(paragraphs: List[Any], breadcrumbs: List[str]) -> dict[str, Any]:
+        result: dict[str, Any] = {
+            "chunk": index,
+            "count": chunk["count"],
+            "paragraphs": paragraphs,
+            "breadcrumbs": breadcrumbs,
+        }
+        if len(paragraphs) < total:
+            result["more"] = more(
+                len(paragraphs), total, f"get_chunk({index}, max_tokens={2 * budget(max_tokens)})"
+            )
+        if index + 1 < chunk["count"]:
+            result["next"] = f"get_chunk({index + 1})"
+        return result
+    
+    return shrink(build, *fit_paragraphs(chunk["paragraphs"], max_tokens), max_tokens)
+
+
+async def iter_chunks(start: int = 0, max_tokens: Optional[int] = None) -> dict[str, Any]:
+    """List the chunks of the document body, to plan reading it with get_chunk.
+    
+    Args:
+        start: First chunk to list, from a previous result's "more"
+        max_tokens: Token budget for the result
+    
+    Returns:
+        Dict with each chunk's number "i", first anchor "a", breadcrumb "bc"
+        and size in tokens, the number of chunks and the chunk token budget
+    """
+    manager = get_docx_manager()
+    await manager._ensure_index_loaded()
+    chunks = await manager.executor.run(manager.list_chunks)
+    entries = [
+        {"i": c["index"], "a": short_anchor(c["anchor"]), "bc": c["breadcrumb"], "tokens": c["tokens"]}
+        for c in chunks[max(0, start):]
+    ]
+    shown = fit_items(entries, max_tokens)
+    result: dict[str, Any] = {
+        "chunks": shown,
+        "count": len(chunks),
+        "chunk_tokens": manager.chunks.budget,
+    }
+    if shown and shown[-1]["i"] + 1 < len(chunks):
+        following = shown[-1]["i"] + 1
+        result["more"] = more(following, len(chunks), f"iter_chunks(start={following})")
+    return result
+
+
+async def search_document(
+    query: str,
+    case_sensitive: bool = False,
+    namespace: str = "body",
+    max_tokens: Optional[int] = None,
+    offset: int = 0,
+) -> dict[str, Any]:
     """Search for text within the DOCX document and return matching paragraphs.
     
     Args:
         query: Text to search for in the document
         case_sensitive: Whether to match case, defaults to False for case-insensitive search
+        namespace: Where to search: "body" (default), "header", "footer", "footnote",
+            "comment", or "all". Use "header"/"footer" for RFP numbers and
+            confidentiality notices, "comment" for reviewer comments.
+        max_tokens: Token budget for the result
+        offset: Index of the first match to return, from a previous result's "more"
     
     Returns:
-        Dict with matching paragraphs, their anchors, and metadata
+        Dict with matching paragraphs, their breadcrumbs and the total count
     """
     manager = get_docx_manager()
     await manager._ensure_index_loaded()
-    matches = manager.search(query, case_sensitive)
+    # Non-body namespaces are parsed on first access.
+    matches = await manager.executor.run(
+        manager.search, query, case_sensitive, None if namespace == "all" else namespace
+    )
     
-    return {
-        "matches": matches,
-        "count": len(matches),
-        "query": query
-    }
+    return paginate(
+        "matches", matches, max_tokens, offset,
+        lambda n: f"search_document(query={query!r}, namespace={namespace!r}, offset={n})",
+        query=query,
+        namespace=namespace,
+    )
 
 
-async def get_document_outline() -> dict[str, Any]:
+async def get_document_outline(
+    max_tokens: Optional[int] = None, offset: int = 0
+) -> dict[str, Any]:
     """Get the document outline showing all headings with their structure and metadata.
     
+    Args:
+        max_tokens: Token budget for the result
+        offset: Index of the first heading to return, from a previous result's "more"
+    
     Returns:
-        Dict with all document headings, their levels, and hierarchical structure
+        Dict with the document headings, their levels, breadcrumbs and the total count
     """
     manager = get_docx_manager()
     await manager._ensure_index_loaded()
-    outline = manager.get_outline()
+    outline = await manager.executor.run(manager.get_outline)
     
-    return {
-        "headings": outline,
-        "count": len(outline)
-    }
+    return paginate(
+        "headings", outline, max_tokens, offset, lambda n: f"get_document_outline(offset={n})"
+    )
 
 
 # MCP-exposed tools - primary tools for external use
 TOOLS: List[Callable[..., Any]] = [
     index_docx,
     apply_edit,
+    insert_paragraph,
+    delete_paragraph,
+    replace_all,
+    undo_edit,
+    redo_edit,
+    list_versions,
+    restore_version,
     update_toc,
     get_paragraph,
+    get_paragraphs,
+    get_context,
+    get_chunk,
+    iter_chunks,
     search_document,
     get_document_outline,
 ]
+
+# Tools the agent graphs bind: the MCP tools plus those reading graph state
+AGENT_TOOLS: List[Callable[..., Any]] = [*TOOLS, recall_result]
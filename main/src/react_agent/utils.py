@@ -1,11 +1,42 @@
 """Utility & helper functions."""
 
+import asyncio
+import hashlib
 import os
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Sequence, Tuple
 from dotenv import load_dotenv
 
+import httpx
 from langchain.chat_models import init_chat_model
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import BaseMessage
+from langchain_core.runnables import Runnable
+
+
+@dataclass
+class _LoopCache:
+    """An event loop's async HTTP client and the bound models built on it."""
+
+    async_client: httpx.AsyncClient
+    # Bound chat models by (model, tool names), with the settings they were built with
+    models: Dict[Tuple[str, Tuple[str, ...]], Tuple[str, Runnable]] = field(default_factory=dict)
+
+
+# Sync HTTP client shared by every model built here, so connections are pooled
+_http_client: Optional[httpx.Client] = None
+# An httpx.AsyncClient keeps its connections on the event loop that opened
+# them, so each loop gets its own client and models, dropped with the loop.
+# Those made while no loop runs (e.g. a warm-up) go to the first loop to ask.
+_loop_caches: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopCache]" = (
+    weakref.WeakKeyDictionary()
+)
+_unbound_cache: Optional[_LoopCache] = None
+_clients_lock = threading.Lock()
+_models_lock = threading.Lock()
 
 
 def get_message_text(msg: BaseMessage) -> str:
@@ -20,14 +51,134 @@ def get_message_text(msg: BaseMessage) -> str:
         return "".join(txts).strip()
 
 
+def _client_options() -> Dict[str, Any]:
+    """Return the pool limits and timeout of the HTTP clients, read from the environment."""
+    connections = int(os.environ.get("LLM_HTTP_MAX_CONNECTIONS", "20"))
+    return {
+        "limits": httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+        "timeout": httpx.Timeout(float(os.environ.get("LLM_HTTP_TIMEOUT", "600")), connect=5.0),
+    }
+
+
+def _loop_cache() -> _LoopCache:
+    """Get or create the async client and bound models of the running event loop."""
+    global _unbound_cache
+
+    try:
+        loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    cache = _loop_caches.get(loop) if loop is not None else _unbound_cache
+    if cache is not None:
+        return cache
+    with _clients_lock:
+        if loop is None:
+            if _unbound_cache is None:
+                _unbound_cache = _LoopCache(httpx.AsyncClient(**_client_options()))
+            return _unbound_cache
+        cache = _loop_caches.get(loop)
+        if cache is None:
+            # A loop that was closed but is still referenced can't run its client again
+            for closed in [other for other in _loop_caches if other.is_closed()]:
+                del _loop_caches[closed]
+            cache = _unbound_cache or _LoopCache(httpx.AsyncClient(**_client_options()))
+            _unbound_cache = None
+            _loop_caches[loop] = cache
+        return cache
+
+
+def get_http_clients() -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """Get or create the pooled sync and async HTTP clients for model calls.
+
+    ``LLM_HTTP_MAX_CONNECTIONS`` caps the pool (default 20) and
+    ``LLM_HTTP_TIMEOUT`` the seconds a request may take (default 600); idle
+    connections are kept alive for reuse by later calls. The async client
+    belongs to the running event loop, as its connections can't be used
+    from another one (a second ``asyncio.run`` would fail on them).
+    """
+    global _http_client
+
+    if _http_client is None:
+        with _clients_lock:
+            if _http_client is None:
+                _http_client = httpx.Client(**_client_options())
+
+    return _http_client, _loop_cache().async_client
+
+
 def load_chat_model(fully_specified_name: str) -> BaseChatModel:
     """Load a chat model from a fully specified name.
 
+    OpenAI models use the pooled clients from get_http_clients().
+
     Args:
         fully_specified_name (str): String in the format 'provider/model'.
     """
     if not os.getenv("OPENAI_API_KEY"):
         raise ValueError("OPENAI_API_KEY environment variable is required")
-    
+
     provider, model = fully_specified_name.split("/", maxsplit=1)
-    return init_chat_model(model, model_provider=provider)
+    kwargs: Dict[str, Any] = {}
+    if provider == "openai":
+        kwargs["http_client"], kwargs["http_async_client"] = get_http_clients()
+    return init_chat_model(model, model_provider=provider, **kwargs)
+
+
+def _settings(fully_specified_name: str) -> str:
+    """Fingerprint the provider's environment settings (API key, base URL, ...)."""
+    provider = fully_specified_name.split("/", maxsplit=1)[0].upper()
+    settings = sorted(
+        (name, value) for name, value in os.environ.items()
+        if name.startswith((f"{provider}_", "OPENAI_"))
+    )
+    return hashlib.sha256(repr(settings).encode()).hexdigest()
+
+
+def tool_names(tools: Sequence[Any]) -> Tuple[str, ...]:
+    """Return the names of tools given as functions or tool objects."""
+    return tuple(getattr(tool, "name", None) or tool.__name__ for tool in tools)
+
+
+def get_bound_model(fully_specified_name: str, tools: Sequence[Any]) -> Runnable:
+    """Get the chat model bound to ``tools``, built once per model and tool set.
+
+    Building a model creates its client and derives the tool schemas from
+    the tools' docstrings, which is too slow to repeat on every graph step.
+    Models are kept per event loop, like the async client they use. A model
+    is rebuilt when the provider's environment settings change;
+    invalidate_model_cache() forces it.
+    """
+    key = (fully_specified_name, tool_names(tools))
+    settings = _settings(fully_specified_name)
+    models = _loop_cache().models
+    cached = models.get(key)
+    if cached is not None and cached[0] == settings:
+        return cached[1]
+    with _models_lock:
+        cached = models.get(key)
+        if cached is None or cached[0] != settings:
+            cached = (settings, load_chat_model(fully_specified_name).bind_tools(list(tools)))
+            models[key] = cached
+    return cached[1]
+
+
+def warm_up_model(fully_specified_name: str, tools: Sequence[Any]) -> float:
+    """Build and cache the bound model ahead of the first request; return the seconds taken."""
+    started = time.perf_counter()
+    get_bound_model(fully_specified_name, tools)
+    return time.perf_counter() - started
+
+
+def invalidate_model_cache(fully_specified_name: Optional[str] = None) -> None:
+    """Forget cached bound models: all of them, or those of one model.
+
+    Call after changing model configuration that the environment
+    fingerprint does not cover. Models in use keep working.
+    """
+    with _clients_lock:
+        caches = [*_loop_caches.values(), *([_unbound_cache] if _unbound_cache else [])]
+    with _models_lock:
+        for models in (cache.models for cache in caches):
+            for key in list(models):
+                if fully_specified_name is None or key[0] == fully_specified_name:
+                    del models[key]
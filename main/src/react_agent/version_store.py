@@ -0,0 +1,208 @@
+"""Content-addressed store of saved DOCX versions.
+
+A DOCX is a zip of parts, and an edit changes only ``word/document.xml`` and
+the core properties; media, styles and numbering stay the same. Each snapshot
+therefore stores every part once, under the SHA-256 of its content, and
+writes a small manifest listing the version's parts. Storage grows only by
+the parts that changed.
+
+Objects hold a part's compressed bytes exactly as they were in the zip, so a
+restore copies them into a new archive without recompressing anything. A
+part is only read and hashed when its CRC or size differs from the previous
+version's; unchanged parts reuse the previous hash.
+
+Layout, next to the document::
+
+    .<name>.versions/
+        objects/ab/<sha256>-<method>   raw zip member data
+        manifests/<version>.json       parts of one version
+        versions.jsonl                 one summary line per version
+"""
+
+import hashlib
+import json
+import os
+import threading
+import zipfile
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional
+
+from react_agent.docx_saver import _copy_bytes, atomic_write
+
+
+@dataclass
+class PartRecord:
+    """One zip part of a version."""
+
+    name: str
+    hash: str
+    compress_type: int
+    crc: int
+    file_size: int
+    compress_size: int
+    date_time: List[int]
+    external_attr: int = 0
+
+
+@dataclass
+class VersionInfo:
+    """Summary of one stored version."""
+
+    version: int
+    timestamp: str = field(default_factory=lambda: datetime.now(tz=UTC).isoformat())
+    size: int = 0  # bytes of the DOCX
+    new_bytes: int = 0  # bytes this version added to the store
+    parts: int = 0
+    label: Optional[str] = None
+
+
+def version_store_path_for(docx_path: str) -> Path:
+    """Return the version store directory of a document."""
+    path = Path(docx_path)
+    return path.with_name(f".{path.name}.versions")
+
+
+class VersionStore:
+    """Deduplicated snapshots of one document."""
+
+    def __init__(self, root: str):
+        """Open (or create on first snapshot) the store at ``root``."""
+        self.root = Path(root)
+        self._versions: Optional[List[VersionInfo]] = None
+        self._last_parts: Dict[str, PartRecord] = {}
+        self._lock = threading.Lock()
+
+    def _object_path(self, digest: str, compress_type: int) -> Path:
+        return self.root / "objects" / digest[:2] / f"{digest}-{compress_type}"
+
+    def _manifest_path(self, version: int) -> Path:
+        return self.root / "manifests" / f"{version}.json"
+
+    def list_versions(self) -> List[VersionInfo]:
+        """Return all versions, oldest first."""
+        if self._versions is None:
+            self._versions = []
+            index = self.root / "versions.jsonl"
+            if index.exists():
+                with open(index, encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            self._versions.append(VersionInfo(**json.loads(line)))
+                        except (ValueError, TypeError):
+                            # A torn last line from a crash mid-append
+                            break
+        return list(self._versions)
+
+    def manifest(self, version: int) -> List[PartRecord]:
+        """Return the parts of ``version``, in archive order."""
+        try:
+            with open(self._manifest_path(version), encoding="utf-8") as f:
+                return [PartRecord(**part) for part in json.load(f)["parts"]]
+        except FileNotFoundError:
+            raise KeyError(f"No version {version} in {self.root}") from None
+
+    def snapshot(self, docx_path: str, label: Optional[str] = None) -> VersionInfo:
+        """Store the DOCX at ``docx_path`` as a new version and return its summary."""
+        with self._lock:
+            return self._snapshot(docx_path, label)
+
+    def _snapshot(self, docx_path: str, label: Optional[str]) -> VersionInfo:
+        versions = self.list_versions()
+        if versions and not self._last_parts:
+            self._last_parts = {p.name: p for p in self.manifest(versions[-1].version)}
+
+        parts: List[PartRecord] = []
+        new_bytes = 0
+        with open(docx_path, "rb") as raw, zipfile.ZipFile(raw) as zf:
+            for info in zf.infolist():
+                previous = self._last_parts.get(info.filename)
+                if previous is not None and (previous.crc, previous.file_size, previous.compress_type) == (
+                    info.CRC, info.file_size, info.compress_type
+                ):
+                    digest = previous.hash
+                else:
+                    digest = _hash_member(zf, info)
+                target = self._object_path(digest, info.compress_type)
+                if not target.exists():
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    raw.seek(_data_offset(raw, info))
+                    new_bytes += atomic_write(
+                        target, lambda f: _copy_bytes(raw, f, info.compress_size)
+                    )
+                parts.append(PartRecord(
+                    name=info.filename,
+                    hash=digest,
+                    compress_type=info.compress_type,
+                    crc=info.CRC,
+                    file_size=info.file_size,
+                    # An identical part stored earlier may have been
+                    # compressed differently; the object is what gets copied.
+                    compress_size=target.stat().st_size,
+                    date_time=list(info.date_time),
+                    external_attr=info.external_attr,
+                ))
+
+        info = VersionInfo(
+            version=versions[-1].version + 1 if versions else 1,
+            size=os.path.getsize(docx_path),
+            new_bytes=new_bytes,
+            parts=len(parts),
+            label=label,
+        )
+        manifest = json.dumps({**asdict(info), "parts": [asdict(p) for p in parts]})
+        self._manifest_path(info.version).parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(self._manifest_path(info.version), lambda f: f.write(manifest.encode("utf-8")))
+        # The manifest is durable before the version is listed.
+        with open(self.root / "versions.jsonl", "a", encoding="utf-8") as f:
+            f.write(json.dumps(asdict(info)) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._versions.append(info)
+        self._last_parts = {p.name: p for p in parts}
+        return info
+
+    def write_version(self, version: int, stream: BinaryIO) -> None:
+        """Write the DOCX of ``version`` to ``stream``, copying stored parts raw."""
+        parts = self.manifest(version)
+        with zipfile.ZipFile(stream, "w") as dst:
+            for part in parts:
+                info = zipfile.ZipInfo(part.name, tuple(part.date_time))
+                info.compress_type = part.compress_type
+                info.CRC = part.crc
+                info.file_size = part.file_size
+                info.compress_size = part.compress_size
+                info.external_attr = part.external_attr
+                info.header_offset = dst.fp.tell()
+                dst.fp.write(info.FileHeader())
+                with open(self._object_path(part.hash, part.compress_type), "rb") as obj:
+                    _copy_bytes(obj, dst.fp, part.compress_size)
+                dst.filelist.append(info)
+                dst.NameToInfo[info.filename] = info
+                dst.start_dir = dst.fp.tell()
+
+    def restore(self, version: int, path: str) -> int:
+        """Atomically write ``version`` to ``path``; return the bytes written."""
+        self.manifest(version)  # raise KeyError before touching ``path``
+        return atomic_write(Path(path), lambda f: self.write_version(version, f))
+
+    def disk_usage(self) -> int:
+        """Return the bytes used by stored objects and manifests."""
+        return sum(p.stat().st_size for p in self.root.rglob("*") if p.is_file())
+
+
+def _hash_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> str:
+    """Return the SHA-256 of a member's uncompressed content."""
+    digest = hashlib.sha256()
+    with zf.open(info) as member:
+        for block in iter(lambda: member.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _data_offset(raw: BinaryIO, info: zipfile.ZipInfo) -> int:
+    """Return where a member's compressed data starts, past its local header."""
+    raw.seek(info.header_offset + 26)
+    name_len, extra_len = int.from_bytes(raw.read(2), "little"), int.from_bytes(raw.read(2), "little")
+    return info.header_offset + 30 + name_len + extra_len
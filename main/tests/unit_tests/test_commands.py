@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import pytest
+from docx import Document
+
+from react_agent import docx_manager
+from react_agent.commands import (
+    DEFAULT_COMMANDS,
+    CommandRouter,
+    DocumentCommand,
+    get_command_router,
+    load_commands,
+    reset_command_router,
+)
+from react_agent.context import Context
+from react_agent.graph import builder
+
+
+def test_grammar_matches_direct_commands_only() -> None:
+    router = CommandRouter(DEFAULT_COMMANDS)
+
+    def match(text):
+        found = router.match(text)
+        return found and (found[0].name, found[1])
+
+    assert match("Show outline") == ("outline", {})
+    assert match("please show me the document structure?") == ("outline", {})
+    assert match('search for "service credits"') == ("search", {"query": "service credits"})
+    assert match("[User: Ana] find pricing") == ("search", {"query": "pricing"})
+    assert match("get paragraph B.0.0.0.5") == ("paragraph", {"anchor": "b.0.0.0.5"})
+    assert match("show paragraph 1a2b3c4d") == ("paragraph", {"anchor": "1A2B3C4D"})
+    assert match("read chunk 3") == ("chunk", {"index": 3})
+    assert match("\n\nDOCUMENT CONTEXT:\n- User request: list versions\n") == ("versions", {})
+
+    assert match("find the pricing clause and shorten it") is None
+    assert match("summarize the outline of section 2 for the board") is None
+    assert match("change paragraph b.0.0.0.5 to say hello") is None
+    assert match("search for service credits") == ("search", {"query": "service credits"})
+    assert match("look for 'uptime'") == ("search", {"query": "uptime"})
+    for task in ("look at section 3", "find out who signed", "look up the SLA terms",
+                 "find the termination clause", "look pricing"):
+        assert match(task) is None, task
+
+
+def test_commands_load_from_json(tmp_path) -> None:
+    path = tmp_path / "commands.json"
+    path.write_text(json.dumps({
+        "commands": [{
+            "name": "pricing", "pattern": "show (the )?pricing", "tool": "search_document",
+            "args": {"query": "price"}, "template": "Pricing ({count}):\n{text}",
+        }],
+        "disable": ["search"],
+    }))
+
+    commands = load_commands(str(path))
+
+    assert [c.name for c in commands][:2] == ["pricing", "outline"]
+    assert "search" not in [c.name for c in commands]
+    assert CommandRouter(commands).match("show the pricing")[1] == {"query": "price"}
+    with pytest.raises(ValueError):
+        DocumentCommand("edit", "edit (?P<anchor>.+)", "apply_edit")
+
+
+def test_router_answers_without_the_model(tmp_path, monkeypatch) -> None:
+    doc = Document()
+    doc.add_heading("Pricing", level=1)
+    doc.add_paragraph("Pricing is fixed for the term.")
+    doc.add_heading("Terms", level=2)
+    path = tmp_path / "proposal.docx"
+    doc.save(path)
+    docx_manager.reset_docx_manager()
+    docx_manager.get_docx_manager(str(path))
+    reset_command_router()
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    graph = builder.compile()
+    try:
+        result = asyncio.run(graph.ainvoke({"messages": [("user", "show outline")]}, context=Context()))
+        answer = result["messages"][-1].content
+        assert answer == "The document has 2 headings:\n- Pricing [b.0.0.0.0]\n  - Terms [b.0.0.0.2]"
+        assert [m.type for m in result["messages"]] == ["human", "ai", "tool", "ai"]
+
+        result = asyncio.run(graph.ainvoke({"messages": [("user", "rewrite the intro")]}, context=Context()))
+        assert "OPENAI_API_KEY" in result["messages"][-1].content
+
+        # No matches: the agent gets to look under other words
+        result = asyncio.run(graph.ainvoke({"messages": [("user", "find termination")]}, context=Context()))
+        assert [m.type for m in result["messages"]] == ["human", "ai"]
+        assert "OPENAI_API_KEY" in result["messages"][-1].content
+
+        metrics = get_command_router().get_metrics()
+        assert metrics["hits"] == 1 and metrics["misses"] == 2 and metrics["hit_rate"] == 0.3333
+        assert metrics["by_command"] == {"outline": 1} and metrics["latency_ms"]["max"] > 0
+    finally:
+        docx_manager.reset_docx_manager()
+        reset_command_router()
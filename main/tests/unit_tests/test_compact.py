@@ -0,0 +1,98 @@
+import asyncio
+import json
+
+from docx import Document
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from react_agent import docx_manager, tools
+from react_agent.compact import paginate, parse_anchor, short_anchor
+from react_agent.tokens import count_tokens, truncate_to_tokens
+
+
+def _paragraph(index, breadcrumb, text="Pricing is fixed for the term.", level=0):
+    return {
+        "anchor": ["body", 0, 0, 0, index],
+        "breadcrumb": breadcrumb,
+        "style": "Normal",
+        "text": text,
+        "level": level,
+        "id": f"{index:08X}",
+    }
+
+
+def test_tool_docstrings_give_valid_schemas() -> None:
+    for tool in tools.TOOLS:
+        schema = convert_to_openai_tool(tool)["function"]
+        assert schema["description"] and "properties" in schema["parameters"]
+
+
+def test_short_anchor_round_trip() -> None:
+    for anchor in (["body", 3, 0, 1, 5], ["footnote", 2, 0], ["comment", 4]):
+        assert parse_anchor(short_anchor(anchor)) == anchor
+    assert short_anchor(["body", 0, 0, 0, 5]) == "b.0.0.0.5"
+    assert parse_anchor("1A2B3C4D") is None
+    assert parse_anchor("b.x") is None
+
+
+def test_truncate_to_tokens() -> None:
+    text = "Payment is due within thirty days of the invoice date. " * 20
+    cut = truncate_to_tokens(text, 10)
+    assert cut.endswith("…") and count_tokens(cut) <= 10
+    assert truncate_to_tokens("Short.", 10) == "Short."
+
+
+def test_paginate_shares_breadcrumbs_and_fits_budget() -> None:
+    paragraphs = [_paragraph(i, f"Section {i // 10}") for i in range(100)]
+
+    page = paginate("matches", paragraphs, 300, 0, lambda n: f"search(offset={n})")
+
+    assert count_tokens(json.dumps(page)) <= 300
+    assert page["count"] == 100
+    shown = len(page["matches"])
+    assert 0 < shown < 100
+    assert page["more"] == {"remaining": 100 - shown, "next": f"search(offset={shown})"}
+    assert page["breadcrumbs"] == sorted({p["breadcrumb"] for p in paragraphs[:shown]})
+    assert all("style" not in m and "h" not in m for m in page["matches"])
+    assert page["breadcrumbs"][page["matches"][-1]["bc"]] == paragraphs[shown - 1]["breadcrumb"]
+
+    rest = paginate("matches", paragraphs, 10_000, shown, lambda n: f"search(offset={n})")
+    assert rest["matches"][0]["a"] == f"b.0.0.0.{shown}"
+    assert "more" not in rest
+
+
+def test_oversized_paragraph_is_cut() -> None:
+    long_text = "Service credits apply when availability drops. " * 200
+    page = paginate("matches", [_paragraph(0, "Terms", long_text)], 100, 0, str)
+
+    assert len(page["matches"]) == 1
+    assert page["matches"][0]["cut"] is True
+    assert count_tokens(json.dumps(page)) <= 100
+
+
+def test_tools_accept_short_anchors_and_budget(tmp_path) -> None:
+    doc = Document()
+    doc.add_heading("Pricing", level=1)
+    for i in range(60):
+        doc.add_paragraph(f"Pricing clause {i} is fixed for the term of the agreement.")
+    path = tmp_path / "proposal.docx"
+    doc.save(path)
+    docx_manager.reset_docx_manager()
+    docx_manager.get_docx_manager(str(path))
+    try:
+        hits = asyncio.run(tools.search_document("clause", max_tokens=200))
+        assert hits["count"] == 60 and len(hits["matches"]) < 60
+        assert hits["more"]["next"].endswith(f"offset={len(hits['matches'])})")
+        anchor = hits["matches"][0]["a"]
+
+        paragraph = asyncio.run(tools.get_paragraph(anchor))
+        assert paragraph["t"] == "Pricing clause 0 is fixed for the term of the agreement."
+        assert paragraph["bc"] == "Pricing"
+
+        context = asyncio.run(tools.get_context(anchor, before=1, after=1))
+        assert [p["t"] for p in context["before"]] == ["Pricing"]
+        assert context["before"][0]["h"] == 1
+
+        assert asyncio.run(tools.apply_edit(anchor, "Pricing is variable."))["anchor"] == anchor
+        assert asyncio.run(tools.get_paragraph(anchor))["t"] == "Pricing is variable."
+    finally:
+        docx_manager.reset_docx_manager()
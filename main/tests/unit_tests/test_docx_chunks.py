@@ -0,0 +1,83 @@
+import asyncio
+import random
+from types import SimpleNamespace
+
+from docx import Document
+
+from react_agent.docx_chunks import ChunkIndex, paragraph_tokens
+from react_agent.docx_manager import DocxManager
+
+
+def _paragraph(rng):
+    if rng.random() < 0.15:
+        return None
+    return SimpleNamespace(text="word " * rng.randint(1, 120), level=1 if rng.random() < 0.1 else 0)
+
+
+def _assert_valid(chunks, paragraphs):
+    fresh = ChunkIndex(chunks.budget)
+    fresh.build(paragraphs)
+    assert list(chunks.starts) == list(fresh.starts)
+    for i in range(len(chunks)):
+        start, end = chunks.bounds(i)
+        assert chunks.tokens(i) == sum(paragraph_tokens(p) for p in paragraphs[start:end])
+        assert end - start == 1 or chunks.tokens(i) <= chunks.budget
+
+
+def test_incremental_updates_match_rebuild() -> None:
+    rng = random.Random(7)
+    for _ in range(20):
+        paragraphs = [_paragraph(rng) for _ in range(rng.randint(0, 60))]
+        chunks = ChunkIndex(rng.choice([60, 200, 600]))
+        chunks.build(paragraphs)
+        for _ in range(30):
+            op = rng.random()
+            if op < 0.4 and paragraphs:
+                i = rng.randrange(len(paragraphs))
+                paragraphs[i] = _paragraph(rng)
+                chunks.update(i, paragraphs[i])
+            elif op < 0.7:
+                i = rng.randint(0, len(paragraphs))
+                paragraphs.insert(i, _paragraph(rng))
+                chunks.insert(i, paragraphs[i])
+            elif paragraphs:
+                i = rng.randrange(len(paragraphs))
+                del paragraphs[i]
+                chunks.remove(i)
+            _assert_valid(chunks, paragraphs)
+
+
+def test_chunks_end_at_section_boundaries() -> None:
+    heading = SimpleNamespace(text="Pricing", level=1)
+    body = SimpleNamespace(text="word " * 40, level=0)
+    paragraphs = ([heading] + [body] * 3) * 4
+    chunks = ChunkIndex(3 * paragraph_tokens(body) + 2 * paragraph_tokens(heading))
+
+    chunks.build(paragraphs)
+
+    assert all(paragraphs[start] is heading for start in chunks.starts)
+
+
+def test_manager_chunks_follow_edits(tmp_path) -> None:
+    doc = Document()
+    for section in range(5):
+        doc.add_heading(f"Section {section}", level=1)
+        for i in range(8):
+            doc.add_paragraph(f"Clause {section}.{i} applies for the term of the agreement.")
+    path = tmp_path / "proposal.docx"
+    doc.save(path)
+    manager = DocxManager(str(path), chunk_tokens=150)
+    asyncio.run(manager._ensure_index_loaded())
+    texts = [p["text"] for p in manager.index_data]
+    assert [p["text"] for c in manager.iter_chunks() for p in c["paragraphs"]] == texts
+
+    first = manager.get_chunk(0)["paragraphs"][1]["anchor"]
+    manager.insert_paragraph(first, "A new clause in the first section.")
+    manager.delete_paragraph(manager.get_chunk(2)["paragraphs"][0]["anchor"])
+    manager.update_paragraph(first, "Clause rewritten at much greater length. " * 10)
+
+    texts = [p["text"] for p in manager.get_all_paragraphs()]
+    assert [p["text"] for c in manager.iter_chunks() for p in c["paragraphs"]] == texts
+    listed = manager.list_chunks()
+    assert [c["index"] for c in listed] == list(range(len(manager.chunks)))
+    assert manager.get_chunk(len(listed)) is None
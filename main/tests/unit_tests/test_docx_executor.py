@@ -0,0 +1,49 @@
+import asyncio
+import threading
+
+import pytest
+
+from react_agent.docx_executor import DocxExecutor
+
+
+def test_pending_tasks_are_bounded_and_measured() -> None:
+    executor = DocxExecutor(max_workers=1, max_pending=2)
+    release = threading.Event()
+    running = []
+
+    def work(i: int) -> int:
+        running.append(i)
+        release.wait(5)
+        return i * 2
+
+    async def main() -> list:
+        tasks = [asyncio.ensure_future(executor.run(work, i)) for i in range(5)]
+        await asyncio.sleep(0.05)
+        metrics = executor.get_metrics()
+        assert (metrics["running"], metrics["queued"]) == (1, 4)
+        assert len(running) == 1
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    try:
+        assert asyncio.run(main()) == [0, 2, 4, 6, 8]
+    finally:
+        executor.shutdown()
+    metrics = executor.get_metrics()
+    assert (metrics["submitted"], metrics["completed"], metrics["queued"]) == (5, 5, 0)
+    assert metrics["max_queued"] >= 4
+    assert metrics["wait_ms"]["max"] >= metrics["wait_ms"]["p50"] > 0
+
+
+def test_failed_tasks_raise_and_are_counted() -> None:
+    executor = DocxExecutor(max_workers=1, max_pending=1)
+
+    def fail() -> None:
+        raise ValueError("bad anchor")
+
+    with pytest.raises(ValueError):
+        asyncio.run(executor.run(fail))
+    # A new event loop gets its own gate.
+    assert asyncio.run(executor.run(len, "abc")) == 3
+    executor.shutdown()
+    assert (executor.get_metrics()["failed"], executor.get_metrics()["completed"]) == (1, 1)
@@ -0,0 +1,60 @@
+import asyncio
+import io
+import json
+
+from docx import Document
+
+from react_agent.docx_export import (
+    export_docx,
+    export_manager,
+    in_blocks,
+    main,
+    write_export,
+)
+from react_agent.docx_manager import DocxManager
+
+
+def _proposal(tmp_path):
+    doc = Document()
+    doc.add_heading("Pricing", level=1)
+    doc.add_paragraph("Pricing is fixed.")
+    doc.add_heading("Terms", level=2)
+    doc.add_paragraph("# of licenses is unlimited.")
+    path = tmp_path / "proposal.docx"
+    doc.save(path)
+    return path
+
+
+def test_formats(tmp_path) -> None:
+    path = str(_proposal(tmp_path))
+
+    assert "".join(export_docx(path, "text")) == (
+        "Pricing\nPricing is fixed.\nTerms\n# of licenses is unlimited.\n"
+    )
+    assert "".join(export_docx(path, "markdown")) == (
+        "# Pricing\n\nPricing is fixed.\n\n## Terms\n\n\\# of licenses is unlimited.\n\n"
+    )
+    records = [json.loads(line) for line in export_docx(path, "jsonl")]
+    assert [r["level"] for r in records] == [1, 0, 2, 0]
+    assert records[1]["anchor"] == ["body", 0, 0, 0, 1] and records[1]["id"]
+
+
+def test_manager_export_includes_unsaved_edits(tmp_path) -> None:
+    path = _proposal(tmp_path)
+    manager = DocxManager(str(path), save_window=60)
+    asyncio.run(manager._ensure_index_loaded())
+    manager.update_paragraph(["body", 0, 0, 0, 1], "Pricing is variable.")
+
+    lines = "".join(in_blocks(export_manager(manager, "text"), block_bytes=8)).splitlines()
+
+    assert lines[1] == "Pricing is variable."
+    assert "".join(export_docx(str(path), "text")).splitlines()[1] == "Pricing is fixed."
+
+
+def test_cli_writes_file(tmp_path) -> None:
+    path = _proposal(tmp_path)
+    out = tmp_path / "proposal.md"
+
+    assert main([str(path), "--format", "markdown", "-o", str(out)]) == 0
+    assert out.read_text(encoding="utf-8").startswith("# Pricing\n\n")
+    assert write_export(iter(["a\n", "b\n"]), io.StringIO()) == 2
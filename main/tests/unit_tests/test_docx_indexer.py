@@ -0,0 +1,171 @@
+import zipfile
+
+import pytest
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+from react_agent import docx_parallel
+from react_agent.docx_indexer import DocxIndexer
+
+
+@pytest.fixture
+def proposal_docx(tmp_path):
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "RFP-2024-0042 | Confidential"
+    doc.add_paragraph("1. Introduction")
+    paragraph = doc.add_paragraph("We will deliver the platform.")
+    doc.add_comment(paragraph.runs, text="Confirm delivery date", author="Reviewer")
+    doc.add_paragraph("Scope item", style="List Bullet")
+    table = doc.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "Service"
+    table.cell(1, 1).text = "99.9% uptime"
+    doc.add_paragraph("2. Pricing")
+    doc.add_paragraph("Pricing is fixed.")
+    path = tmp_path / "proposal.docx"
+    doc.save(path)
+    return path
+
+
+def _numbered(doc, text, ilvl=0, num_id=9):
+    paragraph = doc.add_paragraph(text)
+    num_pr = paragraph._p.get_or_add_pPr().get_or_add_numPr()
+    num_pr.get_or_add_ilvl().val = ilvl
+    num_pr.get_or_add_numId().val = num_id
+    return paragraph
+
+
+@pytest.fixture
+def long_docx(tmp_path):
+    doc = Document()
+    doc.add_paragraph("RFP PROPOSAL RESPONSE")
+    for section in range(1, 9):
+        doc.add_paragraph(f"{section}. Section {section}")
+        doc.add_paragraph(f"{section}.1 Scope")
+        for item in range(3):
+            _numbered(doc, f"Deliverable {section}.{item}", ilvl=item % 2)
+        table = doc.add_table(rows=2, cols=2)
+        table.cell(1, 0).text = f"Row {section}"
+        table.cell(1, 1).add_table(rows=1, cols=1).cell(0, 0).text = "Nested"
+        _numbered(doc, f"Continued list item {section}")
+        for par in range(4):
+            doc.add_paragraph(f"Paragraph {section}.{par} of the response.")
+    path = tmp_path / "long.docx"
+    doc.save(path)
+    return path
+
+
+def test_parallel_index_matches_sequential(long_docx) -> None:
+    sequential = DocxIndexer(str(long_docx))
+    expected = sequential.index()
+
+    parallel = DocxIndexer(str(long_docx))
+    parallel.min_chunk_bytes = 1
+    main_part, parts = parallel._body_parts()
+    assert len(docx_parallel.plan_chunks(parts[main_part], 4, 1)) == 4
+    assert parallel.index(workers=4) == expected
+    assert parallel.heading_stack == sequential.heading_stack
+    assert expected[-1]["breadcrumb"] == "RFP PROPOSAL RESPONSE > 8.1 Scope"
+    assert any(p["text"].startswith("24)") for p in expected)
+
+
+
+def test_index_in_long_lived_pool_matches_sequential(long_docx) -> None:
+    from concurrent.futures import ProcessPoolExecutor
+
+    sequential = DocxIndexer(str(long_docx))
+    expected = sequential.index()
+    indexer = DocxIndexer(str(long_docx))
+    indexer.min_chunk_bytes = 1
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        # The unsplit body goes to the pool as one chunk; a split one reuses it.
+        assert indexer.index(pool=pool) == expected
+        assert indexer.empty_anchors == sequential.empty_anchors
+        assert indexer.index(workers=4, pool=pool) == expected
+
+
+def test_heading_levels_come_from_styles(tmp_path) -> None:
+    doc = Document()
+    doc.add_paragraph("TOTAL SECTIONS: 10")
+    doc.add_heading("Overview", level=1)
+    doc.add_heading("Delivery approach", level=3)
+    custom = doc.styles.add_style("Proposal Heading", WD_STYLE_TYPE.PARAGRAPH)
+    custom.base_style = doc.styles["Heading 2"]
+    doc.add_paragraph("Pricing model", style="Proposal Heading")
+    direct = doc.add_paragraph("Appendix")
+    outline = OxmlElement("w:outlineLvl")
+    outline.set(qn("w:val"), "0")
+    direct._p.get_or_add_pPr().append(outline)
+    doc.add_paragraph("1. Not a heading in a styled document")
+    path = tmp_path / "styled.docx"
+    doc.save(path)
+
+    indexer = DocxIndexer(str(path))
+    indexer.index()
+    assert [(h["text"], h["level"]) for h in indexer.get_outline()] == [
+        ("Overview", 1), ("Delivery approach", 3), ("Pricing model", 2), ("Appendix", 1),
+    ]
+    assert indexer.get_style_levels()["ProposalHeading"] == 2
+    assert indexer.find_by_text("not a heading")[0]["breadcrumb"] == "Appendix"
+
+
+def test_style_scan_accepts_other_attribute_layouts(tmp_path) -> None:
+    doc = Document()
+    doc.add_paragraph("TOTAL SECTIONS: 10")
+    doc.add_heading("Overview", level=1)
+    doc.add_paragraph("1. Not a heading in a styled document")
+    saved = tmp_path / "saved.docx"
+    doc.save(saved)
+    path = tmp_path / "rewritten.docx"
+    with zipfile.ZipFile(saved) as src, zipfile.ZipFile(path, "w") as dst:
+        for info in src.infolist():
+            data = src.read(info)
+            if info.filename == "word/document.xml":
+                data = data.replace(
+                    b'<w:pStyle w:val="Heading1"/>',
+                    b"<w:pStyle xmlns:x='urn:x' x:note='1' w:val='Heading1'/>",
+                )
+            dst.writestr(info, data)
+
+    indexer = DocxIndexer(str(path))
+    indexer.index()
+    assert [(h["text"], h["level"]) for h in indexer.get_outline()] == [("Overview", 1)]
+    assert indexer._outline_styles(b"<ns0:pPr><ns0:pStyle ns0:val=\"Heading1\"/></ns0:pPr>")
+
+
+def test_body_profile_matches_full_profile(proposal_docx) -> None:
+    full = DocxIndexer(str(proposal_docx), profile="full").index()
+    body = DocxIndexer(str(proposal_docx), profile="body").index()
+    assert body == full
+    assert [p["text"] for p in body if p["level"]] == ["1. Introduction", "2. Pricing"]
+
+
+def test_non_body_parts_load_lazily(proposal_docx) -> None:
+    indexer = DocxIndexer(str(proposal_docx))
+    indexer.index()
+    assert indexer._parts == {}
+    header = indexer.get_part("header")
+    assert "RFP-2024-0042 | Confidential" in str(header)
+    assert indexer.get_part("header") is header
+
+
+def test_namespaces_are_indexed_on_first_access(proposal_docx) -> None:
+    indexer = DocxIndexer(str(proposal_docx))
+    indexer.index()
+    assert indexer._namespaces == {}
+
+    assert indexer.find_by_text("confidential") == []
+    header_hits = indexer.find_by_text("confidential", namespace="header")
+    assert [h["anchor"][0] for h in header_hits] == ["header"]
+    assert set(indexer._namespaces) == {"header"}
+
+    comment = indexer.find_by_anchor(["comment", 0])
+    assert comment["text"] == "Confirm delivery date"
+    assert comment["breadcrumb"].startswith("Comments > Reviewer")
+    assert len(indexer.find_by_text("deliver", namespace=None)) == 2
+
+
+def test_unknown_profile_is_rejected(proposal_docx) -> None:
+    with pytest.raises(ValueError):
+        DocxIndexer(str(proposal_docx), profile="everything")
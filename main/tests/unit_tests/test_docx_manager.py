@@ -0,0 +1,359 @@
+import asyncio
+import zipfile
+
+import pytest
+from docx import Document
+
+from react_agent.docx_manager import DocxManager
+
+
+@pytest.fixture
+def proposal_docx(tmp_path):
+    doc = Document()
+    doc.add_heading("Pricing", level=1)
+    doc.add_paragraph("Pricing is fixed.")
+    doc.add_paragraph("Payment is due in 30 days.")
+    path = tmp_path / "proposal.docx"
+    doc.save(path)
+    return path
+
+
+def _anchor(manager, text):
+    return next(p["anchor"] for p in manager.index_data if p["text"] == text)
+
+
+def test_edit_is_saved_atomically(proposal_docx) -> None:
+    manager = DocxManager(str(proposal_docx))
+    asyncio.run(manager._ensure_index_loaded())
+
+    assert manager.update_paragraph(_anchor(manager, "Pricing is fixed."), "Pricing is variable.")
+    assert not list(proposal_docx.parent.glob("*.tmp"))
+    assert "Pricing is variable." in [p.text for p in Document(proposal_docx).paragraphs]
+    metrics = manager.get_save_metrics()
+    assert metrics["saves_requested"] == metrics["saves_performed"] == 1
+    assert metrics["bytes_written"] == proposal_docx.stat().st_size
+
+
+def test_edits_within_window_are_coalesced(proposal_docx) -> None:
+    manager = DocxManager(str(proposal_docx), save_window=60)
+    asyncio.run(manager._ensure_index_loaded())
+    before = proposal_docx.read_bytes()
+
+    assert manager.update_paragraph(_anchor(manager, "Pricing is fixed."), "Pricing is variable.")
+    assert manager.update_paragraph(_anchor(manager, "Payment is due in 30 days."), "Net 45.")
+    assert proposal_docx.read_bytes() == before
+    assert manager.search("net 45")[0]["text"] == "Net 45."
+
+    assert manager.flush()
+    texts = [p.text for p in Document(proposal_docx).paragraphs]
+    assert "Pricing is variable." in texts and "Net 45." in texts
+    assert manager.get_save_metrics()["saves_requested"] == 2
+    assert manager.get_save_metrics()["saves_performed"] == 1
+
+    asyncio.run(manager._ensure_index_loaded())
+    assert [p["text"] for p in manager.index_data][-1] == "Net 45."
+
+
+def test_save_copies_untouched_parts_raw(proposal_docx) -> None:
+    with zipfile.ZipFile(proposal_docx) as zf:
+        before = {i.filename: (i.CRC, i.compress_size, i.compress_type) for i in zf.infolist()}
+    manager = DocxManager(str(proposal_docx))
+    asyncio.run(manager._ensure_index_loaded())
+
+    assert manager.update_paragraph(_anchor(manager, "Pricing is fixed."), "Pricing is variable.")
+    with zipfile.ZipFile(proposal_docx) as zf:
+        assert zf.testzip() is None
+        after = {i.filename: (i.CRC, i.compress_size, i.compress_type) for i in zf.infolist()}
+    assert list(after) == list(before)
+    changed = {name for name in before if after[name] != before[name]}
+    assert changed == {"word/document.xml", "docProps/core.xml"}
+    assert Document(proposal_docx).core_properties.modified is not None
+
+
+def test_undo_and_redo_restore_one_paragraph(proposal_docx) -> None:
+    manager = DocxManager(str(proposal_docx))
+    asyncio.run(manager._ensure_index_loaded())
+    assert manager.update_paragraph(_anchor(manager, "Pricing is fixed."), "Pricing is variable.")
+    assert manager.update_paragraph(_anchor(manager, "Payment is due in 30 days."), "Net 45.")
+
+    assert manager.undo_edit()["text"] == "Payment is due in 30 days."
+    assert manager.undo_edit()["text"] == "Pricing is fixed."
+    assert manager.undo_edit() is None
+    texts = [p.text for p in Document(proposal_docx).paragraphs]
+    assert "Pricing is fixed." in texts and "Payment is due in 30 days." in texts
+
+    assert manager.redo_edit()["text"] == "Pricing is variable."
+    texts = [p.text for p in Document(proposal_docx).paragraphs]
+    assert "Pricing is variable." in texts and "Payment is due in 30 days." in texts
+    # A new edit discards what is left to redo.
+    asyncio.run(manager._ensure_index_loaded())
+    assert manager.update_paragraph(_anchor(manager, "Pricing is variable."), "Pricing is fixed.")
+    assert manager.redo_edit() is None
+
+
+def test_unsaved_edits_are_replayed_after_crash(proposal_docx) -> None:
+    manager = DocxManager(str(proposal_docx), save_window=60)
+    asyncio.run(manager._ensure_index_loaded())
+    assert manager.update_paragraph(_anchor(manager, "Pricing is fixed."), "Pricing is variable.")
+    # Simulate a crash before the coalesced save is written.
+    manager._saver._timer.cancel()
+    manager._saver._pending = None
+    assert "Pricing is fixed." in [p.text for p in Document(proposal_docx).paragraphs]
+
+    restarted = DocxManager(str(proposal_docx))
+    asyncio.run(restarted._ensure_index_loaded())
+    assert "Pricing is variable." in [p.text for p in Document(proposal_docx).paragraphs]
+    assert not restarted.journal.pending()
+    assert restarted.undo_edit()["text"] == "Pricing is fixed."
+
+
+def test_journal_compaction_keeps_undo_stack(tmp_path) -> None:
+    from react_agent.edit_journal import EditJournal
+
+    path = tmp_path / ".doc.journal.jsonl"
+    journal = EditJournal(str(path), max_undo=1, compact_every=4)
+    for i in range(3):
+        journal.record_edit(["body", 0, 0, 0, i], f"old {i}", f"new {i}")
+        journal.record_saved(journal.version)
+    journal.record_undo(journal.peek_undo())
+    journal.record_saved(journal.version)
+
+    reopened = EditJournal(str(path))
+    assert len(path.read_text().splitlines()) == 4
+    assert reopened.peek_redo().new_text == "new 2"
+    assert reopened.peek_undo().new_text == "new 1"
+    assert not reopened.pending()
+
+
+def test_edit_keeps_run_formatting(tmp_path) -> None:
+    doc = Document()
+    p = doc.add_paragraph("Payment is due in ")
+    p.add_run("30 days").bold = True
+    p.add_run(" of invoice.")
+    path = tmp_path / "terms.docx"
+    doc.save(path)
+    manager = DocxManager(str(path))
+    asyncio.run(manager._ensure_index_loaded())
+
+    assert manager.update_paragraph(_anchor(manager, "Payment is due in 30 days of invoice."), "Payment is due in 45 days of invoice.")
+    runs = Document(path).paragraphs[0].runs
+    assert [(r.text, bool(r.bold)) for r in runs] == [
+        ("Payment is due in ", False), ("45 days", True), (" of invoice.", False)
+    ]
+    assert manager.undo_edit()
+    assert [r.text for r in Document(path).paragraphs[0].runs] == ["Payment is due in ", "30 days", " of invoice."]
+
+
+def test_insert_and_delete_renumber_later_anchors(proposal_docx) -> None:
+    from react_agent.docx_indexer import DocxIndexer
+
+    manager = DocxManager(str(proposal_docx), save_window=60)
+    asyncio.run(manager._ensure_index_loaded())
+    payment = _anchor(manager, "Payment is due in 30 days.")
+
+    inserted = manager.insert_paragraph(_anchor(manager, "Pricing"), "Scope", style="Heading 1")
+    assert inserted["level"] == 1
+    assert manager.get_paragraph(payment)["text"] == "Pricing is fixed."
+    assert manager.get_paragraph([*payment[:-1], payment[-1] + 1])["breadcrumb"] == "Scope"
+    assert manager.delete_paragraph(_anchor(manager, "Pricing is fixed."))["text"] == "Pricing is fixed."
+    assert manager.get_paragraph(payment)["text"] == "Payment is due in 30 days."
+
+    assert manager.flush()
+    fresh = DocxIndexer(str(proposal_docx)).index()
+    assert fresh == manager.index_data
+
+
+def test_insert_after_bullet_copies_formatting(tmp_path) -> None:
+    doc = Document()
+    doc.add_paragraph("First item", style="List Bullet").runs[0].italic = True
+    path = tmp_path / "list.docx"
+    doc.save(path)
+    manager = DocxManager(str(path))
+    asyncio.run(manager._ensure_index_loaded())
+
+    assert manager.insert_paragraph(_anchor(manager, "First item"), "Second item")["text"] == "Second item"
+    second = Document(path).paragraphs[1]
+    assert (second.text, second.style.name, second.runs[0].italic) == ("Second item", "List Bullet", True)
+
+
+def test_deleting_only_cell_paragraph_empties_it(tmp_path) -> None:
+    doc = Document()
+    doc.add_table(rows=1, cols=2).cell(0, 0).text = "Cell text"
+    doc.add_paragraph("After the table")
+    path = tmp_path / "table.docx"
+    doc.save(path)
+    manager = DocxManager(str(path))
+    asyncio.run(manager._ensure_index_loaded())
+    after = _anchor(manager, "After the table")
+
+    assert manager.delete_paragraph(_anchor(manager, "Cell text"))["text"] == "Cell text"
+    assert manager.get_paragraph(after)["text"] == "After the table"
+    assert Document(path).tables[0].cell(0, 0).text == ""
+
+
+def test_inserts_and_deletes_can_be_undone_and_redone(proposal_docx) -> None:
+    from react_agent.docx_indexer import DocxIndexer
+
+    manager = DocxManager(str(proposal_docx), save_window=60)
+    asyncio.run(manager._ensure_index_loaded())
+    original = [p.text for p in Document(proposal_docx).paragraphs]
+    kept_id = manager.get_paragraph(_anchor(manager, "Pricing is fixed."))["id"]
+
+    scope = manager.insert_paragraph(_anchor(manager, "Pricing"), "Scope", style="Heading 1")
+    assert manager.delete_paragraph(_anchor(manager, "Pricing is fixed."))
+    assert manager.undo_edit()["anchor"] == _anchor(manager, "Pricing is fixed.")
+    assert manager.get_paragraph(kept_id)["breadcrumb"] == "Scope"
+    assert manager.undo_edit()["text"] == ""
+    assert manager.flush()
+    assert [p.text for p in Document(proposal_docx).paragraphs] == original
+    assert DocxIndexer(str(proposal_docx)).index() == manager.index_data
+
+    manager.redo_edit()
+    manager.redo_edit()
+    assert manager.get_paragraph(scope["id"])["level"] == 1
+    assert manager.flush()
+    assert [p.text for p in Document(proposal_docx).paragraphs] == [
+        "Pricing", "Scope", "Payment is due in 30 days.",
+    ]
+    assert DocxIndexer(str(proposal_docx)).index() == manager.index_data
+
+
+def test_unsaved_inserts_and_deletes_are_replayed_after_crash(proposal_docx) -> None:
+    manager = DocxManager(str(proposal_docx), save_window=60)
+    asyncio.run(manager._ensure_index_loaded())
+    added = manager.insert_paragraph(_anchor(manager, "Pricing is fixed."), "Discounts apply.")
+    assert manager.delete_paragraph(_anchor(manager, "Pricing is fixed."))
+    assert manager.update_paragraph(added["anchor"][:-1] + [1], "Discounts may apply.")
+    # Simulate a crash before the coalesced save is written.
+    manager._saver._timer.cancel()
+    manager._saver._pending = None
+
+    restarted = DocxManager(str(proposal_docx))
+    asyncio.run(restarted._ensure_index_loaded())
+    assert [p.text for p in Document(proposal_docx).paragraphs] == [
+        "Pricing", "Discounts may apply.", "Payment is due in 30 days.",
+    ]
+    assert not restarted.journal.pending()
+    restarted.undo_edit()
+    restarted.undo_edit()
+    assert restarted.get_paragraph(_anchor(restarted, "Pricing is fixed."))["breadcrumb"] == "Pricing"
+
+
+def test_emptied_cell_paragraph_can_be_undone(tmp_path) -> None:
+    doc = Document()
+    doc.add_table(rows=1, cols=2).cell(0, 0).text = "Cell text"
+    path = tmp_path / "table.docx"
+    doc.save(path)
+    manager = DocxManager(str(path))
+    asyncio.run(manager._ensure_index_loaded())
+
+    cell = _anchor(manager, "Cell text")
+    manager.delete_paragraph(cell)
+    assert manager.undo_edit()["text"] == "Cell text"
+    assert Document(path).tables[0].cell(0, 0).text == "Cell text"
+
+
+def test_paragraph_ids_survive_edits_and_saves(proposal_docx) -> None:
+    from react_agent.docx_indexer import DocxIndexer
+
+    doc = Document(proposal_docx)
+    doc.paragraphs[1]._p.set("{http://schemas.microsoft.com/office/word/2010/wordml}paraId", "1A2B3C4D")
+    doc.save(proposal_docx)
+    minted = DocxIndexer(str(proposal_docx)).index()[2]["id"]
+    assert DocxIndexer(str(proposal_docx)).index()[2]["id"] == minted
+
+    manager = DocxManager(str(proposal_docx))
+    asyncio.run(manager._ensure_index_loaded())
+    assert manager.get_paragraph("1A2B3C4D")["text"] == "Pricing is fixed."
+    assert manager.insert_paragraph("1A2B3C4D", "Discounts apply.")["id"] not in ("1A2B3C4D", minted)
+    assert manager.get_paragraph(minted)["anchor"] == ["body", 0, 0, 0, 3]
+    assert manager.update_paragraph(minted, "Net 45.")
+    assert manager.delete_paragraph("1A2B3C4D")["text"] == "Pricing is fixed."
+    assert manager.get_paragraph("1A2B3C4D") is None
+
+    fresh = DocxIndexer(str(proposal_docx)).index()
+    assert fresh == manager.index_data
+    assert fresh[2] == {**manager.get_paragraph(minted), "text": "Net 45."}
+
+
+def test_replace_all_changes_every_match_in_one_save(tmp_path) -> None:
+    doc = Document()
+    doc.add_heading("Acme proposal", level=1)
+    p = doc.add_paragraph("Prepared for ")
+    p.add_run("Acme").bold = True
+    p.add_run(" Corp by us.")
+    doc.add_paragraph("acme and Acme again.")
+    doc.add_heading("Terms", level=1)
+    doc.add_paragraph("Acme pays monthly.")
+    path = tmp_path / "rename.docx"
+    doc.save(path)
+    manager = DocxManager(str(path))
+    asyncio.run(manager._ensure_index_loaded())
+
+    preview = manager.preview_replace("Acme", "Globex", scope=_anchor(manager, "Acme proposal"))
+    assert (preview["matches"], preview["paragraphs"]) == (3, 3)
+    result = manager.replace_all("Acme", "Globex", scope=_anchor(manager, "Acme proposal"))
+    assert (result["matches"], result["paragraphs"]) == (3, 3)
+    assert result["sample"][1]["after"] == "Prepared for Globex Corp by us."
+    assert manager.get_save_metrics()["saves_performed"] == 1
+
+    texts = [p.text for p in Document(path).paragraphs]
+    assert texts == [
+        "Globex proposal", "Prepared for Globex Corp by us.", "acme and Globex again.", "Terms", "Acme pays monthly."
+    ]
+    runs = Document(path).paragraphs[1].runs
+    assert [(r.text, bool(r.bold)) for r in runs] == [("Prepared for ", False), ("Globex", True), (" Corp by us.", False)]
+    assert manager.get_paragraph(_anchor(manager, "Globex proposal"))["breadcrumb"] == "Globex proposal"
+
+    result = manager.replace_all(r"(\w+) pays", r"\1 will pay", regex=True, case_sensitive=False)
+    assert result["sample"][0]["after"] == "Acme will pay monthly."
+    assert manager.undo_edit()["text"] == "Acme pays monthly."
+    with pytest.raises(ValueError):
+        manager.replace_all("(", "x", regex=True)
+
+
+def test_batch_and_context_reads(tmp_path) -> None:
+    doc = Document()
+    doc.add_heading("Scope", level=1)
+    for i in range(5):
+        doc.add_paragraph(f"Item {i}")
+    doc.add_paragraph("")
+    doc.add_table(rows=1, cols=1).cell(0, 0).text = "In a table"
+    path = tmp_path / "context.docx"
+    doc.save(path)
+    manager = DocxManager(str(path))
+    asyncio.run(manager._ensure_index_loaded())
+    item = manager.get_paragraph(_anchor(manager, "Item 4"))
+
+    found = manager.get_paragraphs([_anchor(manager, "Item 3"), item["id"], ["body", 9, 9, 9, 9]])
+    assert [p and p["text"] for p in found] == ["Item 3", "Item 4", None]
+
+    context = manager.get_context(item["id"], before=2, after=5)
+    assert [p["text"] for p in context["before"]] == ["Item 2", "Item 3"]
+    assert context["paragraph"]["text"] == "Item 4"
+    assert [p["text"] for p in context["after"]] == ["In a table"]
+    assert context["after"][0]["anchor"] == _anchor(manager, "In a table")
+    assert manager.get_context(["body", 9, 9, 9, 9]) is None
+
+
+def test_undo_finds_the_edited_paragraph_by_id_after_it_moved(tmp_path) -> None:
+    doc = Document()
+    doc.add_paragraph("Net 30.")
+    doc.add_paragraph("Net 45.")
+    path = tmp_path / "terms.docx"
+    doc.save(path)
+    manager = DocxManager(str(path))
+    asyncio.run(manager._ensure_index_loaded())
+    second = manager.get_paragraph(["body", 0, 0, 0, 1])["id"]
+    assert manager.update_paragraph(second, "Net 30.")
+
+    # Another program puts a paragraph in front, so the edit's anchor now
+    # points at the first "Net 30." paragraph.
+    doc = Document(path)
+    doc.paragraphs[0].insert_paragraph_before("Payment terms")
+    doc.save(path)
+    asyncio.run(manager._ensure_index_loaded())
+
+    assert manager.undo_edit()["text"] == "Net 45."
+    assert [p.text for p in Document(path).paragraphs] == ["Payment terms", "Net 30.", "Net 45."]
+    assert manager.get_paragraph(second)["anchor"] == ["body", 0, 0, 0, 2]
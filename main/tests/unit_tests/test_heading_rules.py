@@ -0,0 +1,54 @@
+import json
+import random
+
+import pytest
+
+from react_agent.heading_rules import (
+    HeadingClassifier,
+    HeadingRules,
+    KeywordAutomaton,
+    load_heading_rules,
+)
+
+
+def test_automaton_matches_substring_search() -> None:
+    rng = random.Random(7)
+    keywords = {
+        "".join(rng.choice("abcé ") for _ in range(rng.randint(1, 6))): rng.randint(1, 4)
+        for _ in range(200)
+    }
+    automaton = KeywordAutomaton(keywords)
+    for _ in range(500):
+        text = "".join(rng.choice("abcdé ") for _ in range(rng.randint(0, 40)))
+        found = [level for kw, level in keywords.items() if kw in text]
+        assert automaton.match(text) == min(found, default=None)
+
+
+def test_default_rules_detect_german_and_french_headings() -> None:
+    classifier = HeadingClassifier()
+    assert classifier.level("2.1 Scope of work") == 2
+    assert classifier.level("EXECUTIVE SUMMARY") == 1
+    assert classifier.level("Zusammenfassung der Leistungen") == 2
+    assert classifier.level("Table des matières") == 2
+    assert classifier.level("We will deliver the platform.") is None
+
+
+def test_rules_load_from_json(tmp_path) -> None:
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({
+        "languages": ["de"],
+        "all_caps_max_words": 0,
+        "keywords": {"de": {"Preisblatt": 1}},
+    }))
+    rules = load_heading_rules(str(path))
+    assert rules.keywords["de"]["einleitung"] == 2
+
+    classifier = HeadingClassifier(rules)
+    assert classifier.level("Preisblatt für 2025") == 1
+    assert classifier.level("Introduction") is None
+    assert classifier.level("PRICING") is None
+
+
+def test_unknown_rule_settings_are_rejected() -> None:
+    with pytest.raises(ValueError, match="keyword"):
+        HeadingRules.from_dict({"keyword": {}})
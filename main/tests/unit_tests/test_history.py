@@ -0,0 +1,61 @@
+import asyncio
+import json
+
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage, ToolMessage
+from langgraph.graph import add_messages
+from langgraph.prebuilt import ToolNode
+
+from react_agent.history import compact_messages, recall_result, summary_prompt
+from react_agent.state import State
+
+RESULT = json.dumps({"matches": [{"a": f"b.0.0.0.{i}", "t": "Pricing is fixed."} for i in range(40)]})
+
+
+def _turn(n):
+    return [
+        HumanMessage(f"Find pricing clauses, take {n}.", id=f"h{n}"),
+        AIMessage("", tool_calls=[{"name": "search_document", "args": {"query": "pricing"}, "id": f"c{n}"}], id=f"a{n}"),
+        ToolMessage(RESULT, tool_call_id=f"c{n}", name="search_document", id=f"t{n}"),
+        AIMessage(f"There are 40 pricing clauses ({n}).", id=f"f{n}"),
+    ]
+
+
+def test_answered_results_become_stubs() -> None:
+    messages = _turn(1) + _turn(2)[:3]
+
+    compaction = compact_messages(messages, {}, 0, max_tokens=100_000)
+
+    assert [m.id for m in compaction.messages] == ["t1"]
+    stub = json.loads(compaction.messages[0].content)
+    assert stub["stub"] == "c1" and stub["recall"] == "recall_result('c1')"
+    assert compaction.archive == {"c1": RESULT} and compaction.summary == []
+    merged = add_messages(messages, compaction.messages)
+    assert merged[2].tool_call_id == "c1" and merged[6].content == RESULT
+
+    again = compact_messages(merged, compaction.archive, 0, max_tokens=100_000)
+    assert again.messages == [] and again.archive == {}
+
+
+def test_oldest_turns_collapse_into_summary() -> None:
+    messages = _turn(1) + _turn(2) + _turn(3)[:3]
+
+    compaction = compact_messages(messages, {}, 2, max_tokens=60)
+
+    removed = [m.id for m in compaction.messages if isinstance(m, RemoveMessage)]
+    assert removed == ["h1", "a1", "t1", "f1", "h2", "a2", "t2", "f2"]
+    assert compaction.summary[0] == (
+        "[turn-3] User: Find pricing clauses, take 1. | Tools: search_document"
+        " | Answer: There are 40 pricing clauses (1)."
+    )
+    assert "ai: " in compaction.archive["turn-4"] and compaction.archive["c2"] == RESULT
+    assert summary_prompt(compaction.summary, 60).count("\n") == 1
+
+
+def test_recall_result_reads_the_archive() -> None:
+    call = {"name": "recall_result", "args": {"ref": "c1"}, "id": "r1"}
+    state = State(messages=[AIMessage("", tool_calls=[call])], archive={"c1": RESULT})
+
+    result = asyncio.run(ToolNode([recall_result]).ainvoke(state))
+
+    assert json.loads(result["messages"][0].content) == {"ref": "c1", "content": RESULT}
+    assert asyncio.run(recall_result("turn-9", state))["success"] is False
@@ -0,0 +1,75 @@
+import pytest
+from docx import Document
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+
+from react_agent.paragraph_diff import apply_minimal_edit, text_changes
+
+
+@pytest.fixture
+def paragraph():
+    doc = Document()
+    p = doc.add_paragraph("Pricing is ")
+    p.add_run("fixed").bold = True
+    p.add_run(" for ")
+    p.add_run("12 months").italic = True
+    p.add_run(".")
+    return p
+
+
+def _runs(p):
+    return [(r.text, bool(r.bold), bool(r.italic)) for r in p.runs]
+
+
+def test_text_changes_are_word_spans() -> None:
+    assert text_changes("Pricing is fixed.", "Pricing is variable.") == [(11, 16, "variable")]
+    assert text_changes("a b", "a b c") == [(3, 3, " c")]
+
+
+def test_replacement_keeps_run_formatting(paragraph) -> None:
+    unchanged = [paragraph._p.r_lst[i].xml for i in (0, 2, 4)]
+    assert apply_minimal_edit(paragraph._p, "Pricing is variable for 24 months.") == 2
+    assert paragraph.text == "Pricing is variable for 24 months."
+    assert _runs(paragraph) == [
+        ("Pricing is ", False, False),
+        ("variable", True, False),
+        (" for ", False, False),
+        ("24 months", False, True),
+        (".", False, False),
+    ]
+    assert [paragraph._p.r_lst[i].xml for i in (0, 2, 4)] == unchanged
+
+
+def test_deletion_across_runs_drops_emptied_runs(paragraph) -> None:
+    assert apply_minimal_edit(paragraph._p, "Pricing is 12 months.")
+    assert paragraph.text == "Pricing is 12 months."
+    assert len(paragraph.runs) == 4
+    assert not any(bold for _, bold, _ in _runs(paragraph))
+    assert ("12 months", False, True) in _runs(paragraph)
+
+
+def test_insertion_takes_preceding_formatting(paragraph) -> None:
+    assert apply_minimal_edit(paragraph._p, "Pricing is fixed and capped for 12 months.")
+    assert _runs(paragraph)[1] == ("fixed and capped", True, False)
+
+
+def test_hyperlink_and_tab_are_kept() -> None:
+    doc = Document()
+    p = doc.add_paragraph()
+    p._p.append(parse_xml(
+        f'<w:r {nsdecls("w")}><w:t xml:space="preserve">See </w:t><w:tab/></w:r>'
+    ))
+    p._p.append(parse_xml(
+        f'<w:hyperlink {nsdecls("w", "r")} r:id="rId9"><w:r><w:t>the terms</w:t></w:r></w:hyperlink>'
+    ))
+    p._p.append(parse_xml(f'<w:r {nsdecls("w")}><w:t xml:space="preserve"> here.</w:t></w:r>'))
+
+    assert apply_minimal_edit(p._p, "Read \tthe terms below.")
+    assert p.text == "Read \tthe terms below."
+    assert p.hyperlinks[0].text == "the terms"
+    assert p._p.xpath("w:r/w:tab")
+
+
+def test_inserted_line_break_needs_rebuild(paragraph) -> None:
+    assert apply_minimal_edit(paragraph._p, "Pricing is fixed\nfor 12 months.") is None
+    assert apply_minimal_edit(Document().add_paragraph()._p, "New text") is None
@@ -0,0 +1,64 @@
+import random
+
+from react_agent.docx_indexer import Paragraph
+from react_agent.paragraph_sequence import ParagraphSequence
+
+
+def _anchors(model):
+    positions = {}
+    anchors = []
+    for container, _ in model:
+        anchors.append([*container, positions.get(container, 0)])
+        positions[container] = positions.get(container, 0) + 1
+    return anchors
+
+
+def _breadcrumbs(paragraphs):
+    stack, crumbs = [], []
+    for p in paragraphs:
+        if p.level > 0:
+            stack = [h for h in stack if h[0] < p.level] + [(p.level, p.text)]
+        crumbs.append(" > ".join(t for _, t in stack) or "Document Root")
+    return crumbs
+
+
+def _paragraph(rng, serial):
+    # No level-1 headings, so nothing bounds a backward walk for the open headings
+    return Paragraph(anchor=[], breadcrumb="", style="", text=f"p{serial}", level=rng.choice([0] * 6 + [2, 3]))
+
+
+def test_random_edits_match_list_model() -> None:
+    rng = random.Random(7)
+    containers = [("body", t, 0, 0) for t in range(4)]
+    model = [(containers[i * 4 // 40], _paragraph(rng, i)) for i in range(40)]
+    for p, crumb in zip([p for _, p in model], _breadcrumbs([p for _, p in model])):
+        p.breadcrumb = crumb
+    sequence = ParagraphSequence(model)
+    serial = len(model)
+
+    for _ in range(300):
+        anchors = _anchors(model)
+        i = rng.randrange(len(model))
+        node = sequence.find(anchors[i])
+        assert node.paragraph is model[i][1]
+        assert sequence.rank(node) == i and sequence.select(i) is node
+        assert sequence.anchor_of(node) == anchors[i]
+        if rng.random() < 0.5 or sequence.is_alone(node):
+            paragraph = _paragraph(rng, serial)
+            before = rng.random() < 0.5
+            new = (sequence.insert_before if before else sequence.insert_after)(node, paragraph)
+            sequence.reflow_breadcrumbs(new, paragraph.level)
+            model.insert(i if before else i + 1, (model[i][0], paragraph))
+            serial += 1
+        else:
+            following = sequence.next(node)
+            sequence.remove(node)
+            if following is not None:
+                sequence.reflow_breadcrumbs(following, model[i][1].level)
+            del model[i]
+
+    assert [node.paragraph for node in sequence] == [p for _, p in model]
+    assert [p.breadcrumb for _, p in model] == _breadcrumbs([p for _, p in model])
+    assert len(sequence) == len(model)
+    assert sequence.find(["body", 0, 0, 0, len(model)]) is None
+    assert sequence.find(["body", 9, 0, 0, 0]) is None
@@ -0,0 +1,146 @@
+import asyncio
+import json
+
+import pytest
+from docx import Document
+from langchain_core.messages import AIMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.types import Command
+
+from react_agent import docx_manager, planner
+from react_agent.context import Context
+
+STEPS = [
+    {"id": "s1", "tool": "search_document", "args": {"query": "pricing"}},
+    {"id": "s2", "tool": "get_context", "for_each": "$s1.matches", "args": {"anchor": "$item.a"}},
+    {"id": "s3", "tool": "get_paragraphs", "args": {"anchors": "$s1.matches.*.a"}},
+    {"id": "s4", "tool": "apply_edit", "args": {"anchor": "$s1.matches.0.a", "new_text": "Fees"}},
+    {"id": "s5", "tool": "get_document_outline"},
+]
+
+
+def test_plan_dependencies_keep_edits_in_order() -> None:
+    plan = planner.new_plan(STEPS)
+
+    assert plan["deps"] == {
+        "s1": [], "s2": ["s1"], "s3": ["s1"], "s4": ["s1", "s2", "s3"], "s5": ["s4"],
+    }
+    with pytest.raises(ValueError, match="not earlier steps"):
+        planner.new_plan([{"id": "s1", "tool": "get_paragraph", "args": {"anchor": "$s2.a"}}])
+    with pytest.raises(ValueError, match="unknown tool"):
+        planner.new_plan([{"id": "s1", "tool": "rm_rf", "args": {}}])
+
+
+def test_waves_fan_out_and_skip_after_failures() -> None:
+    plan = planner.new_plan(STEPS[:3] + [
+        {"id": "s4", "tool": "get_paragraph", "args": {"anchor": "zz.9"}},
+        {"id": "s5", "tool": "get_context", "args": {"anchor": "$s4.a"}},
+    ])
+
+    wave = planner.next_wave(plan)
+    assert [c["name"] for c in wave] == ["search_document", "get_paragraph"]
+    matches = {"matches": [{"a": "b.0.0.0.1"}, {"a": "b.0.0.0.7"}]}
+    planner.record_results(plan, [
+        ToolMessage(json.dumps(matches), tool_call_id=wave[0]["id"]),
+        ToolMessage("null", tool_call_id=wave[1]["id"]),
+    ])
+
+    wave = planner.next_wave(plan)
+    assert [(c["name"], c["args"]) for c in wave] == [
+        ("get_context", {"anchor": "b.0.0.0.1"}),
+        ("get_context", {"anchor": "b.0.0.0.7"}),
+        ("get_paragraphs", {"anchors": ["b.0.0.0.1", "b.0.0.0.7"]}),
+    ]
+    assert plan["failed"] == {"s4": "The tool found nothing.", "s5": "Not run because step s4 failed."}
+    planner.record_results(plan, [ToolMessage(json.dumps({"success": True}), tool_call_id=wave[0]["id"])])
+    assert "s2" not in plan["results"]
+    planner.record_results(plan, [
+        ToolMessage("Error: boom", tool_call_id=wave[1]["id"], status="error"),
+        ToolMessage("{}", tool_call_id=wave[2]["id"]),
+    ])
+
+    assert plan["results"]["s2"] == [{"success": True}, {"success": False, "message": "Error: boom"}]
+    assert planner.next_wave(plan) == []
+    assert "s4: The tool found nothing." in planner.plan_report(plan)
+
+
+def test_plan_runs_with_two_model_calls_and_asks_before_editing(tmp_path, monkeypatch) -> None:
+    doc = Document()
+    doc.add_heading("Pricing", level=1)
+    doc.add_paragraph("Pricing is fixed for the term.")
+    doc.add_paragraph("Other pricing applies to extensions.")
+    path = tmp_path / "proposal.docx"
+    doc.save(path)
+    docx_manager.reset_docx_manager()
+    docx_manager.get_docx_manager(str(path))
+    prompts = []
+
+    class ScriptedModel:
+        async def ainvoke(self, messages, **kwargs):
+            prompts.append(messages)
+            if len(prompts) > 1:
+                return AIMessage("Done.")
+            return AIMessage("", tool_calls=[{"name": "Plan", "args": {"steps": STEPS}, "id": "p1"}])
+
+    monkeypatch.setattr(planner, "get_bound_model", lambda *args: ScriptedModel())
+    graph = planner.builder.compile(checkpointer=MemorySaver())
+    config = {"configurable": {"thread_id": "t1"}}
+    context = Context(fast_commands=False)
+    try:
+        asyncio.run(graph.ainvoke({"messages": [("user", "Rename the pricing heading")]}, config, context=context))
+        state = asyncio.run(graph.aget_state(config))
+        assert state.next == ("approval_node",)
+        assert state.tasks[0].interrupts[0].value["tool_name"] == "apply_edit"
+        waves = [m for m in state.values["messages"] if isinstance(m, AIMessage) and m.tool_calls][1:]
+        assert [len(m.tool_calls) for m in waves] == [1, 4, 1]
+
+        result = asyncio.run(graph.ainvoke(Command(resume="yes"), config, context=context))
+        assert len(prompts) == 2 and result["messages"][-1].content == "Done."
+        outline = json.loads(result["messages"][-2].content)
+        assert outline["headings"][0]["t"] == "Fees"
+    finally:
+        docx_manager.reset_docx_manager()
+
+
+def test_fanned_out_edits_are_approved_one_at_a_time(tmp_path, monkeypatch) -> None:
+    doc = Document()
+    for text in ("Pricing one.", "Pricing two.", "Pricing three."):
+        doc.add_paragraph(text)
+    path = tmp_path / "proposal.docx"
+    doc.save(path)
+    docx_manager.reset_docx_manager()
+    docx_manager.get_docx_manager(str(path))
+    steps = [
+        {"id": "s1", "tool": "search_document", "args": {"query": "pricing"}},
+        {"id": "s2", "tool": "apply_edit", "for_each": "$s1.matches",
+         "args": {"anchor": "$item.a", "new_text": "Fees."}},
+    ]
+
+    class ScriptedModel:
+        calls = 0
+
+        async def ainvoke(self, messages, **kwargs):
+            ScriptedModel.calls += 1
+            if ScriptedModel.calls > 1:
+                return AIMessage("Done.")
+            return AIMessage("", tool_calls=[{"name": "Plan", "args": {"steps": steps}, "id": "p1"}])
+
+    monkeypatch.setattr(planner, "get_bound_model", lambda *args: ScriptedModel())
+    graph = planner.builder.compile(checkpointer=MemorySaver())
+    config = {"configurable": {"thread_id": "t1"}}
+    context = Context(fast_commands=False)
+    try:
+        result = asyncio.run(graph.ainvoke({"messages": [("user", "Rename pricing")]}, config, context=context))
+        approvals = []
+        while asyncio.run(graph.aget_state(config)).next == ("approval_node",):
+            state = asyncio.run(graph.aget_state(config))
+            assert len(state.values["messages"][-1].tool_calls) == 1
+            approvals.append(state.tasks[0].interrupts[0].value["tool_name"])
+            result = asyncio.run(graph.ainvoke(Command(resume="yes"), config, context=context))
+
+        assert approvals == ["apply_edit"] * 3
+        assert result["messages"][-1].content == "Done."
+        manager = docx_manager.get_docx_manager()
+        assert [manager.get_paragraph(f"b.0.0.0.{i}")["text"] for i in range(3)] == ["Fees."] * 3
+    finally:
+        docx_manager.reset_docx_manager()
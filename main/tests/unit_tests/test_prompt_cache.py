@@ -0,0 +1,57 @@
+from datetime import UTC, datetime
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from react_agent.context import Context
+from react_agent.prompt_cache import (
+    assemble_prompt,
+    cache_kwargs,
+    coarse_time,
+    get_prompt_cache_metrics,
+    record_usage,
+    reset_prompt_cache_metrics,
+)
+
+
+def test_coarse_time_is_stable_within_granularity(monkeypatch) -> None:
+    early = datetime(2026, 3, 1, 9, 0, 5, 123456, tzinfo=UTC)
+    late = datetime(2026, 3, 1, 9, 59, 59, tzinfo=UTC)
+
+    assert coarse_time(3600, early) == coarse_time(3600, late) == "2026-03-01T09:00:00+00:00"
+    assert coarse_time(0, early) == early.isoformat()
+    monkeypatch.setenv("TIME_GRANULARITY", "60")
+    assert Context().time_granularity == 60
+
+
+def test_prompt_keeps_volatile_context_last(monkeypatch) -> None:
+    history = [HumanMessage("Shorten the pricing section.")]
+
+    prompt = assemble_prompt("You edit proposals.", history, "openai", volatile="Open document: a.docx.")
+    assert isinstance(prompt[0], SystemMessage) and prompt[1] is history[0]
+    assert isinstance(prompt[-1], SystemMessage) and prompt[-1].content == "Open document: a.docx."
+
+    prompt = assemble_prompt("You edit proposals.", history, "anthropic", volatile="Open document: a.docx.")
+    assert prompt[0].content[-1]["cache_control"] == {"type": "ephemeral"}
+    assert prompt[1].content[-1]["cache_control"] == {"type": "ephemeral"}
+    assert isinstance(prompt[-1], HumanMessage) and history[0].content == "Shorten the pricing section."
+
+    monkeypatch.delenv("OPENAI_BASE_URL", raising=False)
+    key = cache_kwargs("openai", "openai/gpt-4o", ["search_document"], "You edit proposals.")
+    assert key == cache_kwargs("openai", "openai/gpt-4o", ["search_document"], "You edit proposals.")
+    assert key != cache_kwargs("openai", "openai/gpt-4o", ["apply_edit"], "You edit proposals.")
+    monkeypatch.setenv("OPENAI_BASE_URL", "http://localhost:8000/v1")
+    assert cache_kwargs("openai", "openai/gpt-4o", ["search_document"], "You edit proposals.") == {}
+
+
+def test_record_usage_counts_cached_tokens() -> None:
+    reset_prompt_cache_metrics()
+    usage = {"input_tokens": 2000, "output_tokens": 10, "total_tokens": 2010}
+
+    record_usage(AIMessage("", usage_metadata={**usage, "input_token_details": {"cache_read": 1536}}))
+    record_usage(AIMessage("", usage_metadata=usage))
+    assert record_usage(AIMessage("")) is None
+
+    metrics = get_prompt_cache_metrics()
+    assert metrics["calls"] == 2 and metrics["calls_with_hits"] == 1
+    assert metrics["cached_tokens"] == 1536 and metrics["cached_ratio"] == 0.384
+    reset_prompt_cache_metrics()
@@ -0,0 +1,52 @@
+import asyncio
+
+from react_agent.tools import TOOLS
+from react_agent.utils import get_bound_model, get_http_clients, invalidate_model_cache
+
+
+def test_bound_model_is_cached_per_model_and_tools(monkeypatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    invalidate_model_cache()
+
+    model = get_bound_model("openai/gpt-4o-mini", TOOLS)
+
+    assert get_bound_model("openai/gpt-4o-mini", TOOLS) is model
+    assert get_bound_model("openai/gpt-4o-mini", TOOLS[:2]) is not model
+    assert get_bound_model("openai/gpt-4o", TOOLS) is not model
+    assert get_bound_model("openai/gpt-4o", TOOLS).bound.http_async_client is (
+        model.bound.http_async_client
+    )
+
+
+def test_bound_model_is_rebuilt_after_config_change(monkeypatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    invalidate_model_cache()
+    model = get_bound_model("openai/gpt-4o-mini", TOOLS)
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-rotated")
+    rotated = get_bound_model("openai/gpt-4o-mini", TOOLS)
+    assert rotated is not model
+
+    invalidate_model_cache("openai/gpt-4o-mini")
+    assert get_bound_model("openai/gpt-4o-mini", TOOLS) is not rotated
+    invalidate_model_cache()
+
+
+def test_each_event_loop_gets_its_own_async_client(monkeypatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    invalidate_model_cache()
+    warmed = get_bound_model("openai/gpt-4o-mini", TOOLS)
+
+    async def bound():
+        model = get_bound_model("openai/gpt-4o-mini", TOOLS)
+        assert get_bound_model("openai/gpt-4o-mini", TOOLS) is model
+        assert model.bound.http_async_client is get_http_clients()[1]
+        return model
+
+    first, second = asyncio.run(bound()), asyncio.run(bound())
+
+    assert first is warmed
+    assert second is not first
+    assert second.bound.http_async_client is not first.bound.http_async_client
+    assert second.bound.http_client is first.bound.http_client
+    invalidate_model_cache()
@@ -0,0 +1,102 @@
+import asyncio
+import io
+import os
+import struct
+import zipfile
+import zlib
+
+import pytest
+from docx import Document
+from docx.shared import Inches
+
+from react_agent.docx_manager import DocxManager
+from react_agent.edit_journal import EditJournal, journal_path_for
+from react_agent.version_store import VersionStore, version_store_path_for
+
+
+def _noise_png(width, height):
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+    rows = b"".join(b"\x00" + os.urandom(width * 3) for _ in range(height))
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+    )
+
+
+@pytest.fixture
+def illustrated_docx(tmp_path):
+    doc = Document()
+    doc.add_heading("Pricing", level=1)
+    doc.add_paragraph("Pricing is fixed.")
+    doc.add_picture(io.BytesIO(_noise_png(128, 128)), width=Inches(1))
+    path = tmp_path / "proposal.docx"
+    doc.save(path)
+    return path
+
+
+def _parts(path):
+    with zipfile.ZipFile(path) as zf:
+        return {name: zf.read(name) for name in zf.namelist()}
+
+
+def test_versions_store_only_changed_parts(illustrated_docx, tmp_path) -> None:
+    store = VersionStore(str(tmp_path / "versions"))
+    original = _parts(illustrated_docx)
+    first = store.snapshot(str(illustrated_docx))
+
+    doc = Document(illustrated_docx)
+    doc.paragraphs[1].text = "Pricing is variable."
+    doc.save(illustrated_docx)
+    second = store.snapshot(str(illustrated_docx))
+
+    assert [v.version for v in store.list_versions()] == [1, 2]
+    assert first.new_bytes > 40_000  # the image
+    assert second.new_bytes < first.new_bytes / 10
+    image = next(p for p in store.manifest(2) if p.name.startswith("word/media/"))
+    assert image in store.manifest(1)
+
+    restored = tmp_path / "restored.docx"
+    store.restore(1, str(restored))
+    assert _parts(restored) == original
+    assert "Pricing is fixed." in [p.text for p in Document(restored).paragraphs]
+    with pytest.raises(KeyError):
+        store.restore(3, str(restored))
+
+
+def test_manager_keeps_a_version_per_save(illustrated_docx) -> None:
+    manager = DocxManager(str(illustrated_docx))
+    asyncio.run(manager._ensure_index_loaded())
+    anchor = next(p["anchor"] for p in manager.index_data if p["text"] == "Pricing is fixed.")
+    assert manager.update_paragraph(anchor, "Pricing is variable.")
+    assert [v["label"] for v in manager.list_versions()] == ["original", "edit 1"]
+
+    restored = manager.restore_version(1)
+    assert restored["version"] == 3
+    assert "Pricing is fixed." in [p.text for p in Document(illustrated_docx).paragraphs]
+    asyncio.run(manager._ensure_index_loaded())
+    assert manager.search("fixed")[0]["text"] == "Pricing is fixed."
+    # A reopened store lists the same versions.
+    reopened = VersionStore(str(version_store_path_for(str(illustrated_docx))))
+    assert len(reopened.list_versions()) == 3
+
+
+def test_restore_closes_the_undo_history(illustrated_docx) -> None:
+    manager = DocxManager(str(illustrated_docx))
+    asyncio.run(manager._ensure_index_loaded())
+    anchor = next(p["anchor"] for p in manager.index_data if p["text"] == "Pricing is fixed.")
+    assert manager.update_paragraph(anchor, "Pricing is variable.")
+    manager.flush()
+
+    manager.restore_version(1)
+    assert manager.journal.peek_undo() is None
+    assert manager.undo_edit() is None and manager.redo_edit() is None
+    assert EditJournal(str(journal_path_for(str(illustrated_docx)))).peek_undo() is None
+
+    asyncio.run(manager._ensure_index_loaded())
+    assert manager.update_paragraph(anchor, "Pricing is indexed.")
+    assert manager.undo_edit()["text"] == "Pricing is fixed."
+    manager.flush()
+    assert "Pricing is fixed." in [p.text for p in Document(illustrated_docx).paragraphs]